@@ -1,17 +1,90 @@
-from flask import Flask
+import logging
+import click
+from flask import Flask, current_app
 from flask_sqlalchemy import SQLAlchemy
-from apscheduler.schedulers.background import BackgroundScheduler
 import os
 
+logger = logging.getLogger(__name__)
+
 # Initialize extensions
 db = SQLAlchemy()
 
-def create_app():
+# Used when SECRET_KEY is not set; fine for sessions in development, never for signing admin tokens
+DEFAULT_SECRET_KEY = 'dev-secret-key-change-in-production-2025'
+
+def under_gunicorn():
+    """True inside a gunicorn master or worker (the arbiter sets SERVER_SOFTWARE)"""
+    return os.environ.get('SERVER_SOFTWARE', '').startswith('gunicorn')
+
+def under_flask_cli():
+    """True while a flask CLI command other than 'flask run' loads the app"""
+    ctx = click.get_current_context(silent=True)
+    return ctx is not None and ctx.info_name != 'run'
+
+def init_database():
+    """Create tables, apply pending migrations and build derived data (needs an app context)"""
+    try:
+        db.create_all()
+        logger.info("Database tables created successfully!")
+        
+        # Check if we need to migrate the database schema
+        from app.routes import check_database_schema, migrate_database
+        if not check_database_schema():
+            logger.info("Migrating database schema...")
+            if migrate_database():
+                logger.info("Database migration completed!")
+            else:
+                logger.error("Database migration failed!")
+        else:
+            logger.info("Database schema is up to date!")
+        
+        # Case-insensitive artist identity keys (merges old duplicates once)
+        from app.services.artist_service import ensure_artist_keys
+        ensure_artist_keys()
+        
+        # Full-text search index (falls back to LIKE search without FTS5)
+        from app.services.search_service import ensure_search_index
+        current_app.extensions['songs_fts'] = ensure_search_index()
+        
+        # Backfill per-artist monthly analytics on first run
+        from app.services.analytics_service import ensure_rollups
+        ensure_rollups()
+        return True
+            
+    except Exception as e:
+        logger.error("Error creating database tables: %s", e)
+        return False
+
+def warm_up(app):
+    """Compile templates and build the lookup indexes before the first request.
+
+    Called in a preloading gunicorn master so forked workers share the
+    result copy-on-write instead of each building it on its first request.
+    """
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        app.jinja_env.get_template(name)
+    
+    with app.app_context():
+        try:
+            from app.services.suggest_service import get_suggest_index
+            from app.services.fuzzy_service import get_artist_matcher
+            get_suggest_index()
+            get_artist_matcher()
+        except Exception as e:
+            logger.warning("Index warm-up skipped: %s", e)
+        # Pooled connections must not be shared with the forked workers
+        db.engine.dispose()
+
+def create_app(with_scheduler=None):
     app = Flask(__name__)
     app.config.from_object('config.Config')
     
     # Set secret key for sessions (CRITICAL FIX)
-    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production-2025'
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY') or DEFAULT_SECRET_KEY
+    
+    # JSON log records written by a background thread (LOG_LEVEL, LOG_LEVELS)
+    from app.utilis.logging_setup import configure_logging
+    configure_logging(app)
     
     # Initialize extensions with app
     db.init_app(app)
@@ -19,10 +92,46 @@ def create_app():
     # Register blueprints
     from app.routes import main_bp
     app.register_blueprint(main_bp)
+    from app.api_v2 import api_v2_bp
+    app.register_blueprint(api_v2_bp)
+    
+    # Register CLI commands (flask stats ...)
+    from app.cli import register_commands
+    register_commands(app)
     
     # Import models to ensure they are registered with SQLAlchemy
     from app import models
     
+    # Register commit listeners that keep in-memory indexes current
+    from app.services import catalog_events
+    
+    # Rendered song/artist cards shared across pages ({% cache %} tag)
+    from app.utilis.fragment_cache import FragmentCacheExtension
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.jinja_env.fragment_cache.size = app.config.get('FRAGMENT_CACHE_SIZE', 2048)
+    from app.services.cache_service import init_fragment_version
+    init_fragment_version(app)
+    
+    # Fingerprinted CSS/JS bundles (asset_url() in templates)
+    from app.utilis.assets import init_assets
+    init_assets(app)
+    
+    # gzip/brotli for HTML and JSON (reuses compressed bodies of identical responses)
+    from app.utilis.compression import init_compression
+    init_compression(app)
+    
+    # Per-endpoint latency, SQL and template timings (/metrics, Server-Timing)
+    from app.utilis.metrics import init_metrics
+    init_metrics(app)
+    
+    # Per-client token buckets and in-flight caps for the expensive endpoints
+    from app.utilis.rate_limit import init_rate_limits
+    init_rate_limits(app)
+    
+    # Opt-in single-request profiles (PROFILER_ENABLED, /admin/profiles)
+    from app.utilis.profiler import init_profiler
+    init_profiler(app)
+    
     # Add custom Jinja2 filters
     @app.template_filter('number_format')
     def number_format(value):
@@ -39,88 +148,26 @@ def create_app():
             return text
         return text[:length] + '...'
     
-    # Initialize scheduler
-    scheduler = BackgroundScheduler(daemon=True)
-    
-    def scheduled_update():
-        with app.app_context():
-            try:
-                from app.services.youtube_service import YouTubeService
-                from app.services.gemini_service import GeminiService
-                
-                youtube_service = YouTubeService()
-                
-                # Fetch new videos
-                print("🎵 Starting scheduled music update...")
-                videos = youtube_service.search_kenyan_music()
-                saved_count = youtube_service.save_videos_to_db(videos)
-                
-                print(f"✅ Scheduled update: Added {saved_count} new songs")
-                
-                # Generate images for new songs without images (if Gemini is available)
-                if saved_count > 0:
-                    try:
-                        gemini_service = GeminiService()
-                        from app.models import Song
-                        
-                        # Get the newly added songs
-                        new_songs = Song.query.order_by(Song.created_at.desc()).limit(saved_count).all()
-                        images_generated = 0
-                        
-                        for song in new_songs:
-                            if not song.image_url:
-                                image_url = gemini_service.generate_image(
-                                    song.title, 
-                                    song.artist.name, 
-                                    song.release_date.strftime('%Y-%m-%d')
-                                )
-                                if image_url:
-                                    song.image_url = image_url
-                                    images_generated += 1
-                        
-                        db.session.commit()
-                        print(f"🎨 Generated {images_generated} new images")
-                        
-                    except Exception as gemini_error:
-                        print(f"⚠️ Gemini image generation skipped: {gemini_error}")
-                
-                print("✅ Scheduled update completed successfully!")
-                
-            except Exception as e:
-                print(f"❌ Error in scheduled update: {str(e)}")
-    
-    # Schedule the job
-    try:
-        scheduler.add_job(
-            func=scheduled_update,
-            trigger="interval",
-            hours=app.config.get('SCHEDULER_INTERVAL_HOURS', 6),  # Default to 6 hours
-            id='update_music_data'
-        )
-        scheduler.start()
-        print(f"⏰ Scheduler started successfully (runs every {app.config.get('SCHEDULER_INTERVAL_HOURS', 6)} hours)")
-    except Exception as e:
-        print(f"❌ Error starting scheduler: {e}")
-    
-    # Create tables and handle database migration
+    # Schema work is a one-time step (flask init-db); DB_AUTO_INIT runs it on
+    # every start for local development
     with app.app_context():
-        try:
-            db.create_all()
-            print("✅ Database tables created successfully!")
-            
-            # Check if we need to migrate the database schema
-            from app.routes import check_database_schema, migrate_database
-            if not check_database_schema():
-                print("🔄 Migrating database schema...")
-                if migrate_database():
-                    print("✅ Database migration completed!")
-                else:
-                    print("❌ Database migration failed!")
-            else:
-                print("✅ Database schema is up to date!")
-                
-        except Exception as e:
-            print(f"❌ Error creating database tables: {e}")
+        if app.config.get('DB_AUTO_INIT', True):
+            init_database()
+        else:
+            from app.services.search_service import search_index_exists
+            app.extensions['songs_fts'] = search_index_exists()
+    
+    # Background jobs; only the holder of the database lease runs them. Under
+    # gunicorn each worker starts its own after fork (gunicorn.conf.py), so a
+    # preloading master never forks with scheduler threads running. CLI
+    # commands (init-db, catalog, ...) never schedule; 'flask scheduler'
+    # runs the jobs itself
+    if with_scheduler is None:
+        with_scheduler = (app.config.get('SCHEDULER_ENABLED', True) and not under_gunicorn()
+                          and not under_flask_cli())
+    if with_scheduler:
+        from app.scheduler import start_scheduler
+        start_scheduler(app)
 
     @app.template_filter('days_ago')
     def days_ago_filter(dt):
@@ -0,0 +1,82 @@
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from app import db
+from app.services.api_service import (
+    ARTIST_FIELDS, DEFAULT_ARTIST_FIELDS, DEFAULT_SONG_FIELDS, SONG_FIELDS, ApiError, dumps,
+    iter_songs_ndjson, page_artists, page_songs, parse_datetime, parse_fields, parse_limit, parse_order
+)
+from app.services.artist_service import find_artist
+from app.services.cache_service import conditional_view
+
+api_v2_bp = Blueprint('api_v2', __name__, url_prefix='/api/v2')
+
+
+@api_v2_bp.errorhandler(ApiError)
+def bad_request(error):
+    return jsonify({'error': str(error)}), 400
+
+
+def _json(payload):
+    return Response(dumps(payload), mimetype='application/json')
+
+
+def _song_filters():
+    """Filters shared by the paged and the streaming song endpoints"""
+    filters = {
+        'genre': request.args.get('genre') or None,
+        'released_after': parse_datetime(request.args.get('released_after'), 'released_after'),
+        'released_before': parse_datetime(request.args.get('released_before'), 'released_before'),
+        'updated_since': parse_datetime(request.args.get('updated_since'), 'updated_since'),
+    }
+    artist_id = request.args.get('artist_id', type=int)
+    name = request.args.get('artist')
+    if name and artist_id is None:
+        artist = find_artist(name)
+        # An unknown artist matches no songs rather than all of them
+        artist_id = artist.id if artist else -1
+    filters['artist_id'] = artist_id
+    return filters
+
+
+@api_v2_bp.route('/songs')
+@conditional_view(max_age=60, stale_while_revalidate=300)
+def songs():
+    """A page of songs: ?limit, cursor, fields, order=release|updated and filters"""
+    fields = parse_fields(request.args.get('fields'), SONG_FIELDS, DEFAULT_SONG_FIELDS)
+    with db.engine.connect() as conn:
+        data, next_cursor = page_songs(
+            conn, fields,
+            limit=parse_limit(request.args.get('limit')),
+            cursor=request.args.get('cursor'),
+            order=parse_order(request.args.get('order')),
+            **_song_filters()
+        )
+    return _json({'data': data, 'next_cursor': next_cursor})
+
+
+@api_v2_bp.route('/songs.ndjson')
+@conditional_view(max_age=60, stale_while_revalidate=300)
+def export_songs():
+    """Every matching song, one JSON object per line, streamed in batches"""
+    fields = parse_fields(request.args.get('fields'), SONG_FIELDS, DEFAULT_SONG_FIELDS)
+    order = parse_order(request.args.get('order'))
+    filters = _song_filters()
+    return Response(
+        stream_with_context(iter_songs_ndjson(db.engine, fields, order=order, **filters)),
+        mimetype='application/x-ndjson'
+    )
+
+
+@api_v2_bp.route('/artists')
+@conditional_view(max_age=300)
+def artists():
+    """A page of artists by id: ?limit, cursor, fields, genre, updated_since"""
+    fields = parse_fields(request.args.get('fields'), ARTIST_FIELDS, DEFAULT_ARTIST_FIELDS)
+    with db.engine.connect() as conn:
+        data, next_cursor = page_artists(
+            conn, fields,
+            limit=parse_limit(request.args.get('limit')),
+            cursor=request.args.get('cursor'),
+            genre=request.args.get('genre') or None,
+            updated_since=parse_datetime(request.args.get('updated_since'), 'updated_since')
+        )
+    return _json({'data': data, 'next_cursor': next_cursor})
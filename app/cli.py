@@ -0,0 +1,204 @@
+import click
+from flask.cli import AppGroup, with_appcontext
+
+stats_cli = AppGroup('stats', help='Platform statistics commands.')
+
+
+@stats_cli.command('refresh')
+def refresh_stats_command():
+    """Recompute the materialized platform statistics."""
+    from app.services.stats_service import refresh_stats
+
+    stats = refresh_stats()
+    click.echo(f"Statistics refreshed: {stats.total_songs} songs, "
+               f"{stats.total_artists} artists, {stats.total_views:,} views")
+
+
+trending_cli = AppGroup('trending', help='Trending score commands.')
+
+
+@trending_cli.command('refresh')
+def refresh_trending_command():
+    """Snapshot view counts and recompute trending scores."""
+    from app.services.trending_service import refresh_trending
+
+    result = refresh_trending()
+    click.echo(f"Refreshed {result['songs_updated']} of {result['songs_checked']} songs "
+               f"with {result['api_calls']} videos.list calls")
+
+
+catalog_cli = AppGroup('catalog', help='Catalog maintenance commands.')
+
+
+@catalog_cli.command('archive')
+@click.option('--days', type=int, default=None, help='Archive songs released more than this many days ago.')
+@click.option('--chunk-size', type=int, default=None, help='Rows moved per transaction.')
+def archive_command(days, chunk_size):
+    """Move expired songs into the archive table."""
+    from app.services.retention_service import archive_expired_songs
+
+    result = archive_expired_songs(max_age_days=days, chunk_size=chunk_size)
+    click.echo(f"Archived {result['archived_count']} songs in {result['chunks']} chunks "
+               f"({result['rows_per_second']} rows/s)")
+
+
+@catalog_cli.command('import-songs')
+@click.argument('source', type=click.File('rb'))
+@click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']), default=None,
+              help='Input format (defaults to the file extension, else ndjson).')
+@click.option('--chunk-size', type=int, default=None, help='Rows committed per transaction.')
+def import_songs_command(source, fmt, chunk_size):
+    """Import songs from an NDJSON or CSV file ('-' for stdin)."""
+    from app.services.import_service import import_songs, iter_rows
+
+    if fmt is None:
+        fmt = 'csv' if source.name.lower().endswith('.csv') else 'ndjson'
+
+    result = import_songs(iter_rows(source, fmt), chunk_size=chunk_size)
+    click.echo(f"Imported {result['added_count']} of {result['rows_read']} rows "
+               f"({result['duplicate_count']} duplicates, {result['error_count']} errors, "
+               f"{result['artists_created']} new artists) at {result['rows_per_second']} rows/s")
+    for error in result['errors']:
+        click.echo(f"  {error}", err=True)
+    if result['aborted']:
+        raise click.ClickException('Import stopped early')
+
+
+@catalog_cli.command('export')
+@click.argument('path', type=click.Path(dir_okay=False, writable=True))
+def export_snapshot_command(path):
+    """Write a compressed catalog snapshot (artists and aliases, songs, history, channels, stats)."""
+    from app.services.snapshot_service import export_snapshot
+
+    result = export_snapshot(path)
+    rows = ', '.join(f"{count} {table}" for table, count in result['rows'].items())
+    click.echo(f"Exported {rows} in {result['duration_seconds']}s")
+
+
+@catalog_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--replace', is_flag=True, help='Delete existing catalog rows before restoring.')
+def import_snapshot_command(path, replace):
+    """Restore a snapshot written by 'flask catalog export'."""
+    from app.services.snapshot_service import SnapshotError, import_snapshot
+
+    try:
+        result = import_snapshot(path, replace=replace)
+    except SnapshotError as e:
+        raise click.ClickException(str(e))
+    rows = ', '.join(f"{count} {table}" for table, count in result['rows'].items())
+    click.echo(f"Restored {rows} in {result['duration_seconds']}s")
+
+
+@catalog_cli.command('verify')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def verify_snapshot_command(path):
+    """Check a snapshot's checksum without restoring it."""
+    from app.services.snapshot_service import SnapshotError, verify_snapshot
+
+    try:
+        counts = verify_snapshot(path)
+    except SnapshotError as e:
+        raise click.ClickException(str(e))
+    click.echo('Snapshot OK: ' + ', '.join(f"{count} {table}" for table, count in counts.items()))
+
+
+assets_cli = AppGroup('assets', help='Static asset commands.')
+
+
+@assets_cli.command('build')
+def build_assets_command():
+    """Write fingerprinted, precompressed CSS/JS bundles to static/dist."""
+    from flask import current_app
+    from app.utilis.assets import brotli, build_assets
+
+    manifest = build_assets(current_app.static_folder)
+    click.echo(f"Built {len(manifest)} assets (gzip{', brotli' if brotli else ''})")
+
+
+crawl_cli = AppGroup('crawl', help='Distributed YouTube crawl commands.')
+
+
+@crawl_cli.command('enqueue')
+@click.option('--query', 'queries', multiple=True, help='Search query (repeatable; defaults to the built-in list).')
+def crawl_enqueue_command(queries):
+    """Create a crawl run with one work item per search query."""
+    from app.services.crawl_service import enqueue_crawl
+
+    result = enqueue_crawl(list(queries) or None)
+    click.echo(f"Enqueued run {result['run_id']} with {result['items']} queries")
+
+
+@crawl_cli.command('work')
+@click.option('--worker-index', type=int, default=0, help='This worker\'s index, 0-based (selects its API keys).')
+@click.option('--worker-count', type=int, default=None, help='Total workers sharing the API keys.')
+@click.option('--max-items', type=int, default=None, help='Stop after this many queries.')
+def crawl_work_command(worker_index, worker_count, max_items):
+    """Claim and crawl queued queries until none are left."""
+    from app.services.crawl_service import run_crawl_worker
+
+    summary = run_crawl_worker(worker_index=worker_index, worker_count=worker_count, max_items=max_items)
+    click.echo(f"Crawled {summary['items']} queries ({summary['failed']} failed), "
+               f"saved {summary['videos_saved']} songs in {summary['duration_seconds']}s")
+
+
+@crawl_cli.command('status')
+@click.option('--run-id', default=None, help='Crawl run (defaults to the latest).')
+def crawl_status_command(run_id):
+    """Show work item counts per status for a crawl run."""
+    from app.services.crawl_service import crawl_status
+
+    status = crawl_status(run_id)
+    if status is None:
+        click.echo('No crawl runs yet')
+        return
+    statuses = ', '.join(f"{name}: {count}" for name, count in sorted(status['statuses'].items()))
+    click.echo(f"Run {status['run_id']}: {statuses}; {status['videos_saved']} songs saved")
+
+
+@click.command('scheduler')
+@with_appcontext
+def scheduler_command():
+    """Run the scheduled jobs in the foreground (set SCHEDULER_ENABLED=0 on web workers)."""
+    from flask import current_app
+    from app.scheduler import run_scheduler
+
+    run_scheduler(current_app._get_current_object())
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create tables, migrate the schema and build the search index and rollups."""
+    from app import init_database
+
+    if not init_database():
+        raise click.ClickException('Database initialization failed')
+    click.echo('Database ready')
+
+
+profiler_cli = AppGroup('profiler', help='Request profiler commands.')
+
+
+@profiler_cli.command('token')
+def profiler_token_command():
+    """Print a signed token for the X-Profile header or /admin/profiles?token=."""
+    from flask import current_app
+    from app.utilis.profiler import make_token, profiler_secret
+
+    if profiler_secret(current_app) is None:
+        raise click.ClickException('Set PROFILER_SECRET or SECRET_KEY (not the default) to sign tokens')
+    if not current_app.config.get('PROFILER_ENABLED'):
+        click.echo('Note: PROFILER_ENABLED is off; set it on the server to use the token', err=True)
+    click.echo(make_token(current_app))
+
+
+def register_commands(app):
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(trending_cli)
+    app.cli.add_command(catalog_cli)
+    app.cli.add_command(assets_cli)
+    app.cli.add_command(scheduler_command)
+    app.cli.add_command(crawl_cli)
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(profiler_cli)
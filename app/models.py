@@ -1,15 +1,24 @@
+import logging
 from app import db
 from datetime import datetime
-import google.generativeai as genai
 from flask import current_app
 import os
-from datetime import timezone
+from datetime import timedelta, timezone
+from sqlalchemy.orm import validates
+from app.utilis.helpers import artist_name_key
+
+logger = logging.getLogger(__name__)
+
+def _default_name_key(context):
+    return artist_name_key(context.get_current_parameters().get('name'))
 
 class Artist(db.Model):
     __tablename__ = 'artists'
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
+    # Case/spacing-insensitive identity (see app.utilis.helpers.artist_name_key)
+    name_key = db.Column(db.String(100), unique=True, index=True, default=_default_name_key)
     description = db.Column(db.Text, nullable=True)
     genre = db.Column(db.String(100), nullable=True)
     location = db.Column(db.String(100), nullable=True)
@@ -19,11 +28,18 @@ class Artist(db.Model):
     
     # Relationship
     songs = db.relationship('Song', backref='artist', lazy=True, cascade='all, delete-orphan')
+    aliases = db.relationship('ArtistAlias', backref='artist', lazy=True, cascade='all, delete-orphan')
+    
+    @validates('name')
+    def _set_name_key(self, key, name):
+        self.name_key = artist_name_key(name)
+        return name
     
     def __repr__(self):
         return f'<Artist {self.name}>'
     
-    def to_dict(self):
+    def to_dict(self, song_count=None):
+        """Pass song_count when it was already counted (e.g. in a grouped query)"""
         return {
             'id': self.id,
             'name': self.name,
@@ -31,7 +47,7 @@ class Artist(db.Model):
             'genre': self.genre,
             'location': self.location,
             'is_verified': self.is_verified,
-            'song_count': len(self.songs),
+            'song_count': self.get_song_count() if song_count is None else song_count,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
@@ -43,7 +59,7 @@ class Artist(db.Model):
             
             gemini_service = GeminiService()
             if not gemini_service.is_available():
-                print("⚠️ Gemini service not available")
+                logger.warning("Gemini service not available")
                 return None
                 
             # Get artist context from their songs
@@ -55,50 +71,88 @@ class Artist(db.Model):
                 self.updated_at = datetime.utcnow()
                 db.session.commit()
                 
-                print(f"✅ Generated AI description for {self.name}")
+                logger.info("Generated AI description for %s", self.name)
                 return self.description
                 
         except Exception as e:
-            print(f"❌ Error generating description for {self.name}: {e}")
+            logger.error("Error generating description for %s: %s", self.name, e)
             return None
         
         return None
     
     def get_top_songs(self, limit=5):
-        """Get top songs by view count or recent releases"""
-        return sorted(self.songs, key=lambda x: x.view_count, reverse=True)[:limit]
+        """Get top songs by view count"""
+        return Song.query.filter_by(artist_id=self.id).order_by(
+            Song.view_count.desc()
+        ).limit(limit).all()
     
     def get_recent_songs(self, limit=5):
         """Get most recent songs"""
-        return sorted(self.songs, key=lambda x: x.release_date, reverse=True)[:limit]
+        return Song.query.filter_by(artist_id=self.id).order_by(
+            Song.release_date.desc()
+        ).limit(limit).all()
     
     def get_songs_count_by_year(self):
         """Get song count by year for analytics"""
-        from collections import defaultdict
-        year_counts = defaultdict(int)
-        for song in self.songs:
-            year = song.release_date.year
-            year_counts[year] += 1
-        return dict(year_counts)
+        year = db.extract('year', Song.release_date)
+        rows = db.session.query(year, db.func.count(Song.id)).filter(
+            Song.artist_id == self.id
+        ).group_by(year).order_by(year).all()
+        return {int(y): count for y, count in rows}
+    
+    def get_song_count(self):
+        """Count songs without loading them"""
+        return db.session.query(db.func.count(Song.id)).filter(Song.artist_id == self.id).scalar()
+    
+    def get_summary_stats(self, recent_days=30):
+        """Song count, recent releases, views and latest release in one aggregate query"""
+        cutoff = datetime.utcnow() - timedelta(days=recent_days)
+        row = db.session.query(
+            db.func.count(Song.id),
+            db.func.count(Song.id).filter(Song.release_date >= cutoff),
+            db.func.coalesce(db.func.max(Song.view_count), 0),
+            db.func.coalesce(db.func.sum(Song.view_count), 0),
+            db.func.max(Song.release_date)
+        ).filter(Song.artist_id == self.id).one()
+        
+        latest_release = row[4]
+        if isinstance(latest_release, str):
+            # SQLite returns max() of a DATETIME column as text
+            latest_release = datetime.fromisoformat(latest_release)
+        
+        return {
+            'song_count': row[0],
+            'recent_count': row[1],
+            'max_views': row[2],
+            'total_views': row[3],
+            'latest_release': latest_release
+        }
 
 class Song(db.Model):
     __tablename__ = 'songs'
+    __table_args__ = (
+        # Artist pages sort one artist's songs by views or release date
+        db.Index('ix_songs_artist_views', 'artist_id', 'view_count'),
+        db.Index('ix_songs_artist_release', 'artist_id', 'release_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     artist_id = db.Column(db.Integer, db.ForeignKey('artists.id'), nullable=False)
-    release_date = db.Column(db.DateTime, nullable=False)
+    release_date = db.Column(db.DateTime, nullable=False, index=True)
     youtube_url = db.Column(db.String(500), nullable=False)
     youtube_id = db.Column(db.String(50), unique=True, nullable=False)
     thumbnail_url = db.Column(db.String(500))
     image_url = db.Column(db.String(500))
-    view_count = db.Column(db.Integer, default=0)
+    view_count = db.Column(db.Integer, default=0, index=True)
     like_count = db.Column(db.Integer, default=0)
     duration = db.Column(db.String(20), nullable=True)  # e.g., "3:45"
     genre = db.Column(db.String(100), nullable=True)
     is_explicit = db.Column(db.Boolean, default=False)
+    trending_score = db.Column(db.Float, default=0, index=True)  # time-decayed views/hour
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Indexed for incremental sync (/api/v2/songs?order=updated&updated_since=...)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     def __init__(self, **kwargs):
         # Ensure release_date is timezone-aware if provided
@@ -143,7 +197,7 @@ class Song(db.Model):
             return description
                 
         except Exception as e:
-            print(f"❌ Error generating song description for {self.title}: {e}")
+            logger.error("Error generating song description for %s: %s", self.title, e)
             return None
         
         return None
@@ -168,18 +222,300 @@ class Song(db.Model):
         """Check if song was released in the last N days"""
         return self.get_days_since_release() <= days
 
+class ArchivedSong(db.Model):
+    """Songs moved out of the hot songs table by the retention job.
+
+    Keeps the original song id and a copy of the artist name so archived
+    rows stay readable after the artist is removed. SQLite may hand a freed
+    song id to a new song, so song_id is not unique here.
+    """
+    __tablename__ = 'archived_songs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    song_id = db.Column(db.Integer, nullable=False, index=True)  # original songs.id
+    title = db.Column(db.String(200), nullable=False)
+    artist_id = db.Column(db.Integer, index=True)
+    artist_name = db.Column(db.String(100))
+    release_date = db.Column(db.DateTime, nullable=False, index=True)
+    youtube_url = db.Column(db.String(500), nullable=False)
+    youtube_id = db.Column(db.String(50), nullable=False, index=True)
+    thumbnail_url = db.Column(db.String(500))
+    image_url = db.Column(db.String(500))
+    view_count = db.Column(db.Integer, default=0)
+    like_count = db.Column(db.Integer, default=0)
+    duration = db.Column(db.String(20), nullable=True)
+    genre = db.Column(db.String(100), nullable=True)
+    is_explicit = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    # Columns copied verbatim from songs (songs.id goes to song_id)
+    SONG_COLUMNS = (
+        'title', 'artist_id', 'release_date', 'youtube_url', 'youtube_id',
+        'thumbnail_url', 'image_url', 'view_count', 'like_count', 'duration',
+        'genre', 'is_explicit', 'created_at', 'updated_at'
+    )
+    
+    def __repr__(self):
+        return f'<ArchivedSong {self.title}>'
+
 # Analytics and Helper Models
+class SongViewHistory(db.Model):
+    """View and like count snapshots for one song.
+
+    Samples are stored as delta-encoded varint blobs (see
+    app.utilis.delta_encoding). The last sample is kept in plain columns so
+    a new sample is appended without decoding the history.
+    """
+    __tablename__ = 'song_view_history'
+    
+    song_id = db.Column(db.Integer, db.ForeignKey('songs.id'), primary_key=True)
+    sample_count = db.Column(db.Integer, default=0)
+    last_sampled_at = db.Column(db.Integer)   # unix seconds
+    last_views = db.Column(db.Integer)
+    last_likes = db.Column(db.Integer)
+    timestamps = db.Column(db.LargeBinary, default=b'')
+    views = db.Column(db.LargeBinary, default=b'')
+    likes = db.Column(db.LargeBinary, default=b'')
+    
+    def append(self, sampled_at, views, likes):
+        """Append one sample"""
+        from app.utilis.delta_encoding import encode_deltas
+        
+        self.timestamps = (self.timestamps or b'') + encode_deltas([sampled_at], self.last_sampled_at or 0)
+        self.views = (self.views or b'') + encode_deltas([views], self.last_views or 0)
+        self.likes = (self.likes or b'') + encode_deltas([likes], self.last_likes or 0)
+        self.last_sampled_at = sampled_at
+        self.last_views = views
+        self.last_likes = likes
+        self.sample_count = (self.sample_count or 0) + 1
+    
+    def samples(self):
+        """Return [(unix seconds, views, likes)] oldest first"""
+        from app.utilis.delta_encoding import decode_deltas
+        
+        return list(zip(decode_deltas(self.timestamps), decode_deltas(self.views), decode_deltas(self.likes)))
+
+class ArtistAlias(db.Model):
+    """Maps a YouTube channel id or an alternate name spelling to an artist.
+
+    Name aliases store the artist_name_key of the spelling, so every casing
+    of a renamed channel resolves to the same canonical artist.
+    """
+    __tablename__ = 'artist_aliases'
+    __table_args__ = (
+        db.Index('ix_artist_aliases_kind_value', 'kind', 'value', unique=True),
+    )
+    
+    CHANNEL = 'channel'
+    NAME = 'name'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    artist_id = db.Column(db.Integer, db.ForeignKey('artists.id'), nullable=False, index=True)
+    kind = db.Column(db.String(20), nullable=False)
+    value = db.Column(db.String(200), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ArtistAlias {self.kind}:{self.value}>'
+
+class ArtistMonthlyRollup(db.Model):
+    """Per-artist, per-month counters kept up to date on every catalog commit.
+
+    songs_released counts songs by release month; views_gained counts view
+    count increases in the month they were recorded. Rows are history and
+    are not reduced when songs are archived.
+    """
+    __tablename__ = 'artist_monthly_rollups'
+    
+    artist_id = db.Column(db.Integer, db.ForeignKey('artists.id'), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)  # 'YYYY-MM'
+    songs_released = db.Column(db.Integer, default=0)
+    views_gained = db.Column(db.Integer, default=0)
+    
+    def to_dict(self):
+        return {
+            'month': self.month,
+            'songs_released': self.songs_released,
+            'views_gained': self.views_gained
+        }
+
+class ChannelInfo(db.Model):
+    """YouTube channel country and subscriber count, cached across crawls"""
+    __tablename__ = 'channel_info'
+    
+    channel_id = db.Column(db.String(50), primary_key=True)
+    country = db.Column(db.String(10))
+    subscriber_count = db.Column(db.Integer, default=0)
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f'<ChannelInfo {self.channel_id}>'
+
+class SchedulerLease(db.Model):
+    """Named lock held by one process at a time, kept alive by heartbeats.
+
+    The holder renews expires_at on every heartbeat; once it lapses any
+    other process may take the lease over (see app.scheduler).
+    """
+    __tablename__ = 'scheduler_leases'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(200), nullable=False)
+    acquired_at = db.Column(db.DateTime, default=datetime.utcnow)
+    heartbeat_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f'<SchedulerLease {self.name} held by {self.holder}>'
+    
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'holder': self.holder,
+            'acquired_at': self.acquired_at.isoformat() if self.acquired_at else None,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            'expires_at': self.expires_at.isoformat()
+        }
+
+class CrawlWorkItem(db.Model):
+    """One search query of a crawl run, claimed by workers with expiring leases"""
+    __tablename__ = 'crawl_work_items'
+    __table_args__ = (
+        db.Index('ix_crawl_work_items_run_query', 'run_id', 'query', unique=True),
+    )
+    
+    PENDING = 'pending'
+    LEASED = 'leased'
+    DONE = 'done'
+    FAILED = 'failed'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.String(50), nullable=False, index=True)
+    query = db.Column(db.String(200), nullable=False)
+    status = db.Column(db.String(10), nullable=False, default=PENDING, index=True)
+    lease_holder = db.Column(db.String(200))
+    lease_expires_at = db.Column(db.DateTime, index=True)
+    attempts = db.Column(db.Integer, default=0)
+    videos_found = db.Column(db.Integer)
+    videos_saved = db.Column(db.Integer)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<CrawlWorkItem {self.run_id} {self.query!r} {self.status}>'
+
+class IngestionRun(db.Model):
+    """One YouTube ingestion run with its timing, quota and filter telemetry.
+
+    The headline counts are columns for listing; the breakdowns (stages,
+    HTTP calls per endpoint and key, channel cache, rejections, per-query
+    yield) are kept in the telemetry JSON (see app.services.ingestion_service).
+    """
+    __tablename__ = 'ingestion_runs'
+
+    RUNNING = 'running'
+    SUCCESS = 'success'
+    ERROR = 'error'
+
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(20), nullable=False)   # scheduled, manual, crawl
+    status = db.Column(db.String(10), nullable=False, default=RUNNING)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    finished_at = db.Column(db.DateTime)
+    duration_seconds = db.Column(db.Float)
+    videos_found = db.Column(db.Integer, default=0)
+    videos_saved = db.Column(db.Integer, default=0)
+    images_generated = db.Column(db.Integer, default=0)
+    api_calls = db.Column(db.Integer, default=0)
+    quota_units = db.Column(db.Integer, default=0)
+    error = db.Column(db.Text)
+    telemetry = db.Column(db.JSON)
+
+    def __repr__(self):
+        return f'<IngestionRun {self.id} {self.source} {self.status}>'
+
+    def to_dict(self, with_telemetry=True):
+        data = {
+            'id': self.id,
+            'source': self.source,
+            'status': self.status,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'duration_seconds': self.duration_seconds,
+            'videos_found': self.videos_found,
+            'videos_saved': self.videos_saved,
+            'images_generated': self.images_generated,
+            'api_calls': self.api_calls,
+            'quota_units': self.quota_units,
+            'error': self.error
+        }
+        if with_telemetry:
+            data['telemetry'] = self.telemetry or {}
+        return data
+
 class MusicStats(db.Model):
+    """Single-row materialized platform statistics (id=1).
+
+    Counters are adjusted incrementally when catalog changes commit (see
+    app.services.stats_service); update_stats() recomputes everything.
+    """
     __tablename__ = 'music_stats'
     
+    TOP_ARTISTS_LIMIT = 12
+    MOST_VIEWED_LIMIT = 10
+    
     id = db.Column(db.Integer, primary_key=True)
     total_songs = db.Column(db.Integer, default=0)
     total_artists = db.Column(db.Integer, default=0)
     total_views = db.Column(db.Integer, default=0)
     most_popular_artist = db.Column(db.String(100))
     most_viewed_song = db.Column(db.String(200))
+    top_artists = db.Column(db.JSON)   # [{'id', 'name', 'song_count'}] by song count
+    most_viewed = db.Column(db.JSON)   # [{'id', 'title', 'artist', 'view_count', 'youtube_url'}]
     last_updated = db.Column(db.DateTime, default=datetime.utcnow)
     
+    @classmethod
+    def get_current(cls):
+        """Return the stats row, computing it the first time it is needed"""
+        stats = db.session.get(cls, 1)
+        if stats is None:
+            stats = cls(id=1)
+            db.session.add(stats)
+            stats.update_stats()
+        return stats
+    
+    @staticmethod
+    def top_artists_query(limit):
+        from sqlalchemy import func, select
+        song_count = func.count(Song.id).label('song_count')
+        return select(Artist.id, Artist.name, song_count).join(
+            Song, Song.artist_id == Artist.id
+        ).group_by(Artist.id).order_by(song_count.desc(), Artist.name).limit(limit)
+    
+    @staticmethod
+    def popular_artist_query():
+        from sqlalchemy import func, select
+        return select(Artist.name).join(Song, Song.artist_id == Artist.id).group_by(
+            Artist.id
+        ).order_by(func.sum(Song.view_count).desc()).limit(1)
+    
+    @staticmethod
+    def most_viewed_query(limit):
+        from sqlalchemy import select
+        return select(
+            Song.id, Song.title, Artist.name.label('artist'), Song.view_count, Song.youtube_url
+        ).join(Artist, Song.artist_id == Artist.id).order_by(
+            Song.view_count.desc(), Song.id.desc()
+        ).limit(limit)
+    
+    def set_top_lists(self, top_artists, most_viewed):
+        self.top_artists = [dict(row._mapping) for row in top_artists]
+        self.most_viewed = [dict(row._mapping) for row in most_viewed]
+        self.most_viewed_song = self.most_viewed[0]['title'] if self.most_viewed else None
+    
     def update_stats(self):
         """Update all music statistics"""
         from sqlalchemy import func
@@ -189,20 +525,30 @@ class MusicStats(db.Model):
         self.total_views = db.session.query(func.sum(Song.view_count)).scalar() or 0
         
         # Most popular artist (by total views)
-        popular_artist = db.session.query(
-            Artist.name, func.sum(Song.view_count).label('total_views')
-        ).join(Song).group_by(Artist.id).order_by(func.sum(Song.view_count).desc()).first()
-        
+        popular_artist = db.session.execute(self.popular_artist_query()).scalar()
         if popular_artist:
-            self.most_popular_artist = popular_artist[0]
+            self.most_popular_artist = popular_artist
         
-        # Most viewed song
-        most_viewed = Song.query.order_by(Song.view_count.desc()).first()
-        if most_viewed:
-            self.most_viewed_song = most_viewed.title
+        # Top artists by song count and most viewed songs
+        self.set_top_lists(
+            db.session.execute(self.top_artists_query(self.TOP_ARTISTS_LIMIT)).all(),
+            db.session.execute(self.most_viewed_query(self.MOST_VIEWED_LIMIT)).all()
+        )
         
         self.last_updated = datetime.utcnow()
         db.session.commit()
+    
+    def to_dict(self):
+        return {
+            'total_songs': self.total_songs or 0,
+            'total_artists': self.total_artists or 0,
+            'total_views': self.total_views or 0,
+            'most_popular_artist': self.most_popular_artist,
+            'most_viewed_song': self.most_viewed_song,
+            'top_artists': self.top_artists or [],
+            'most_viewed': self.most_viewed or [],
+            'last_updated': self.last_updated.isoformat() if self.last_updated else None
+        }
 
 class Genre(db.Model):
     __tablename__ = 'genres'
@@ -1,95 +1,98 @@
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
+import logging
+from flask import Blueprint, abort, current_app, render_template, request, jsonify, redirect, url_for, flash
 from app import db
-from app.models import Artist, Song
-from app.services.youtube_service import YouTubeService
-from app.services.gemini_service import GeminiService
+from app.models import Artist, IngestionRun, MusicStats, Song
+from app.services.search_service import SearchService
+from app.services.suggest_service import get_suggest_index
+from app.services.fuzzy_service import get_artist_matcher
+from app.services.stats_service import refresh_stats
+from app.services.trending_service import refresh_trending
+from app.services.retention_service import archive_expired_songs
+from app.services.import_service import import_songs, iter_rows
+from app.services.analytics_service import get_artist_analytics
+from app.services.artist_service import find_artist, resolve_artist
+from app.services.cache_service import cached_view, conditional_view, get_response_cache
+from app.utilis.admin import admin_required
+from app.utilis.helpers import extract_youtube_id
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import joinedload
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.wsgi import get_input_stream
 from datetime import datetime, timedelta, timezone
-import sqlite3
-import os
+
+logger = logging.getLogger(__name__)
 
 main_bp = Blueprint('main', __name__)
 
+def _pending_schema_changes():
+    """Columns and indexes defined on the models but missing from existing tables"""
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    missing_columns = []
+    missing_indexes = []
+    
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        missing_columns.extend(column for column in table.columns if column.name not in columns)
+        
+        indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        missing_indexes.extend(index for index in table.indexes if index.name not in indexes)
+    
+    return missing_columns, missing_indexes
+
+def _column_default_sql(column):
+    """Constant DEFAULT clause for ALTER TABLE, if the column has a scalar default"""
+    default = column.default
+    if default is None or not default.is_scalar:
+        return ''
+    value = default.arg
+    if isinstance(value, bool):
+        return f' DEFAULT {int(value)}'
+    if isinstance(value, (int, float)):
+        return f' DEFAULT {value}'
+    return " DEFAULT '{}'".format(str(value).replace("'", "''"))
+
 def check_database_schema():
-    """Check and update database schema if needed"""
+    """Check whether every model column and index exists in the database"""
     try:
-        # Test if new columns exist
-        test_artist = Artist.query.first()
-        if test_artist:
-            # This will fail if columns don't exist
-            _ = getattr(test_artist, 'description', None)
-            _ = getattr(test_artist, 'genre', None)
-            _ = getattr(test_artist, 'location', None)
-            _ = getattr(test_artist, 'is_verified', None)
-            _ = getattr(test_artist, 'updated_at', None)
-        return True
+        missing_columns, missing_indexes = _pending_schema_changes()
+        return not missing_columns and not missing_indexes
     except Exception:
         return False
 
 def migrate_database():
-    """Migrate database to add new columns"""
+    """Migrate database to add new columns and indexes"""
     try:
-        db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'instance', 'kenyan_music.db')
-        
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Check and add columns to artists table
-        cursor.execute("PRAGMA table_info(artists)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'description' not in columns:
-            cursor.execute('ALTER TABLE artists ADD COLUMN description TEXT')
-        
-        if 'genre' not in columns:
-            cursor.execute('ALTER TABLE artists ADD COLUMN genre VARCHAR(100)')
-        
-        if 'location' not in columns:
-            cursor.execute('ALTER TABLE artists ADD COLUMN location VARCHAR(100)')
+        missing_columns, missing_indexes = _pending_schema_changes()
         
-        if 'is_verified' not in columns:
-            cursor.execute('ALTER TABLE artists ADD COLUMN is_verified BOOLEAN DEFAULT FALSE')
+        with db.engine.begin() as conn:
+            for column in missing_columns:
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                conn.execute(text(
+                    f'ALTER TABLE {column.table.name} ADD COLUMN {column.name} '
+                    f'{column_type}{_column_default_sql(column)}'
+                ))
         
-        if 'updated_at' not in columns:
-            cursor.execute('ALTER TABLE artists ADD COLUMN updated_at DATETIME DEFAULT CURRENT_TIMESTAMP')
+        for index in missing_indexes:
+            index.create(db.engine, checkfirst=True)
         
-        # Check and add columns to songs table
-        cursor.execute("PRAGMA table_info(songs)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'like_count' not in columns:
-            cursor.execute('ALTER TABLE songs ADD COLUMN like_count INTEGER DEFAULT 0')
-        
-        if 'duration' not in columns:
-            cursor.execute('ALTER TABLE songs ADD COLUMN duration VARCHAR(20)')
-        
-        if 'genre' not in columns:
-            cursor.execute('ALTER TABLE songs ADD COLUMN genre VARCHAR(100)')
-        
-        if 'is_explicit' not in columns:
-            cursor.execute('ALTER TABLE songs ADD COLUMN is_explicit BOOLEAN DEFAULT FALSE')
-        
-        if 'updated_at' not in columns:
-            cursor.execute('ALTER TABLE songs ADD COLUMN updated_at DATETIME DEFAULT CURRENT_TIMESTAMP')
-        
-        conn.commit()
-        conn.close()
         return True
     except Exception as e:
-        print(f"Migration error: {e}")
+        logger.error("Migration error: %s", e)
         return False
 
 @main_bp.route('/')
+@conditional_view()
+@cached_view()
 def index():
     page = request.args.get('page', 1, type=int)
     
-    # Check and migrate database if needed
-    if not check_database_schema():
-        migrate_database()
-    
     try:
-        # Get basic stats with safe defaults
-        total_songs = Song.query.count() or 0
-        total_artists = Artist.query.count() or 0
+        # Counters and featured artists come from the materialized stats row
+        stats = MusicStats.get_current()
         
         # Songs from the last 7 days
         week_ago = datetime.now(timezone.utc) - timedelta(days=7)
@@ -98,10 +101,8 @@ def index():
         # Latest songs for display (limited to 8 for homepage)
         latest_songs = Song.query.order_by(Song.release_date.desc()).limit(8).all() or []
         
-        # Featured artists (artists with most songs) - FIXED QUERY
-        featured_artists = db.session.query(Artist).outerjoin(Song).group_by(Artist.id).order_by(
-            db.func.count(Song.id).desc()
-        ).limit(12).all() or []
+        # Featured artists (artists with most songs)
+        featured_artists = stats.top_artists or []
         
         # Get paginated songs for the main grid
         songs_paginated = Song.query.order_by(Song.release_date.desc()).paginate(
@@ -112,12 +113,12 @@ def index():
                              songs=songs_paginated,
                              latest_songs=latest_songs,
                              featured_artists=featured_artists,
-                             total_songs=total_songs,
-                             total_artists=total_artists,
+                             total_songs=stats.total_songs or 0,
+                             total_artists=stats.total_artists or 0,
                              new_this_week=new_this_week)
                              
     except Exception as e:
-        print(f"Error in index route: {e}")
+        logger.error("Error in index route: %s", e)
         return render_template('index.html', 
                              songs=[],
                              latest_songs=[],
@@ -127,6 +128,8 @@ def index():
                              new_this_week=0)
 
 @main_bp.route('/artist/<name>')
+@conditional_view()
+@cached_view()
 def artist_songs(name):
     """Show songs by specific artist"""
     if not name or name.strip() == "":
@@ -137,8 +140,16 @@ def artist_songs(name):
     per_page = 12
     
     try:
-        artist = Artist.query.filter_by(name=name).first()
+        artist = find_artist(name)
+        if artist and artist.name != name:
+            # Other casings and known aliases redirect to the canonical URL
+            return redirect(url_for('main.artist_songs', name=artist.name, page=page if page > 1 else None))
         if not artist:
+            # Resolve near-miss URLs like /artist/Nyashinsky to the real artist
+            match = get_artist_matcher().best_match(name)
+            if match:
+                return redirect(url_for('main.artist_songs', name=match[1], page=page if page > 1 else None))
+            
             flash(f'Artist "{name}" not found', 'warning')
             return redirect(url_for('main.artists_list'))
             
@@ -152,17 +163,18 @@ def artist_songs(name):
         return render_template('artist.html', 
                              artist=artist, 
                              songs=songs,
+                             artist_stats=artist.get_summary_stats(),
                              thirty_days_ago=thirty_days_ago)
         
     except Exception as e:
-        print(f"Error loading artist {name}: {e}")
+        logger.error("Error loading artist %s: %s", name, e)
         flash('Error loading artist page', 'error')
         return redirect(url_for('main.artists_list'))
 @main_bp.route('/artist/<name>/generate-description', methods=['POST'])
 def generate_artist_description(name):
     """Generate AI description for artist"""
     try:
-        artist = Artist.query.filter_by(name=name).first()
+        artist = find_artist(name)
         if not artist:
             return jsonify({
                 'success': False,
@@ -189,6 +201,8 @@ def generate_artist_description(name):
         }), 500
 
 @main_bp.route('/latest')
+@conditional_view()
+@cached_view()
 def latest_songs():
     """Show latest songs (last 30 days)"""
     page = request.args.get('page', 1, type=int)
@@ -205,54 +219,56 @@ def latest_songs():
     return render_template('latest.html', songs=songs)
 
 @main_bp.route('/trending')
+@conditional_view()
+@cached_view()
 def trending_songs():
-    """Show trending songs by view count"""
+    """Show trending songs by precomputed view velocity"""
     page = request.args.get('page', 1, type=int)
     per_page = 12
     
-    songs = Song.query.order_by(Song.view_count.desc()).paginate(
+    songs = Song.query.order_by(Song.trending_score.desc(), Song.view_count.desc()).paginate(
         page=page, per_page=per_page, error_out=False
     )
     
     return render_template('trending.html', songs=songs)
 
+@main_bp.route('/trending/refresh', methods=['POST'])
+@admin_required
+def refresh_trending_scores():
+    """Manual trigger to snapshot view counts and recompute trending scores"""
+    try:
+        result = refresh_trending()
+        return jsonify({
+            'success': True,
+            'message': f"Refreshed {result['songs_updated']} songs",
+            **result
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f'Error refreshing trending scores: {str(e)}'
+        }), 500
+
 @main_bp.route('/update', methods=['POST'])
 def update_songs():
     """Manual trigger to update songs"""
+    from app.services.youtube_service import YouTubeService
+    
     try:
-        youtube_service = YouTubeService()
-        
-        # Fetch new videos
-        videos = youtube_service.search_kenyan_music()
-        saved_count = youtube_service.save_videos_to_db(videos)
-        
-        # Try to generate images if Gemini service is available
-        images_generated = 0
-        try:
-            gemini_service = GeminiService()
-            new_songs = Song.query.order_by(Song.created_at.desc()).limit(saved_count).all()
-            
-            for song in new_songs:
-                if not song.image_url:
-                    image_url = gemini_service.generate_image(
-                        song.title, 
-                        song.artist.name, 
-                        song.release_date.strftime('%Y-%m-%d')
-                    )
-                    if image_url:
-                        song.image_url = image_url
-                        images_generated += 1
-            
-            db.session.commit()
-        except Exception as gemini_error:
-            print(f"Gemini image generation failed: {gemini_error}")
-            # Continue even if image generation fails
+        # Search, save and render images, recorded as an ingestion run
+        result = YouTubeService().update_music_library(source='manual', generate_images=True)
+        if result['status'] != 'success':
+            raise RuntimeError(result['message'])
         
+        saved_count = result['videos_saved']
+        images_generated = result['images_generated']
         return jsonify({
             'success': True,
             'message': f'Updated {saved_count} new songs and generated {images_generated} images',
             'saved_count': saved_count,
-            'images_generated': images_generated
+            'images_generated': images_generated,
+            'run_id': result['run_id']
         })
         
     except Exception as e:
@@ -262,8 +278,9 @@ def update_songs():
         }), 500
 
 @main_bp.route('/search')
+@conditional_view(max_age=60)
 def search_songs():
-    """Search songs by title or artist"""
+    """Search songs by title or artist, ranked by relevance"""
     query = request.args.get('q', '').strip()
     page = request.args.get('page', 1, type=int)
     per_page = 12
@@ -272,18 +289,18 @@ def search_songs():
         flash('Please enter a search term', 'warning')
         return redirect(url_for('main.index'))
     
-    songs = Song.query.join(Artist).filter(
-        db.or_(
-            Song.title.ilike(f'%{query}%'),
-            Artist.name.ilike(f'%{query}%')
-        )
-    ).order_by(Song.release_date.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    songs = SearchService().search_songs(query, page=page, per_page=per_page)
+    
+    # Offer close artist spellings when nothing matched
+    did_you_mean = []
+    if not songs.total:
+        did_you_mean = [name for _, name, _ in get_artist_matcher().match(query, limit=3)]
     
-    return render_template('search.html', songs=songs, query=query)
+    return render_template('search.html', songs=songs, query=query, did_you_mean=did_you_mean)
 
 @main_bp.route('/artists')
+@conditional_view()
+@cached_view()
 def artists_list():
     """List all artists with song counts - SIMPLE VERSION"""
     try:
@@ -298,49 +315,94 @@ def artists_list():
         return render_template('artists.html', artists=artists_with_counts)
         
     except Exception as e:
-        print(f"Error in artists_list: {e}")
+        logger.error("Error in artists_list: %s", e)
         # Ultimate fallback - simple list
         artists = Artist.query.order_by(Artist.name).all()
         return render_template('artists.html', artists=artists)
 
 @main_bp.route('/api/songs')
+@conditional_view(max_age=30, stale_while_revalidate=120)
 def api_songs():
     """JSON API endpoint for songs"""
     try:
-        songs = Song.query.order_by(Song.release_date.desc()).limit(50).all()
+        songs = Song.query.options(joinedload(Song.artist)).order_by(Song.release_date.desc()).limit(50).all()
         return jsonify([song.to_dict() for song in songs])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@main_bp.route('/api/suggest')
+@conditional_view(max_age=300, stale_while_revalidate=600)
+def api_suggest():
+    """Typeahead suggestions for the search box, served from the in-memory index"""
+    query = request.args.get('q', '').strip()
+    limit = request.args.get('limit', current_app.config.get('SUGGEST_LIMIT', 5), type=int)
+    limit = max(1, min(limit, 10))
+    
+    if not query:
+        return jsonify({'query': query, 'artists': [], 'songs': []})
+    
+    results = get_suggest_index().suggest(query[:100], limit=limit)
+    
+    # Fall back to typo-tolerant artist matches when no name starts with the query
+    if not results['artists'] and len(query) >= 3:
+        results['artists'] = [
+            {'id': artist_id, 'name': name}
+            for artist_id, name, _ in get_artist_matcher().match(query[:100], limit=limit)
+        ]
+    
+    return jsonify({
+        'query': query,
+        'artists': [
+            dict(artist, url=url_for('main.artist_songs', name=artist['name']))
+            for artist in results['artists']
+        ],
+        'songs': [
+            dict(song, url=url_for('main.search_songs', q=song['title']))
+            for song in results['songs']
+        ]
+    })
+
+@main_bp.route('/api/artist/<name>/analytics')
+@conditional_view(max_age=300)
+def api_artist_analytics(name):
+    """JSON analytics for one artist: summary, top songs and monthly rollup"""
+    artist = find_artist(name)
+    if not artist:
+        return jsonify({'error': 'Artist not found'}), 404
+    
+    try:
+        months = min(max(request.args.get('months', 12, type=int), 1), 120)
+        return jsonify(get_artist_analytics(artist, months=months))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @main_bp.route('/api/artists')
+@conditional_view(max_age=300)
 def api_artists():
     """JSON API endpoint for artists"""
     try:
-        artists = Artist.query.order_by(Artist.name).all()
-        return jsonify([artist.to_dict() for artist in artists])
+        # Song counts in the same grouped query instead of one per artist
+        artists_with_counts = db.session.query(
+            Artist,
+            db.func.count(Song.id).label('song_count')
+        ).outerjoin(Song).group_by(Artist.id).order_by(Artist.name).all()
+        return jsonify([artist.to_dict(song_count) for artist, song_count in artists_with_counts])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @main_bp.route('/cleanup-old', methods=['POST'])
+@admin_required
 def cleanup_old_songs():
-    """Remove songs older than 1 month"""
+    """Archive songs older than the retention window (default 1 month)"""
     try:
-        one_month_ago = datetime.now(timezone.utc) - timedelta(days=30)
-        
-        # Find old songs
-        old_songs = Song.query.filter(Song.release_date < one_month_ago).all()
-        deleted_count = len(old_songs)
-        
-        # Delete old songs
-        for song in old_songs:
-            db.session.delete(song)
-        
-        db.session.commit()
+        result = archive_expired_songs()
         
         return jsonify({
             'success': True,
-            'message': f'Removed {deleted_count} songs older than 1 month',
-            'deleted_count': deleted_count
+            'message': f"Archived {result['archived_count']} songs older than "
+                       f"{current_app.config.get('RETENTION_DAYS', 30)} days",
+            'deleted_count': result['archived_count'],
+            **result
         })
         
     except Exception as e:
@@ -353,6 +415,8 @@ def cleanup_old_songs():
 @main_bp.route('/search-manual', methods=['POST'])
 def search_manual():
     """Manual search with specific artists to avoid quota limits"""
+    from app.services.youtube_service import YouTubeService
+    
     try:
         youtube_service = YouTubeService()
         
@@ -413,12 +477,8 @@ def add_song():
                     'message': 'Song already exists in database'
                 })
             
-            # Find or create artist
-            artist = Artist.query.filter_by(name=artist_name).first()
-            if not artist:
-                artist = Artist(name=artist_name)
-                db.session.add(artist)
-                db.session.flush()
+            # Find or create artist (case/spelling-insensitive)
+            artist = resolve_artist(artist_name)
             
             # Create song
             song = Song(
@@ -448,61 +508,13 @@ def add_song():
     return render_template('add_song.html')
 
 @main_bp.route('/bulk-add-songs', methods=['POST'])
+@admin_required
 def bulk_add_songs():
     """Add multiple songs at once"""
     try:
         songs_data = request.json.get('songs', [])
-        added_count = 0
-        errors = []
-        
-        for i, song_data in enumerate(songs_data):
-            try:
-                title = song_data.get('title')
-                artist_name = song_data.get('artist')
-                youtube_url = song_data.get('youtube_url')
-                release_date = song_data.get('release_date')
-                
-                if not all([title, artist_name, youtube_url, release_date]):
-                    errors.append(f"Song {i+1}: Missing required fields")
-                    continue
-                
-                # Extract YouTube ID
-                youtube_id = extract_youtube_id(youtube_url)
-                if not youtube_id:
-                    errors.append(f"Song {i+1}: Invalid YouTube URL")
-                    continue
-                
-                # Check if song exists
-                existing_song = Song.query.filter_by(youtube_id=youtube_id).first()
-                if existing_song:
-                    errors.append(f"Song {i+1}: Already exists in database")
-                    continue
-                
-                # Find or create artist
-                artist = Artist.query.filter_by(name=artist_name).first()
-                if not artist:
-                    artist = Artist(name=artist_name)
-                    db.session.add(artist)
-                    db.session.flush()
-                
-                # Create song
-                song = Song(
-                    title=title,
-                    artist_id=artist.id,
-                    release_date=datetime.strptime(release_date, '%Y-%m-%d').replace(tzinfo=timezone.utc),
-                    youtube_url=youtube_url,
-                    youtube_id=youtube_id,
-                    thumbnail_url=f"https://img.youtube.com/vi/{youtube_id}/hqdefault.jpg"
-                )
-                
-                db.session.add(song)
-                added_count += 1
-                
-            except Exception as e:
-                errors.append(f"Song {i+1}: {str(e)}")
-                continue
-        
-        db.session.commit()
+        result = import_songs(songs_data)
+        added_count = result['added_count']
         
         response = {
             'success': True,
@@ -510,9 +522,11 @@ def bulk_add_songs():
             'added_count': added_count
         }
         
-        if errors:
-            response['errors'] = errors
-            response['message'] = f'Added {added_count} songs with {len(errors)} errors'
+        if result['error_count'] or result['duplicate_count']:
+            response['errors'] = result['errors']
+            response['duplicate_count'] = result['duplicate_count']
+            response['message'] = (f"Added {added_count} songs with {result['error_count']} errors "
+                                   f"and {result['duplicate_count']} duplicates")
         
         return jsonify(response)
         
@@ -523,62 +537,145 @@ def bulk_add_songs():
             'message': f'Error in bulk add: {str(e)}'
         }), 500
 
-def extract_youtube_id(url):
-    """Extract YouTube video ID from URL"""
-    import re
+@main_bp.route('/import-songs', methods=['POST'])
+@admin_required
+def import_songs_stream():
+    """Stream an NDJSON or CSV catalog of any size into the database
     
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu\.be\/)([^&]+)',
-        r'youtube\.com\/embed\/([^?]+)',
-        r'youtube\.com\/v\/([^?]+)'
-    ]
+    The format comes from ?format=csv|ndjson or the Content-Type header. The
+    body is read incrementally, so it may exceed MAX_CONTENT_LENGTH up to
+    IMPORT_MAX_BYTES; chunks committed before the cap is hit are kept.
+    """
+    fmt = request.args.get('format')
+    if not fmt:
+        fmt = 'csv' if request.mimetype == 'text/csv' else 'ndjson'
     
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    return None
+    try:
+        stream = get_input_stream(request.environ,
+                                  max_content_length=current_app.config['IMPORT_MAX_BYTES'])
+        result = import_songs(iter_rows(stream, fmt))
+        
+        return jsonify({
+            'success': not result['aborted'],
+            'message': f"Imported {result['added_count']} of {result['rows_read']} songs",
+            **result
+        })
+        
+    except RequestEntityTooLarge:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f"Import body exceeds {current_app.config['IMPORT_MAX_BYTES']} bytes"
+        }), 413
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f'Error importing songs: {str(e)}'
+        }), 500
 
 @main_bp.route('/stats')
+@conditional_view()
 def stats():
     """Show platform statistics"""
     try:
-        total_songs = Song.query.count() or 0
-        total_artists = Artist.query.count() or 0
-        total_views = db.session.query(db.func.sum(Song.view_count)).scalar() or 0
+        stats = MusicStats.get_current()
         
         # Recent activity
         week_ago = datetime.now(timezone.utc) - timedelta(days=7)
         new_this_week = Song.query.filter(Song.release_date >= week_ago).count() or 0
         
-        # Top artists by song count
-        top_artists = db.session.query(
-            Artist, 
-            db.func.count(Song.id).label('song_count')
-        ).join(Song).group_by(Artist.id).order_by(
-            db.func.count(Song.id).desc()
-        ).limit(10).all()
-        
-        # Most viewed songs
-        most_viewed = Song.query.order_by(Song.view_count.desc()).limit(10).all()
-        
         return render_template('stats.html',
-                            total_songs=total_songs,
-                            total_artists=total_artists,
-                            total_views=total_views,
+                            total_songs=stats.total_songs or 0,
+                            total_artists=stats.total_artists or 0,
+                            total_views=stats.total_views or 0,
                             new_this_week=new_this_week,
-                            top_artists=top_artists,
-                            most_viewed=most_viewed)
+                            top_artists=(stats.top_artists or [])[:10],
+                            most_viewed=stats.most_viewed or [],
+                            last_updated=stats.last_updated)
                             
     except Exception as e:
-        print(f"Error in stats route: {e}")
+        logger.error("Error in stats route: %s", e)
         return render_template('stats.html',
                             total_songs=0,
                             total_artists=0,
                             total_views=0,
                             new_this_week=0,
                             top_artists=[],
-                            most_viewed=[])
+                            most_viewed=[],
+                            last_updated=None)
+
+@main_bp.route('/admin/ingestion')
+@admin_required
+def ingestion_runs_page():
+    """Recent ingestion runs with stage timings, quota spend and per-query yield"""
+    from app.services.ingestion_service import STAGES, query_yields, recent_runs
+    
+    runs = recent_runs(limit=min(request.args.get('limit', 20, type=int), 200), source=request.args.get('source'))
+    run_id = request.args.get('run', type=int)
+    selected = next((run for run in runs if run.id == run_id), runs[0] if runs else None)
+    return render_template('ingestion.html', runs=runs, selected=selected, stages=STAGES,
+                           query_yields=query_yields(runs))
+
+@main_bp.route('/api/ingestion-runs')
+@admin_required
+def api_ingestion_runs():
+    """Recent ingestion runs (?limit, ?source) and per-query yield across them"""
+    from app.services.ingestion_service import query_yields, recent_runs
+    
+    runs = recent_runs(limit=min(request.args.get('limit', 20, type=int), 200), source=request.args.get('source'))
+    return jsonify({
+        'runs': [run.to_dict(with_telemetry=False) for run in runs],
+        'query_yields': query_yields(runs)
+    })
+
+@main_bp.route('/api/ingestion-runs/<int:run_id>')
+@admin_required
+def api_ingestion_run(run_id):
+    """One ingestion run with its full telemetry"""
+    run = db.session.get(IngestionRun, run_id) or abort(404)
+    return jsonify(run.to_dict())
+
+@main_bp.route('/api/cache')
+def api_cache_stats():
+    """Response, card fragment and compressed body cache hit rates and sizes"""
+    stats = get_response_cache().stats()
+    stats['fragments'] = current_app.jinja_env.fragment_cache.stats()
+    compression = current_app.extensions.get('compression')
+    stats['compression'] = compression.stats() if compression else None
+    return jsonify(stats)
+
+@main_bp.route('/api/stats')
+@conditional_view(max_age=60)
+def api_stats():
+    """JSON API endpoint for platform statistics"""
+    try:
+        return jsonify(MusicStats.get_current().to_dict())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@main_bp.route('/stats/refresh', methods=['POST'])
+@admin_required
+def refresh_platform_stats():
+    """Recompute platform statistics from scratch"""
+    try:
+        stats = refresh_stats()
+        return jsonify({
+            'success': True,
+            'message': 'Statistics refreshed',
+            'stats': stats.to_dict()
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f'Error refreshing statistics: {str(e)}'
+        }), 500
     
 @main_bp.app_errorhandler(404)
 def not_found_error(error):
@@ -586,14 +683,14 @@ def not_found_error(error):
 @main_bp.route('/artist/<name>/share-data')
 def artist_share_data(name):
     """Get artist data for social media sharing"""
-    artist = Artist.query.filter_by(name=name).first_or_404()
+    artist = find_artist(name) or abort(404)
     
     share_data = {
         'title': f"{artist.name} - Kenyan Artist",
         'description': artist.description or f"Discover {artist.name}, a talented Kenyan artist",
         'url': url_for('main.artist_songs', name=artist.name, _external=True),
         'image': url_for('static', filename='images/logo.png', _external=True),
-        'song_count': len(artist.songs),
+        'song_count': artist.get_song_count(),
         'has_description': bool(artist.description)
     }
     
@@ -606,7 +703,7 @@ def generate_artist_card(name):
     import io
     from PIL import Image, ImageDraw, ImageFont
     
-    artist = Artist.query.filter_by(name=name).first_or_404()
+    artist = find_artist(name) or abort(404)
     
     try:
         # Create a simple card image
@@ -633,7 +730,7 @@ def generate_artist_card(name):
         draw.text((50, 50), artist.name, fill=(0, 0, 0), font=font_large)
         
         # Song count
-        draw.text((50, 120), f"{len(artist.songs)} songs", fill=(100, 100, 100), font=font_small)
+        draw.text((50, 120), f"{artist.get_song_count()} songs", fill=(100, 100, 100), font=font_small)
         
         # Website
         draw.text((50, 150), "Good Music KE", fill=(70, 130, 180), font=font_small)
@@ -654,7 +751,7 @@ from flask import current_app, render_template, request, flash, redirect, url_fo
 @main_bp.route('/artist/<name>')
 def artist_detail(name):
     try:
-        artist = Artist.query.filter_by(name=name).first_or_404()
+        artist = find_artist(name) or abort(404)
         
         # Ensure songs is never None - initialize as empty list if None
         if artist.songs is None:
@@ -669,7 +766,8 @@ def artist_detail(name):
         else:
             songs = None
             
-        return render_template('artist.html', artist=artist, songs=songs)
+        return render_template('artist.html', artist=artist, songs=songs,
+                               artist_stats=artist.get_summary_stats())
         
     except Exception as e:
         current_app.logger.error(f"Error loading artist {name}: {str(e)}")
@@ -0,0 +1,220 @@
+"""Background jobs, run by exactly one process across all workers and nodes.
+
+Every process may start a scheduler, but a job only does work in the
+process holding the ``scheduler`` lease row. The holder renews the lease
+on a heartbeat; if it dies, the lease expires and the next heartbeat in
+another process takes it over. Adding gunicorn workers therefore does
+not multiply YouTube quota spend.
+"""
+import atexit
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.blocking import BlockingScheduler
+from sqlalchemy import insert, or_, update
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = 'scheduler'
+
+
+class LeaderLease:
+    """A row in scheduler_leases claimed with conditional UPDATE/INSERT statements"""
+
+    def __init__(self, app, name=LEASE_NAME, ttl_seconds=90):
+        self.app = app
+        self.name = name
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self.closed = False
+
+    def try_acquire(self):
+        """Take or renew the lease; True when this process holds it afterwards"""
+        if self.closed:
+            return False
+        table = SchedulerLease.__table__
+        now = datetime.utcnow()
+        values = {'holder': self.holder, 'heartbeat_at': now, 'expires_at': now + self.ttl}
+
+        with self.app.app_context():
+            try:
+                with db.engine.begin() as conn:
+                    # Renew our own lease, or take over one that has expired
+                    claimed = conn.execute(
+                        update(table)
+                        .where(table.c.name == self.name)
+                        .where(or_(table.c.holder == self.holder, table.c.expires_at < now))
+                        .values(**values)
+                    ).rowcount
+                    if not claimed:
+                        exists = conn.execute(
+                            table.select().where(table.c.name == self.name)
+                        ).first()
+                        if exists is None:
+                            conn.execute(insert(table).values(name=self.name, acquired_at=now, **values))
+                            claimed = 1
+            except IntegrityError:
+                # Another process inserted the row first
+                claimed = 0
+            except Exception as e:
+                logger.warning("Scheduler lease check failed: %s", e)
+                claimed = 0
+
+        acquired = bool(claimed)
+        if acquired and not self.is_leader:
+            logger.info("Scheduler lease acquired by %s", self.holder)
+        elif self.is_leader and not acquired:
+            logger.warning("Scheduler lease lost by %s", self.holder)
+        self.is_leader = acquired
+        return acquired
+
+    def release(self):
+        """Give the lease up for good (a heartbeat still in flight cannot retake it)"""
+        self.closed = True
+        table = SchedulerLease.__table__
+        try:
+            with self.app.app_context(), db.engine.begin() as conn:
+                conn.execute(
+                    update(table)
+                    .where(table.c.name == self.name, table.c.holder == self.holder)
+                    .values(expires_at=datetime.utcnow())
+                )
+        except Exception as e:
+            logger.warning("Could not release scheduler lease: %s", e)
+        self.is_leader = False
+
+
+def update_music_data(app):
+    with app.app_context():
+        try:
+            logger.info("Starting scheduled music update...")
+            if app.config.get('CRAWL_MODE') == 'queue':
+                from app.services.crawl_service import enqueue_crawl, run_crawl_worker
+
+                # This process works the queue too; `flask crawl work` workers share it
+                enqueue_crawl()
+                saved_count = run_crawl_worker(worker_index=0, generate_images=True)['videos_saved']
+            else:
+                from app.services.youtube_service import YouTubeService
+
+                # Search, save and render images, recorded as an ingestion run
+                result = YouTubeService().update_music_library(source='scheduled', generate_images=True)
+                if result['status'] != 'success':
+                    raise RuntimeError(result['message'])
+                saved_count = result['videos_saved']
+
+            logger.info("Scheduled update: Added %s new songs", saved_count)
+            logger.info("Scheduled update completed successfully!")
+
+        except Exception as e:
+            logger.error("Error in scheduled update: %s", e)
+
+
+def refresh_trending_scores(app):
+    with app.app_context():
+        try:
+            from app.services.trending_service import refresh_trending
+            refresh_trending()
+        except Exception as e:
+            logger.error("Error refreshing trending scores: %s", e)
+
+
+def archive_old_songs(app):
+    with app.app_context():
+        try:
+            from app.services.retention_service import archive_expired_songs
+            archive_expired_songs()
+        except Exception as e:
+            logger.error("Error archiving old songs: %s", e)
+
+
+def _jobs(app):
+    """(id, function, interval in hours) for every scheduled job"""
+    return [
+        ('update_music_data', update_music_data, app.config.get('SCHEDULER_INTERVAL_HOURS', 6)),
+        ('refresh_trending', refresh_trending_scores, app.config.get('TRENDING_REFRESH_HOURS', 3)),
+        ('archive_old_songs', archive_old_songs, app.config.get('RETENTION_INTERVAL_HOURS', 24)),
+    ]
+
+
+def _leader_only(app, lease, job_id, func):
+    def run():
+        # Renew right before running so a stale leader never runs a job
+        if lease.try_acquire():
+            func(app)
+        else:
+            logger.info("Skipping %s: another process holds the scheduler lease", job_id)
+    return run
+
+
+def _configure(scheduler, app):
+    lease = LeaderLease(app, ttl_seconds=app.config.get('SCHEDULER_LEASE_SECONDS', 90))
+    scheduler.add_job(
+        func=lease.try_acquire,
+        trigger='interval',
+        seconds=app.config.get('SCHEDULER_HEARTBEAT_SECONDS', 30),
+        next_run_time=datetime.now(),
+        id='scheduler_heartbeat'
+    )
+    for job_id, func, hours in _jobs(app):
+        scheduler.add_job(func=_leader_only(app, lease, job_id, func), trigger='interval',
+                          hours=hours, id=job_id)
+    return lease
+
+
+def start_scheduler(app):
+    """Start the in-process background scheduler; returns it (or None if skipped)"""
+    if app.debug and os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+        # Parent of the debug reloader: only the reloaded child schedules
+        return None
+
+    scheduler = BackgroundScheduler(daemon=True)
+    try:
+        lease = _configure(scheduler, app)
+        scheduler.start()
+    except Exception as e:
+        logger.error("Error starting scheduler: %s", e)
+        return None
+
+    def shutdown():
+        if scheduler.running:
+            scheduler.shutdown(wait=False)
+        lease.release()
+
+    atexit.register(shutdown)
+    app.extensions['scheduler'] = (scheduler, lease)
+    logger.info("Scheduler started (runs every %s hours while holding the lease)",
+                app.config.get('SCHEDULER_INTERVAL_HOURS', 6))
+    return scheduler
+
+
+def stop_scheduler(app):
+    """Stop this process's background scheduler and hand the lease back"""
+    started = app.extensions.pop('scheduler', None)
+    if started:
+        scheduler, lease = started
+        if scheduler.running:
+            # Let an in-flight heartbeat finish before the lease is handed back
+            scheduler.shutdown(wait=True)
+        lease.release()
+
+
+def run_scheduler(app):
+    """Run the jobs in the foreground (flask scheduler) until interrupted"""
+    stop_scheduler(app)
+    scheduler = BlockingScheduler()
+    lease = _configure(scheduler, app)
+    logger.info("Standalone scheduler running as %s", lease.holder)
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        lease.release()
@@ -0,0 +1,117 @@
+import logging
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import delete, func, insert, select, update
+from app import db
+from app.models import ArtistMonthlyRollup, Song
+from app.services.catalog_events import catalog_committed
+
+logger = logging.getLogger(__name__)
+
+
+def month_key(value):
+    """'YYYY-MM' for a datetime (or the ISO text SQLite hands back)"""
+    if isinstance(value, str):
+        return value[:7]
+    return value.strftime('%Y-%m')
+
+
+def apply_catalog_changes(changes):
+    """Add one transaction's releases and view gains to the monthly rollup"""
+    deltas = defaultdict(lambda: [0, 0])
+
+    for song_id in changes.new_songs:
+        song = changes.songs.get(song_id)
+        if song and song.get('release_date'):
+            deltas[(song['artist_id'], month_key(song['release_date']))][0] += 1
+
+    current_month = month_key(datetime.utcnow())
+    for artist_id, views in changes.artist_views.items():
+        deltas[(artist_id, current_month)][1] += views
+
+    if not deltas:
+        return
+
+    table = ArtistMonthlyRollup.__table__
+    with db.engine.begin() as conn:
+        for (artist_id, month), (songs_released, views_gained) in deltas.items():
+            updated = conn.execute(
+                update(table)
+                .where(table.c.artist_id == artist_id, table.c.month == month)
+                .values(songs_released=table.c.songs_released + songs_released,
+                        views_gained=table.c.views_gained + views_gained)
+            ).rowcount
+            if not updated:
+                conn.execute(insert(table).values(
+                    artist_id=artist_id, month=month,
+                    songs_released=songs_released, views_gained=views_gained
+                ))
+
+
+def rebuild_rollups():
+    """Recompute the rollup from the songs table.
+
+    Past view gains are not recorded anywhere, so each song's current view
+    count is attributed to its release month.
+    """
+    table = ArtistMonthlyRollup.__table__
+    month = func.strftime('%Y-%m', Song.release_date)
+    if db.engine.dialect.name != 'sqlite':
+        month = func.to_char(Song.release_date, 'YYYY-MM')
+
+    with db.engine.begin() as conn:
+        conn.execute(delete(table))
+        conn.execute(insert(table).from_select(
+            ['artist_id', 'month', 'songs_released', 'views_gained'],
+            select(Song.artist_id, month, func.count(Song.id), func.coalesce(func.sum(Song.view_count), 0))
+            .group_by(Song.artist_id, month)
+        ))
+        rows = conn.execute(select(func.count()).select_from(table)).scalar()
+
+    logger.info("Rebuilt %s artist monthly rollup rows", rows)
+    return rows
+
+
+def ensure_rollups():
+    """Backfill the rollup the first time it is empty while songs exist"""
+    has_rollups = db.session.execute(select(ArtistMonthlyRollup.artist_id).limit(1)).first()
+    if not has_rollups and db.session.execute(select(Song.id).limit(1)).first():
+        rebuild_rollups()
+
+
+def get_artist_analytics(artist, months=12):
+    """Summary, top/recent songs, yearly counts and the last months of rollup"""
+    rollups = ArtistMonthlyRollup.query.filter_by(artist_id=artist.id).order_by(
+        ArtistMonthlyRollup.month.desc()
+    ).limit(months).all()
+
+    summary = artist.get_summary_stats()
+    if summary['latest_release']:
+        summary['latest_release'] = summary['latest_release'].isoformat()
+
+    return {
+        'artist': {'id': artist.id, 'name': artist.name},
+        'summary': summary,
+        'top_songs': [_song_summary(song) for song in artist.get_top_songs()],
+        'recent_songs': [_song_summary(song) for song in artist.get_recent_songs()],
+        'songs_by_year': artist.get_songs_count_by_year(),
+        'monthly': [rollup.to_dict() for rollup in reversed(rollups)]
+    }
+
+
+def _song_summary(song):
+    return {
+        'id': song.id,
+        'title': song.title,
+        'youtube_url': song.youtube_url,
+        'view_count': song.view_count,
+        'release_date': song.release_date.isoformat()
+    }
+
+
+@catalog_committed.connect
+def _update_rollups(app, changes):
+    try:
+        apply_catalog_changes(changes)
+    except Exception as e:
+        logger.warning("Could not update artist rollups: %s", e)
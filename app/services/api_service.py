@@ -0,0 +1,210 @@
+import base64
+import json
+from datetime import date, datetime
+from sqlalchemy import func, select, tuple_
+from app.models import Artist, Song
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MAX_PAGE_SIZE = 1000
+EXPORT_BATCH_SIZE = 1000
+
+SONG_FIELDS = {
+    'id': Song.id,
+    'title': Song.title,
+    'artist': Artist.name,
+    'artist_id': Song.artist_id,
+    'release_date': Song.release_date,
+    'youtube_url': Song.youtube_url,
+    'youtube_id': Song.youtube_id,
+    'thumbnail_url': Song.thumbnail_url,
+    'image_url': Song.image_url,
+    'view_count': Song.view_count,
+    'like_count': Song.like_count,
+    'duration': Song.duration,
+    'genre': Song.genre,
+    'is_explicit': Song.is_explicit,
+    'trending_score': Song.trending_score,
+    'created_at': Song.created_at,
+    'updated_at': Song.updated_at,
+}
+
+ARTIST_FIELDS = {
+    'id': Artist.id,
+    'name': Artist.name,
+    'description': Artist.description,
+    'genre': Artist.genre,
+    'location': Artist.location,
+    'is_verified': Artist.is_verified,
+    # Correlated count, answered from the ix_songs_artist_* indexes per row
+    'song_count': select(func.count(Song.id)).where(Song.artist_id == Artist.id).scalar_subquery(),
+    'created_at': Artist.created_at,
+    'updated_at': Artist.updated_at,
+}
+
+# Default projections match the v1 to_dict() payloads
+DEFAULT_SONG_FIELDS = [name for name in SONG_FIELDS if name != 'trending_score']
+DEFAULT_ARTIST_FIELDS = list(ARTIST_FIELDS)
+
+# order name -> (key column, descending); the song id breaks ties
+SONG_ORDERS = {
+    'release': (Song.release_date, True),   # newest first, like /api/songs
+    'updated': (Song.updated_at, False),    # oldest change first, for incremental sync
+}
+
+
+class ApiError(ValueError):
+    """A bad query parameter; reported to the client as a 400"""
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """Serialize to compact JSON bytes, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, default=_json_default, separators=(',', ':')).encode('utf-8')
+
+
+def parse_fields(value, available, default):
+    if not value:
+        return list(default)
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise ApiError(f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(fields))
+
+
+def parse_datetime(value, name):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ApiError(f"{name} must be an ISO date or datetime")
+
+
+def parse_limit(value, default=100):
+    if value is None:
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ApiError('limit must be an integer')
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def parse_order(value):
+    order = value or 'release'
+    if order not in SONG_ORDERS:
+        raise ApiError(f"order must be one of: {', '.join(SONG_ORDERS)}")
+    return order
+
+
+def encode_cursor(key, row_id):
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    raw = json.dumps([key, row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, key_is_datetime):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key, row_id = json.loads(raw)
+        if key_is_datetime and key is not None:
+            key = datetime.fromisoformat(key)
+        return key, int(row_id)
+    except (ValueError, TypeError):
+        raise ApiError('Invalid cursor')
+
+
+def song_query(fields, artist_id=None, genre=None, released_after=None, released_before=None,
+               updated_since=None):
+    """Core SELECT of the requested song columns with filters applied, unordered"""
+    columns = [SONG_FIELDS[name].label(name) for name in fields]
+    query = select(*columns).select_from(Song)
+    if 'artist' in fields:
+        query = query.join(Artist, Artist.id == Song.artist_id)
+
+    if artist_id is not None:
+        query = query.where(Song.artist_id == artist_id)
+    if genre:
+        query = query.where(Song.genre == genre)
+    if released_after:
+        query = query.where(Song.release_date >= released_after)
+    if released_before:
+        query = query.where(Song.release_date < released_before)
+    if updated_since:
+        query = query.where(Song.updated_at >= updated_since)
+    return query
+
+
+def page_songs(conn, fields, limit, cursor=None, order='release', **filters):
+    """One page of songs as dicts plus the cursor of the next page (or None)"""
+    key_column, descending = SONG_ORDERS[order]
+
+    query = song_query(fields, **filters)
+    # The sort key and id are always selected so the next cursor can be built
+    query = query.add_columns(key_column.label('_key'), Song.id.label('_id'))
+    if cursor:
+        key, row_id = decode_cursor(cursor, key_is_datetime=True)
+        position = tuple_(key_column, Song.id)
+        query = query.where(position < (key, row_id) if descending else position > (key, row_id))
+    if descending:
+        query = query.order_by(key_column.desc(), Song.id.desc())
+    else:
+        query = query.order_by(key_column.asc(), Song.id.asc())
+
+    rows = conn.execute(query.limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]._key, rows[-1]._id)
+
+    width = len(fields)
+    return [dict(zip(fields, row[:width])) for row in rows], next_cursor
+
+
+def page_artists(conn, fields, limit, cursor=None, genre=None, updated_since=None):
+    """One page of artists (by id) as dicts plus the next cursor"""
+    columns = [ARTIST_FIELDS[name].label(name) for name in fields]
+    query = select(*columns, Artist.id.label('_id')).select_from(Artist)
+    if genre:
+        query = query.where(Artist.genre == genre)
+    if updated_since:
+        query = query.where(Artist.updated_at >= updated_since)
+    if cursor:
+        _, last_id = decode_cursor(cursor, key_is_datetime=False)
+        query = query.where(Artist.id > last_id)
+
+    rows = conn.execute(query.order_by(Artist.id).limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(None, rows[-1]._id)
+
+    width = len(fields)
+    return [dict(zip(fields, row[:width])) for row in rows], next_cursor
+
+
+def iter_songs_ndjson(engine, fields, order='release', **filters):
+    """Yield the whole filtered catalog as NDJSON chunks, one batch of rows at a time"""
+    key_column, descending = SONG_ORDERS[order]
+    query = song_query(fields, **filters).order_by(
+        key_column.desc() if descending else key_column.asc(),
+        Song.id.desc() if descending else Song.id.asc()
+    )
+
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=EXPORT_BATCH_SIZE).execute(query)
+        for batch in result.partitions():
+            yield b''.join(dumps(dict(zip(fields, row))) + b'\n' for row in batch)
@@ -0,0 +1,226 @@
+import logging
+import threading
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import ArchivedSong, Artist, ArtistAlias, Song
+from app.services.catalog_events import catalog_committed
+from app.utilis.helpers import artist_name_key
+
+logger = logging.getLogger(__name__)
+
+
+class ArtistResolver:
+    """Maps artist names and channel ids to artist ids, with an LRU cache.
+
+    A miss costs at most three indexed lookups (channel alias, name_key,
+    name alias); a hit costs none. Only positive results are cached, and
+    entries for renamed or deleted artists are evicted on commit.
+    """
+
+    def __init__(self, size=4096):
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()   # (kind, value) -> artist id
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, name=None, channel_id=None):
+        """Return the artist id for a channel id or name, or None"""
+        keys = []
+        if channel_id:
+            keys.append((ArtistAlias.CHANNEL, channel_id))
+        if name:
+            keys.append((ArtistAlias.NAME, artist_name_key(name)))
+
+        with self._lock:
+            for key in keys:
+                artist_id = self._cache.get(key)
+                if artist_id is not None:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return artist_id
+            self.misses += 1
+
+        for kind, value in keys:
+            artist_id = self._query(kind, value)
+            if artist_id is not None:
+                self.remember(kind, value, artist_id)
+                return artist_id
+        return None
+
+    def remember(self, kind, value, artist_id):
+        with self._lock:
+            self._cache[(kind, value)] = artist_id
+            self._cache.move_to_end((kind, value))
+            while len(self._cache) > self.size:
+                self._cache.popitem(last=False)
+
+    def evict(self, artist_ids):
+        artist_ids = set(artist_ids)
+        if not artist_ids:
+            return
+        with self._lock:
+            for key in [key for key, artist_id in self._cache.items() if artist_id in artist_ids]:
+                del self._cache[key]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    @staticmethod
+    def _query(kind, value):
+        if kind == ArtistAlias.NAME:
+            artist_id = db.session.execute(
+                select(Artist.id).where(Artist.name_key == value)
+            ).scalar()
+            if artist_id is not None:
+                return artist_id
+        return db.session.execute(
+            select(ArtistAlias.artist_id).where(ArtistAlias.kind == kind, ArtistAlias.value == value)
+        ).scalar()
+
+
+def get_artist_resolver():
+    resolver = current_app.extensions.get('artist_resolver')
+    if resolver is None:
+        resolver = ArtistResolver(current_app.config.get('ARTIST_CACHE_SIZE', 4096))
+        current_app.extensions['artist_resolver'] = resolver
+    return resolver
+
+
+def find_artist(name=None, channel_id=None):
+    """Return the canonical Artist for a name or channel id, or None"""
+    resolver = get_artist_resolver()
+    artist_id = resolver.lookup(name=name, channel_id=channel_id)
+    if artist_id is None:
+        return None
+
+    artist = db.session.get(Artist, artist_id)
+    if artist is None:
+        # Deleted or merged by another process since it was cached
+        resolver.evict([artist_id])
+        artist_id = resolver.lookup(name=name, channel_id=channel_id)
+        artist = db.session.get(Artist, artist_id) if artist_id is not None else None
+    return artist
+
+
+def resolve_artist(name, channel_id=None):
+    """Return the artist for a name/channel, creating it if needed.
+
+    A channel seen under a new name gets a name alias, and a known name seen
+    on a new channel gets a channel alias, so later lookups by either hit.
+    The new rows are flushed, not committed.
+    """
+    artist = find_artist(name=name, channel_id=channel_id)
+
+    if artist is None:
+        try:
+            with db.session.begin_nested():
+                artist = Artist(name=name)
+                db.session.add(artist)
+                if channel_id:
+                    db.session.add(ArtistAlias(artist=artist, kind=ArtistAlias.CHANNEL, value=channel_id))
+        except IntegrityError:
+            # Created concurrently by another worker
+            artist = find_artist(name=name, channel_id=channel_id)
+            if artist is None:
+                raise
+        return artist
+
+    if channel_id:
+        _add_alias(artist.id, ArtistAlias.CHANNEL, channel_id)
+    key = artist_name_key(name)
+    if key != artist.name_key:
+        _add_alias(artist.id, ArtistAlias.NAME, key)
+    return artist
+
+
+def _add_alias(artist_id, kind, value):
+    exists = db.session.execute(
+        select(ArtistAlias.id).where(ArtistAlias.kind == kind, ArtistAlias.value == value)
+    ).first()
+    if not exists and kind == ArtistAlias.NAME:
+        # Another artist's own name always wins over an alias
+        exists = db.session.execute(select(Artist.id).where(Artist.name_key == value)).first()
+    if exists:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(ArtistAlias(artist_id=artist_id, kind=kind, value=value))
+    except IntegrityError:
+        return
+    get_artist_resolver().remember(kind, value, artist_id)
+
+
+def merge_artists(canonical_id, duplicate_ids):
+    """Move songs and aliases of duplicate artists onto one artist and delete the duplicates"""
+    duplicates = db.session.query(Artist.id, Artist.name).filter(Artist.id.in_(duplicate_ids)).all()
+    if not duplicates:
+        return 0
+
+    ids = [artist_id for artist_id, _ in duplicates]
+    db.session.execute(update(Song).where(Song.artist_id.in_(ids)).values(artist_id=canonical_id))
+    db.session.execute(update(ArchivedSong).where(ArchivedSong.artist_id.in_(ids)).values(artist_id=canonical_id))
+    db.session.execute(update(ArtistAlias).where(ArtistAlias.artist_id.in_(ids)).values(artist_id=canonical_id))
+    db.session.execute(db.delete(Artist).where(Artist.id.in_(ids)))
+
+    # Spellings that do not share the canonical key stay resolvable as aliases
+    canonical_name = db.session.execute(select(Artist.name).where(Artist.id == canonical_id)).scalar()
+    for _, name in duplicates:
+        key = artist_name_key(name)
+        if key != artist_name_key(canonical_name):
+            _add_alias(canonical_id, ArtistAlias.NAME, key)
+    return len(ids)
+
+
+def ensure_artist_keys():
+    """Fill name_key for artists created before it existed, merging duplicates.
+
+    Artists whose names only differ by case, accents, spacing or punctuation
+    are merged into the oldest one.
+    """
+    missing = db.session.query(Artist.id, Artist.name).filter(Artist.name_key.is_(None)).order_by(Artist.id).all()
+    if not missing:
+        return 0
+
+    taken = dict(db.session.execute(
+        select(Artist.name_key, Artist.id).where(Artist.name_key.is_not(None))
+    ).all())
+    groups = {}
+    for artist_id, name in missing:
+        groups.setdefault(artist_name_key(name), []).append(artist_id)
+
+    merged = 0
+    for key, artist_ids in groups.items():
+        canonical_id = taken.get(key, artist_ids[0])
+        duplicates = [artist_id for artist_id in artist_ids if artist_id != canonical_id]
+        merged += merge_artists(canonical_id, duplicates)
+        if key not in taken:
+            db.session.execute(update(Artist).where(Artist.id == canonical_id).values(name_key=key))
+    db.session.commit()
+
+    if merged:
+        from app.services.analytics_service import rebuild_rollups
+        from app.services.stats_service import refresh_stats
+        rebuild_rollups()
+        refresh_stats()  # also invalidates cached pages
+        logger.info("Merged %s duplicate artists", merged)
+    logger.info("Indexed %s artist name keys", len(groups))
+    return merged
+
+
+def load_name_aliases():
+    """[(artist id, alias key)] for every alternate spelling"""
+    return db.session.execute(
+        select(ArtistAlias.artist_id, ArtistAlias.value).where(ArtistAlias.kind == ArtistAlias.NAME)
+    ).all()
+
+
+@catalog_committed.connect
+def _evict_changed_artists(app, changes):
+    resolver = app.extensions.get('artist_resolver') if app else None
+    if resolver is not None:
+        resolver.evict(set(changes.deleted_artists) | (set(changes.artists) - set(changes.new_artists)))
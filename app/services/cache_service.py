@@ -0,0 +1,375 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+from flask import Response, current_app, g, make_response, request, session
+from sqlalchemy import func
+from app import db
+from app.models import Song
+from app.services.catalog_events import catalog_committed
+
+logger = logging.getLogger(__name__)
+
+VERSION_FILE = 'data_version'
+FRAGMENT_VERSION_FILE = 'fragment_version'
+
+
+class DataVersion:
+    """Catalog data version shared by every worker process.
+
+    Each process keeps a local counter bumped on its own commits. Commits in
+    other processes are seen through the modification time of a small file
+    in the instance folder, which every bump rewrites, so checking the
+    version costs one stat() call and no database query.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.local = 0
+        self._lock = threading.Lock()
+
+    def bump(self):
+        with self._lock:
+            self.local += 1
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, 'w') as f:
+                    f.write(f"{os.getpid()}:{self.local}:{time.time_ns()}\n")
+            except OSError as e:
+                logger.warning("Could not write data version file: %s", e)
+
+    def current(self):
+        return (self.local, self.shared())
+
+    def shared(self):
+        """Version part that is identical in every process (file mtime in ns)"""
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return 0
+
+
+class ResponseCache:
+    """Size-bounded LRU of rendered responses with a TTL and a data version.
+
+    An entry is served only while it is younger than its TTL and was stored
+    under the current data version, so any catalog write invalidates every
+    page at once without tracking which pages it affected.
+    """
+
+    def __init__(self, size=256, ttl=300):
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (version, expires_at, body, status, headers)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self.expired = 0
+        self.evictions = 0
+        self.by_endpoint = {}          # endpoint -> [hits, misses]
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] != version:
+                    self.invalidated += 1
+                    del self._entries[key]
+                elif entry[1] < time.monotonic():
+                    self.expired += 1
+                    del self._entries[key]
+                else:
+                    self._entries.move_to_end(key)
+                    self._count(key[0], hit=True)
+                    return entry
+            self._count(key[0], hit=False)
+            return None
+
+    def put(self, key, version, response, ttl=None):
+        entry = (
+            version,
+            time.monotonic() + (ttl or self.ttl),
+            response.get_data(),
+            response.status_code,
+            [(name, value) for name, value in response.headers if name.lower() != 'content-length']
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.size,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'invalidated': self.invalidated,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'endpoints': {
+                    endpoint: {
+                        'hits': hits,
+                        'misses': misses,
+                        'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0
+                    }
+                    for endpoint, (hits, misses) in sorted(self.by_endpoint.items())
+                }
+            }
+
+    def _count(self, endpoint, hit):
+        counts = self.by_endpoint.setdefault(endpoint, [0, 0])
+        if hit:
+            self.hits += 1
+            counts[0] += 1
+        else:
+            self.misses += 1
+            counts[1] += 1
+
+
+def get_data_version(app=None):
+    app = app or current_app
+    version = app.extensions.get('data_version')
+    if version is None:
+        version = DataVersion(os.path.join(app.instance_path, VERSION_FILE))
+        app.extensions['data_version'] = version
+    return version
+
+
+def get_fragment_version(app=None):
+    """Version of the cached song/artist card fragments, shared like DataVersion"""
+    app = app or current_app
+    version = app.extensions.get('fragment_version')
+    if version is None:
+        version = DataVersion(os.path.join(app.instance_path, FRAGMENT_VERSION_FILE))
+        app.extensions['fragment_version'] = version
+    return version
+
+
+def init_fragment_version(app):
+    """Empty the fragment cache of every process when any of them bumps it"""
+    version = get_fragment_version(app)
+    app.jinja_env.fragment_cache.version = version.shared
+
+
+def get_response_cache():
+    cache = current_app.extensions.get('response_cache')
+    if cache is None:
+        cache = ResponseCache(
+            size=current_app.config.get('RESPONSE_CACHE_SIZE', 256),
+            ttl=current_app.config.get('RESPONSE_CACHE_TTL', 300)
+        )
+        current_app.extensions['response_cache'] = cache
+    return cache
+
+
+def bump_data_version():
+    """Invalidate cached pages in every process; call after writes that send no catalog signal"""
+    get_data_version().bump()
+
+
+_index_lock = threading.Lock()
+
+
+def get_shared_index(key, factory):
+    """Return the in-memory index app.extensions[key], building it on first use.
+
+    Commits in this process reach the index through the catalog signal;
+    commits in other worker processes only change the shared data version.
+    When that differs from the version the index was built at, the current
+    index keeps serving and one background thread rebuilds it, at most once
+    per INDEX_REFRESH_INTERVAL seconds.
+    """
+    app = current_app._get_current_object()
+    index = app.extensions.get(key)
+    if index is None or index.built_at is None:
+        with _index_lock:
+            index = app.extensions.get(key)
+            if index is None or index.built_at is None:
+                index = index or factory()
+                _build_index(app, index)
+                app.extensions[key] = index
+        return index
+
+    if (not index.refreshing and index.version != get_data_version(app).shared()
+            and time.monotonic() - index.built_at >= app.config.get('INDEX_REFRESH_INTERVAL', 60)):
+        with _index_lock:
+            if index.refreshing:
+                return index
+            index.refreshing = True
+        threading.Thread(target=_refresh_index, args=(app, key, index),
+                         name=f"refresh-{key}", daemon=True).start()
+    return index
+
+
+def _build_index(app, index):
+    # Read the version first: anything committed while loading counts as newer
+    index.version = get_data_version(app).shared()
+    index.build()
+
+
+def _refresh_index(app, key, index):
+    with app.app_context():
+        try:
+            _build_index(app, index)
+            logger.debug("Rebuilt %s in the background", key)
+        except Exception as e:
+            logger.warning("Background rebuild of %s failed: %s", key, e)
+        finally:
+            db.session.remove()
+            index.refreshing = False
+
+
+def cached_view(ttl=None):
+    """Serve GET responses of a view from the response cache.
+
+    The key is the endpoint plus its view and query arguments. Requests
+    with pending flash messages or being profiled bypass the cache, and only
+    200 responses that set no cookies are stored.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if (request.method != 'GET' or not current_app.config.get('RESPONSE_CACHE_ENABLED', True)
+                    or '_flashes' in session or '_profile' in g):
+                return view(*args, **kwargs)
+
+            cache = get_response_cache()
+            version = get_data_version().current()
+            key = (
+                request.endpoint,
+                tuple(sorted((request.view_args or {}).items())),
+                tuple(sorted(request.args.items(multi=True)))
+            )
+
+            entry = cache.get(key, version)
+            if entry is not None:
+                _, _, body, status, headers = entry
+                return Response(body, status=status, headers=headers)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and 'Set-Cookie' not in response.headers:
+                cache.put(key, version, response, ttl)
+            return response
+        return wrapper
+    return decorator
+
+
+def _release_token():
+    """Identifies the deployed code so a deploy changes every ETag.
+
+    Uses the commit Render builds from, else a hash of template and static
+    file mtimes (the same in every worker of one checkout).
+    """
+    token = current_app.extensions.get('release_token')
+    if token is None:
+        token = os.environ.get('RENDER_GIT_COMMIT')
+        if not token:
+            digest = hashlib.sha1()
+            for folder in (current_app.template_folder, current_app.static_folder):
+                folder = os.path.join(current_app.root_path, folder) if folder else None
+                for root, _, files in os.walk(folder or ''):
+                    for name in sorted(files):
+                        path = os.path.join(root, name)
+                        digest.update(f"{path}:{os.stat(path).st_mtime_ns}".encode())
+            token = digest.hexdigest()[:12]
+        current_app.extensions['release_token'] = token
+    return token
+
+
+def _last_modified(shared_version):
+    """Latest Song.updated_at or data version change, queried once per version"""
+    cached = current_app.extensions.get('last_modified')
+    if cached and cached[0] == shared_version:
+        return cached[1]
+
+    latest = db.session.query(func.max(Song.updated_at)).scalar()
+    if isinstance(latest, str):
+        latest = datetime.fromisoformat(latest)
+    latest = latest.replace(tzinfo=timezone.utc) if latest else None
+    if shared_version:
+        changed = datetime.fromtimestamp(shared_version / 1e9, tz=timezone.utc)
+        latest = max(latest, changed) if latest else changed
+    latest = latest.replace(microsecond=0) if latest else None
+
+    current_app.extensions['last_modified'] = (shared_version, latest)
+    return latest
+
+
+def conditional_view(max_age=60, stale_while_revalidate=300):
+    """Add ETag, Last-Modified and Cache-Control to a GET view and answer 304s.
+
+    The strong ETag hashes the endpoint, its arguments, the shared data
+    version, the deployed release and the UTC date (pages show relative
+    dates). A matching If-None-Match, or If-Modified-Since when no ETag was
+    sent, is answered before the view runs.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET' or '_flashes' in session:
+                return view(*args, **kwargs)
+
+            shared_version = get_data_version().shared()
+            etag = hashlib.sha1(repr((
+                request.endpoint,
+                sorted((request.view_args or {}).items()),
+                sorted(request.args.items(multi=True)),
+                shared_version,
+                _release_token(),
+                datetime.now(timezone.utc).date().isoformat()
+            )).encode()).hexdigest()
+            last_modified = _last_modified(shared_version)
+
+            def add_headers(response):
+                response.set_etag(etag)
+                if last_modified:
+                    response.last_modified = last_modified
+                response.cache_control.public = True
+                response.cache_control.max_age = max_age
+                if stale_while_revalidate:
+                    response.cache_control.stale_while_revalidate = stale_while_revalidate
+                return response
+
+            if request.if_none_match:
+                if request.if_none_match.contains(etag):
+                    return add_headers(Response(status=304))
+            elif request.if_modified_since and last_modified and last_modified <= request.if_modified_since:
+                return add_headers(Response(status=304))
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                add_headers(response)
+            return response
+        return wrapper
+    return decorator
+
+
+@catalog_committed.connect
+def _bump_version(app, changes):
+    if app is not None:
+        get_data_version(app).bump()
+
+
+@catalog_committed.connect
+def _clear_fragments(app, changes):
+    # Song cards show the artist name, which is not part of their cache key;
+    # other processes see the bump on their next fragment lookup
+    if app is not None and (changes.deleted_artists or set(changes.artists) - set(changes.new_artists)):
+        get_fragment_version(app).bump()
+        app.jinja_env.fragment_cache.clear()
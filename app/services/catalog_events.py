@@ -0,0 +1,136 @@
+from blinker import Namespace
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+_signals = Namespace()
+
+# Sent after a commit that touched songs or artists, with a CatalogChanges
+# payload. In-memory indexes subscribe to this instead of re-querying.
+catalog_committed = _signals.signal('catalog-committed')
+
+
+class CatalogChanges:
+    """Songs and artists written by one transaction"""
+
+    def __init__(self):
+        self.songs = {}            # song id -> snapshot of inserted/updated song
+        self.artists = {}          # artist id -> snapshot of inserted/updated artist
+        self.deleted_songs = {}    # song id -> snapshot taken before the delete
+        self.deleted_artists = set()
+        self.new_songs = set()     # ids of songs inserted by this transaction
+        self.new_artists = set()
+        self.views_delta = 0       # net change in total song views
+        self.artist_views = {}     # artist id -> views gained by inserted/updated songs
+
+    def __bool__(self):
+        return bool(self.songs or self.artists or self.deleted_songs or self.deleted_artists)
+
+    def add_song(self, song, is_new=False, views_delta=0):
+        self.songs[song.id] = song_snapshot(song)
+        self.deleted_songs.pop(song.id, None)
+        if is_new:
+            self.new_songs.add(song.id)
+        self._add_views(song.artist_id, views_delta)
+
+    def update_song(self, snapshot, views_delta=0):
+        """Record a song updated by a bulk statement"""
+        self.songs[snapshot['id']] = snapshot
+        self._add_views(snapshot['artist_id'], views_delta)
+
+    def _add_views(self, artist_id, views_delta):
+        self.views_delta += views_delta
+        if views_delta:
+            self.artist_views[artist_id] = self.artist_views.get(artist_id, 0) + views_delta
+
+    def add_artist(self, artist, is_new=False):
+        self.artists[artist.id] = artist_snapshot(artist)
+        self.deleted_artists.discard(artist.id)
+        if is_new:
+            self.new_artists.add(artist.id)
+
+    def delete_song(self, song):
+        self.songs.pop(song['id'], None)
+        if song['id'] in self.new_songs:
+            self.new_songs.discard(song['id'])
+        else:
+            self.deleted_songs[song['id']] = song
+        self.views_delta -= song.get('view_count') or 0
+
+    def delete_artist(self, artist_id):
+        self.artists.pop(artist_id, None)
+        if artist_id in self.new_artists:
+            self.new_artists.discard(artist_id)
+        else:
+            self.deleted_artists.add(artist_id)
+
+
+def song_snapshot(song):
+    return {
+        'id': song.id,
+        'title': song.title,
+        'artist_id': song.artist_id,
+        'release_date': song.release_date,
+        'view_count': song.view_count or 0,
+        'like_count': song.like_count or 0,
+    }
+
+
+def artist_snapshot(artist):
+    return {
+        'id': artist.id,
+        'name': artist.name,
+    }
+
+
+def notify_catalog_changed(changes):
+    """Announce changes written outside the ORM unit of work (bulk/Core statements)"""
+    if changes and has_app_context():
+        catalog_committed.send(current_app._get_current_object(), changes=changes)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changes(session, flush_context):
+    from app.models import Artist, Song
+
+    changes = session.info.get('catalog_changes')
+    if changes is None:
+        changes = session.info['catalog_changes'] = CatalogChanges()
+
+    for obj in session.new:
+        if isinstance(obj, Song):
+            changes.add_song(obj, is_new=True, views_delta=obj.view_count or 0)
+        elif isinstance(obj, Artist):
+            changes.add_artist(obj, is_new=True)
+
+    for obj in session.dirty:
+        if not session.is_modified(obj, include_collections=False):
+            continue
+        if isinstance(obj, Song):
+            history = inspect(obj).attrs.view_count.history
+            old_views = (history.deleted[0] if history.deleted else obj.view_count) or 0
+            changes.add_song(obj, views_delta=(obj.view_count or 0) - old_views)
+        elif isinstance(obj, Artist):
+            changes.add_artist(obj)
+
+    for obj in session.deleted:
+        if isinstance(obj, Song):
+            changes.delete_song(song_snapshot(obj))
+        elif isinstance(obj, Artist):
+            changes.delete_artist(obj.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _dispatch_changes(session):
+    if session.in_nested_transaction():
+        # A SAVEPOINT was released (begin_nested); the outer transaction
+        # still holds the changes and the database write lock
+        return
+    changes = session.info.pop('catalog_changes', None)
+    if changes:
+        notify_catalog_changed(changes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('catalog_changes', None)
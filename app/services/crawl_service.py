@@ -0,0 +1,264 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, func, or_, select, update
+from app import db
+from app.models import CrawlWorkItem
+
+logger = logging.getLogger(__name__)
+
+
+def partition_api_keys(api_keys, worker_index, worker_count):
+    """The keys worker `worker_index` of `worker_count` may use.
+
+    Keys are dealt round-robin so workers never spend the same key's quota.
+    With more workers than keys, workers share keys in turn.
+    """
+    if not api_keys:
+        return []
+    worker_count = max(1, worker_count)
+    share = api_keys[worker_index % worker_count::worker_count]
+    return share or [api_keys[worker_index % len(api_keys)]]
+
+
+def enqueue_crawl(queries=None):
+    """Create a crawl run with one pending work item per distinct query"""
+    if queries is None:
+        from app.services.youtube_service import SEARCH_QUERIES
+        queries = SEARCH_QUERIES
+    queries = list(dict.fromkeys(query.strip() for query in queries if query.strip()))
+
+    run_id = f"{datetime.utcnow():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:6]}"
+    db.session.execute(db.insert(CrawlWorkItem), [
+        {'run_id': run_id, 'query': query, 'status': CrawlWorkItem.PENDING, 'attempts': 0}
+        for query in queries
+    ])
+    db.session.commit()
+    logger.info("Enqueued crawl %s with %s queries", run_id, len(queries))
+    return {'run_id': run_id, 'items': len(queries)}
+
+
+def _claimable(now, max_attempts):
+    """Pending items, plus leased ones whose worker stopped renewing (stragglers)"""
+    return and_(
+        CrawlWorkItem.attempts < max_attempts,
+        or_(
+            CrawlWorkItem.status == CrawlWorkItem.PENDING,
+            and_(CrawlWorkItem.status == CrawlWorkItem.LEASED, CrawlWorkItem.lease_expires_at < now)
+        )
+    )
+
+
+def fail_abandoned(max_attempts, now=None):
+    """Mark expired leases that have used up their attempts as failed; returns how many"""
+    now = now or datetime.utcnow()
+    failed = db.session.execute(
+        update(CrawlWorkItem)
+        .where(CrawlWorkItem.status == CrawlWorkItem.LEASED, CrawlWorkItem.lease_expires_at < now,
+               CrawlWorkItem.attempts >= max_attempts)
+        .values(status=CrawlWorkItem.FAILED, lease_expires_at=None, finished_at=now,
+                error=f"Lease expired on each of {max_attempts} attempts")
+    ).rowcount
+    db.session.commit()
+    if failed:
+        logger.warning("Failed %s crawl items whose workers never finished them", failed)
+    return failed
+
+
+def claim_item(worker_id, lease_seconds=None, max_attempts=None):
+    """Lease the oldest claimable item to this worker; returns (id, query) or None.
+
+    The claim is a conditional UPDATE on the candidate row, so two workers
+    racing for the same item cannot both win it. Abandoned items with no
+    attempts left are marked failed first instead of staying leased.
+    """
+    lease_seconds = lease_seconds or current_app.config.get('CRAWL_LEASE_SECONDS', 300)
+    max_attempts = max_attempts or current_app.config.get('CRAWL_MAX_ATTEMPTS', 3)
+    fail_abandoned(max_attempts)
+
+    for _ in range(10):
+        now = datetime.utcnow()
+        candidate = db.session.execute(
+            select(CrawlWorkItem.id, CrawlWorkItem.query)
+            .where(_claimable(now, max_attempts))
+            .order_by(CrawlWorkItem.id)
+            .limit(1)
+        ).first()
+        if candidate is None:
+            db.session.rollback()
+            return None
+
+        claimed = db.session.execute(
+            update(CrawlWorkItem)
+            .where(CrawlWorkItem.id == candidate.id, _claimable(now, max_attempts))
+            .values(status=CrawlWorkItem.LEASED, lease_holder=worker_id,
+                    lease_expires_at=now + timedelta(seconds=lease_seconds),
+                    attempts=CrawlWorkItem.attempts + 1)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return candidate.id, candidate.query
+    return None
+
+
+def renew_lease(item_id, worker_id, lease_seconds=None):
+    """Extend this worker's lease on an item; False if the lease has passed to another worker"""
+    lease_seconds = lease_seconds or current_app.config.get('CRAWL_LEASE_SECONDS', 300)
+    renewed = db.session.execute(
+        update(CrawlWorkItem)
+        .where(CrawlWorkItem.id == item_id, CrawlWorkItem.lease_holder == worker_id,
+               CrawlWorkItem.status == CrawlWorkItem.LEASED)
+        .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=lease_seconds))
+    ).rowcount
+    db.session.commit()
+    return bool(renewed)
+
+
+class LeaseHeartbeat:
+    """Renews a lease from a background thread while the item is being crawled.
+
+    A query that runs longer than the lease is then never handed to a
+    second worker. Renewals happen every third of CRAWL_LEASE_SECONDS.
+    """
+
+    def __init__(self, app, item_id, worker_id):
+        self.app = app
+        self.item_id = item_id
+        self.worker_id = worker_id
+        self.interval = app.config.get('CRAWL_LEASE_SECONDS', 300) / 3
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{item_id}", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        with self.app.app_context():
+            try:
+                while not self._stop.wait(self.interval):
+                    try:
+                        if not renew_lease(self.item_id, self.worker_id):
+                            return  # taken over; finish_item will report it
+                    except Exception as e:
+                        # A busy database only delays this renewal; the lease has slack
+                        db.session.rollback()
+                        logger.warning("Could not renew lease on item %s: %s", self.item_id, e)
+            finally:
+                db.session.remove()
+
+
+def finish_item(item_id, worker_id, videos_found=0, videos_saved=0, error=None, max_attempts=None):
+    """Record an item's outcome; ignored if the lease has passed to another worker.
+
+    A failed item goes back to pending until it has used up its attempts.
+    """
+    max_attempts = max_attempts or current_app.config.get('CRAWL_MAX_ATTEMPTS', 3)
+    values = {'lease_expires_at': None, 'finished_at': datetime.utcnow(), 'error': error}
+    if error is None:
+        values.update(status=CrawlWorkItem.DONE, videos_found=videos_found, videos_saved=videos_saved)
+    else:
+        values['status'] = db.case(
+            (CrawlWorkItem.attempts >= max_attempts, CrawlWorkItem.FAILED),
+            else_=CrawlWorkItem.PENDING
+        )
+
+    updated = db.session.execute(
+        update(CrawlWorkItem)
+        .where(CrawlWorkItem.id == item_id, CrawlWorkItem.lease_holder == worker_id,
+               CrawlWorkItem.status == CrawlWorkItem.LEASED)
+        .values(**values)
+    ).rowcount
+    db.session.commit()
+    return bool(updated)
+
+
+def run_crawl_worker(worker_index=0, worker_count=None, max_items=None, generate_images=False):
+    """Claim and crawl work items until none are left; returns a summary.
+
+    Each item is one search query: its results are filtered and saved
+    before the next item is claimed, so a worker that dies loses at most
+    the query it held, which is re-leased once its lease expires. While a
+    query runs its lease is renewed in the background. The worker's whole
+    session is recorded as one 'crawl' ingestion run.
+    """
+    from app.services.ingestion_service import finish_run, generate_missing_images, start_run
+    from app.services.youtube_service import YouTubeService
+
+    app = current_app._get_current_object()
+    worker_count = worker_count or current_app.config.get('CRAWL_WORKER_COUNT', 1)
+    api_keys = partition_api_keys(current_app.config.get('YOUTUBE_API_KEYS', []), worker_index, worker_count)
+    youtube_service = YouTubeService(api_keys=api_keys)
+    youtube_service.load_channel_cache()
+    run = start_run('crawl')
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{worker_index}"
+    start_time = time.time()
+    summary = {'worker_id': worker_id, 'api_keys': len(api_keys), 'items': 0, 'failed': 0,
+               'videos_found': 0, 'videos_saved': 0}
+
+    logger.info("Crawl worker %s/%s started with %s API keys", worker_index + 1, worker_count, len(api_keys))
+    while max_items is None or summary['items'] < max_items:
+        claimed = claim_item(worker_id)
+        if claimed is None:
+            break
+        item_id, query = claimed
+
+        try:
+            with LeaseHeartbeat(app, item_id, worker_id):
+                videos = youtube_service.search_query(query)
+                youtube_service.save_channel_cache()
+                saved_count = youtube_service.save_videos_to_db(videos)
+        except Exception as e:
+            db.session.rollback()
+            finish_item(item_id, worker_id, error=str(e))
+            summary['failed'] += 1
+            logger.warning("Query '%s' failed: %s", query, e)
+            continue
+
+        if not finish_item(item_id, worker_id, videos_found=len(videos), videos_saved=saved_count):
+            logger.warning("Lease on '%s' expired before it finished; results were kept", query)
+        summary['items'] += 1
+        summary['videos_found'] += len(videos)
+        summary['videos_saved'] += saved_count
+        logger.debug("Query '%s': %s results, %s saved", query, len(videos), saved_count)
+
+    summary['images_generated'] = (
+        generate_missing_images(summary['videos_saved'], youtube_service.telemetry) if generate_images else 0
+    )
+    summary['run_id'] = run.id
+    summary['duration_seconds'] = round(time.time() - start_time, 2)
+    finish_run(run, youtube_service.telemetry, videos_found=summary['videos_found'],
+               videos_saved=summary['videos_saved'], images_generated=summary['images_generated'])
+    logger.info("Crawl worker %s finished %s queries in %ss (%s songs saved)",
+                worker_id, summary['items'], summary['duration_seconds'], summary['videos_saved'])
+    return summary
+
+
+def crawl_status(run_id=None):
+    """Item counts per status for a run (default: the latest run)"""
+    if run_id is None:
+        run_id = db.session.execute(
+            select(CrawlWorkItem.run_id).order_by(CrawlWorkItem.id.desc()).limit(1)
+        ).scalar()
+        if run_id is None:
+            return None
+
+    counts = dict(db.session.execute(
+        select(CrawlWorkItem.status, func.count())
+        .where(CrawlWorkItem.run_id == run_id)
+        .group_by(CrawlWorkItem.status)
+    ).all())
+    saved = db.session.execute(
+        select(func.coalesce(func.sum(CrawlWorkItem.videos_saved), 0)).where(CrawlWorkItem.run_id == run_id)
+    ).scalar()
+    return {'run_id': run_id, 'statuses': counts, 'videos_saved': saved}
@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import Counter
+from app import db
+from app.models import Artist
+from app.services.artist_service import load_name_aliases
+from app.services.cache_service import get_shared_index
+from app.services.catalog_events import catalog_committed
+from app.utilis.helpers import artist_name_key
+
+# Minimum trigram similarity for "did you mean" suggestions and for
+# redirecting a near-miss artist URL to the real artist page
+SUGGEST_THRESHOLD = 0.3
+REDIRECT_THRESHOLD = 0.5
+
+
+def trigrams(name):
+    compact = artist_name_key(name)
+    if not compact:
+        return set()
+    padded = f"  {compact} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ArtistMatcher:
+    """In-memory trigram index for typo-tolerant artist lookups.
+
+    Each artist name (and alias) is split into character trigrams with a
+    posting list per trigram. A lookup only visits the postings of the
+    query's own trigrams and ranks candidates by Jaccard similarity, so
+    'Nyashinsky' finds 'Nyashinski' without touching the database.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}        # trigram -> set of alias keys
+        self._aliases = {}         # alias key -> (artist id, trigram count)
+        self._artist_aliases = {}  # artist id -> set of alias keys
+        self._names = {}           # artist id -> canonical name
+        self.built_at = None
+        self.version = None        # shared data version the build started at
+        self.refreshing = False
+
+    def build(self):
+        """Load every artist name and alternate spelling from the database"""
+        artists = db.session.query(Artist.id, Artist.name).all()
+        aliases = load_name_aliases()
+
+        with self._lock:
+            self._postings = {}
+            self._aliases = {}
+            self._artist_aliases = {}
+            self._names = {}
+            for artist_id, name in artists:
+                self.add_artist(artist_id, name)
+            for artist_id, alias in aliases:
+                self.add_alias(artist_id, alias)
+            self.built_at = time.monotonic()
+
+    def add_artist(self, artist_id, name, aliases=()):
+        """Index an artist under its name and any alternate spellings"""
+        with self._lock:
+            self.remove_artist(artist_id)
+            self._names[artist_id] = name
+            for alias in (name, *aliases):
+                self._add_alias(artist_id, alias)
+
+    def add_alias(self, artist_id, alias):
+        with self._lock:
+            if artist_id in self._names:
+                self._add_alias(artist_id, alias)
+
+    def remove_artist(self, artist_id):
+        with self._lock:
+            self._names.pop(artist_id, None)
+            for key in self._artist_aliases.pop(artist_id, ()):
+                self._aliases.pop(key, None)
+                for gram in trigrams(key):
+                    postings = self._postings.get(gram)
+                    if postings:
+                        postings.discard(key)
+                        if not postings:
+                            del self._postings[gram]
+
+    def apply(self, changes):
+        """Apply a CatalogChanges payload from a committed transaction"""
+        with self._lock:
+            for artist_id in changes.deleted_artists:
+                self.remove_artist(artist_id)
+            for artist_id, artist in changes.artists.items():
+                if self._names.get(artist_id) != artist['name']:
+                    self.add_artist(artist_id, artist['name'])
+
+    def match(self, query, limit=5, threshold=SUGGEST_THRESHOLD):
+        """Return [(artist id, name, score)] for the closest artists, best first"""
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        with self._lock:
+            shared = Counter()
+            for gram in query_grams:
+                shared.update(self._postings.get(gram, ()))
+
+            best = {}
+            for key, overlap in shared.items():
+                artist_id, size = self._aliases[key]
+                score = overlap / (len(query_grams) + size - overlap)
+                if score >= threshold and score > best.get(artist_id, 0):
+                    best[artist_id] = score
+
+            ranked = sorted(best.items(), key=lambda item: (-item[1], self._names[item[0]]))
+            return [(artist_id, self._names[artist_id], round(score, 3))
+                    for artist_id, score in ranked[:limit]]
+
+    def best_match(self, query, threshold=REDIRECT_THRESHOLD):
+        """Return (artist id, name) of the single closest artist, or None"""
+        matches = self.match(query, limit=1, threshold=threshold)
+        return matches[0][:2] if matches else None
+
+    def _add_alias(self, artist_id, alias):
+        key = artist_name_key(alias)
+        if not key or key in self._aliases:
+            return
+        grams = trigrams(key)
+        self._aliases[key] = (artist_id, len(grams))
+        self._artist_aliases.setdefault(artist_id, set()).add(key)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(key)
+
+
+def get_artist_matcher():
+    """Return the app's artist matcher, building it on first use.
+
+    Like the suggest index it is rebuilt in the background once another
+    worker process has committed, so renames made there are picked up.
+    """
+    return get_shared_index('artist_matcher', ArtistMatcher)
+
+
+@catalog_committed.connect
+def _update_artist_matcher(app, changes):
+    matcher = app.extensions.get('artist_matcher') if app else None
+    if matcher is not None and matcher.built_at is not None:
+        matcher.apply(changes)
@@ -1,11 +1,12 @@
-import google.generativeai as genai
+import logging
 import os
 from flask import current_app
-from PIL import Image, ImageDraw, ImageFont
 import random
 import re
 import time
 
+logger = logging.getLogger(__name__)
+
 class GeminiService:
     def __init__(self):
         self.api_key = current_app.config.get('GEMINI_API_KEY')
@@ -14,26 +15,29 @@ class GeminiService:
         
         try:
             if self.api_key and self.api_key not in ['your-gemini-api-key-here', 'your_gemini_api_key_here']:
+                # Imported on first use: the SDK takes ~0.5s to import
+                import google.generativeai as genai
                 genai.configure(api_key=self.api_key)
                 self._initialize_model()
-                print("✅ Gemini API configured successfully")
+                logger.info("Gemini API configured successfully")
             else:
-                print("⚠️ No valid Gemini API key provided")
+                logger.warning("No valid Gemini API key provided")
                 
         except Exception as e:
-            print(f"❌ Gemini configuration failed: {str(e)}")
+            logger.error("Gemini configuration failed: %s", e)
             self.model = None
 
     def _initialize_model(self):
         """Initialize the best available Gemini model for text generation"""
+        import google.generativeai as genai
         try:
             # Convert generator to list
             available_models = list(genai.list_models())
             model_names = [model.name for model in available_models]
-            print(f"📋 Available Gemini models: {model_names}")
+            logger.debug("Available Gemini models: %s", model_names)
             
             # Debug: Print each model's capabilities
-            print("🔍 Model capabilities:")
+            logger.debug("Model capabilities:")
             text_generation_models = []
             
             for model in available_models:
@@ -42,12 +46,12 @@ class GeminiService:
                     # Try to get supported generation methods
                     if hasattr(model, 'supported_generation_methods'):
                         methods = list(model.supported_generation_methods) if model.supported_generation_methods else []
-                    print(f"   {model.name}: {methods}")
+                    logger.debug("%s: %s", model.name, methods)
                     
                     # Check if it supports generateContent
                     if 'generateContent' in methods:
                         text_generation_models.append(model)
-                        print(f"     ✅ Supports generateContent")
+                        logger.debug("%s supports generateContent", model.name)
                     else:
                         # If no methods listed but it's a Gemini model, try it anyway
                         if ('gemini' in model.name.lower() and 
@@ -57,15 +61,15 @@ class GeminiService:
                             'veo' not in model.name.lower() and
                             'imagen' not in model.name.lower()):
                             text_generation_models.append(model)
-                            print(f"     🤔 No methods listed, but trying as Gemini model")
+                            logger.debug("%s lists no methods, trying it as a Gemini model", model.name)
                 except Exception as e:
-                    print(f"     ❌ Error checking model {model.name}: {e}")
+                    logger.debug("Error checking model %s: %s", model.name, e)
             
             text_model_names = [model.name for model in text_generation_models]
-            print(f"🎯 Text generation models to try: {text_model_names}")
+            logger.debug("Text generation models to try: %s", text_model_names)
             
             if not text_generation_models:
-                print("⚠️ No text generation models identified, will try all Gemini models")
+                logger.warning("No text generation models identified, will try all Gemini models")
                 # Fallback: try any model with 'gemini' in the name
                 for model in available_models:
                     if 'gemini' in model.name.lower():
@@ -96,10 +100,10 @@ class GeminiService:
                         try:
                             self.model_name = model_pref
                             self.model = genai.GenerativeModel(model_pref)
-                            print(f"🎯 Using preferred text generation model: {model_pref}")
+                            logger.info("Using preferred text generation model: %s", model_pref)
                             return
                         except Exception as e:
-                            print(f"⚠️ Could not initialize preferred model {model_pref}: {e}")
+                            logger.warning("Could not initialize preferred model %s: %s", model_pref, e)
                             continue
             
             # If no preferred models work, try any available text generation model
@@ -107,10 +111,10 @@ class GeminiService:
                 try:
                     self.model_name = model.name
                     self.model = genai.GenerativeModel(model.name)
-                    print(f"🎯 Using available text generation model: {model.name}")
+                    logger.info("Using available text generation model: %s", model.name)
                     return
                 except Exception as e:
-                    print(f"⚠️ Could not initialize model {model.name}: {e}")
+                    logger.warning("Could not initialize model %s: %s", model.name, e)
                     continue
             
             # Last resort: try any model
@@ -118,17 +122,17 @@ class GeminiService:
                 try:
                     self.model_name = model.name
                     self.model = genai.GenerativeModel(model.name)
-                    print(f"⚠️ Using fallback model: {model.name}")
+                    logger.warning("Using fallback model: %s", model.name)
                     return
                 except Exception as e:
-                    print(f"❌ Could not initialize fallback model {model.name}: {e}")
+                    logger.error("Could not initialize fallback model %s: %s", model.name, e)
                     continue
             
-            print("❌ Could not initialize any model")
+            logger.error("Could not initialize any model")
             self.model = None
                 
         except Exception as e:
-            print(f"❌ Error initializing Gemini model: {e}")
+            logger.error("Error initializing Gemini model: %s", e)
             self.model = None
 
     def is_available(self):
@@ -138,7 +142,7 @@ class GeminiService:
     def generate_artist_description(self, artist_name, song_titles=None):
         """Generate artist description using Gemini AI"""
         if not self.is_available():
-            print("⚠️ Gemini service not available")
+            logger.warning("Gemini service not available")
             return None
             
         try:
@@ -173,7 +177,7 @@ class GeminiService:
                 "max_output_tokens": 300,
             }
             
-            print(f"🔍 Sending prompt to {self.model_name}...")
+            logger.debug("Sending prompt to %s...", self.model_name)
             response = self.model.generate_content(
                 prompt,
                 generation_config=generation_config
@@ -186,14 +190,14 @@ class GeminiService:
                 description = re.sub(r'\n+', ' ', description)  # Remove extra newlines
                 description = re.sub(r'\s+', ' ', description).strip()  # Normalize spaces
                 
-                print(f"✅ Generated description for {artist_name}")
+                logger.info("Generated description for %s", artist_name)
                 return description
             else:
-                print(f"❌ No response generated for {artist_name}")
+                logger.error("No response generated for %s", artist_name)
                 return None
                 
         except Exception as e:
-            print(f"❌ Error generating artist description for {artist_name}: {e}")
+            logger.error("Error generating artist description for %s: %s", artist_name, e)
             return None
 
     def generate_song_description(self, song_title, artist_name):
@@ -228,7 +232,7 @@ class GeminiService:
                 return response.text.strip()
                 
         except Exception as e:
-            print(f"❌ Error generating song description: {e}")
+            logger.error("Error generating song description: %s", e)
             return None
         
         return None
@@ -252,15 +256,16 @@ class GeminiService:
             image = self._create_custom_album_art(song_title, artist_name, release_date)
             image.save(filepath, "JPEG", quality=85)
 
-            print(f"🖼️ Generated album art: {filename}")
+            logger.debug("Generated album art: %s", filename)
             return f"/static/images/{filename}"
 
         except Exception as e:
-            print(f"❌ Error generating image: {str(e)}")
+            logger.error("Error generating image: %s", e)
             return "/static/images/default_album.jpg"
 
     def _create_custom_album_art(self, song_title, artist_name, release_date):
         """Create a custom album art image with Kenyan theme"""
+        from PIL import Image, ImageDraw
         width, height = 400, 400
 
         # Kenyan-inspired color palette
@@ -315,6 +320,7 @@ class GeminiService:
 
     def _add_song_text(self, draw, song_title, artist_name, width, height):
         """Add song title and artist name to image"""
+        from PIL import ImageFont
         try:
             # Try to find available fonts
             font_paths = [
@@ -375,7 +381,7 @@ class GeminiService:
             draw.text((x, y), artist_text, font=font_small, fill=(255, 255, 255))
             
         except Exception as e:
-            print(f"⚠️ Could not add text to image: {str(e)}")
+            logger.warning("Could not add text to image: %s", e)
 
     def _split_text(self, text, max_length):
         """Split text into lines of maximum length"""
@@ -0,0 +1,242 @@
+import codecs
+import csv
+import io
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from itertools import islice
+from flask import current_app
+from sqlalchemy import insert, select
+from app import db
+from app.models import Artist, ArtistAlias, Song
+from app.services.catalog_events import CatalogChanges, notify_catalog_changed
+from app.utilis.helpers import artist_name_key, extract_youtube_id
+
+logger = logging.getLogger(__name__)
+
+# Only the first errors are reported back; the rest are counted
+MAX_REPORTED_ERRORS = 100
+
+
+def iter_ndjson(stream):
+    """Yield one dict per non-blank line of a binary NDJSON stream"""
+    for line in codecs.getreader('utf-8')(stream):
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield {'_error': f'Invalid JSON: {e}'}
+
+
+def iter_csv(stream):
+    """Yield one dict per row of a binary CSV stream with a header row"""
+    yield from csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+
+
+def iter_rows(stream, fmt):
+    """Parse a binary stream as 'ndjson' or 'csv'"""
+    if fmt == 'csv':
+        return iter_csv(stream)
+    if fmt == 'ndjson':
+        return iter_ndjson(stream)
+    raise ValueError(f'Unsupported import format: {fmt}')
+
+
+def _parse_release_date(value):
+    release_date = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    if release_date.tzinfo is not None:
+        release_date = release_date.astimezone(timezone.utc).replace(tzinfo=None)
+    return release_date
+
+
+def _text(record, name):
+    """A field as stripped text ('' if absent); ValueError if it is not a string"""
+    value = record.get(name)
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        raise ValueError(f'{name} must be a string')
+    return value.strip()
+
+
+def _parse_count(value):
+    return int(value) if value not in (None, '') else 0
+
+
+def _validate(record):
+    """Return (song values, artist name) for one input row, or raise ValueError"""
+    if not isinstance(record, dict):
+        raise ValueError('Row is not an object')
+    if '_error' in record:
+        raise ValueError(record['_error'])
+
+    title = _text(record, 'title')
+    artist_name = _text(record, 'artist')
+    youtube_url = _text(record, 'youtube_url')
+    release_date = _text(record, 'release_date')
+    thumbnail_url, duration, genre = (_text(record, name) for name in ('thumbnail_url', 'duration', 'genre'))
+
+    if not all([title, artist_name, youtube_url, release_date]):
+        raise ValueError('Missing required fields')
+
+    youtube_id = extract_youtube_id(youtube_url)
+    if not youtube_id:
+        raise ValueError('Invalid YouTube URL')
+
+    try:
+        release_date = _parse_release_date(release_date)
+    except ValueError:
+        raise ValueError(f'Invalid release_date: {release_date}')
+
+    try:
+        view_count = _parse_count(record.get('view_count'))
+        like_count = _parse_count(record.get('like_count'))
+    except (TypeError, ValueError):
+        raise ValueError('view_count and like_count must be integers')
+
+    return {
+        'title': title,
+        'release_date': release_date,
+        'youtube_url': youtube_url,
+        'youtube_id': youtube_id,
+        'thumbnail_url': thumbnail_url or f"https://img.youtube.com/vi/{youtube_id}/hqdefault.jpg",
+        'view_count': view_count,
+        'like_count': like_count,
+        'duration': duration or None,
+        'genre': genre or None,
+    }, artist_name
+
+
+class ImportReport:
+    """Running totals for one import"""
+
+    def __init__(self):
+        self.rows_read = 0
+        self.added = 0
+        self.duplicates = 0
+        self.artists_created = 0
+        self.chunks = 0
+        self.error_count = 0
+        self.errors = []
+        self.aborted = False
+        self.start_time = time.time()
+
+    def error(self, row_number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"Song {row_number}: {message}")
+
+    def to_dict(self):
+        duration = time.time() - self.start_time
+        return {
+            'rows_read': self.rows_read,
+            'added_count': self.added,
+            'duplicate_count': self.duplicates,
+            'artists_created': self.artists_created,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'chunks': self.chunks,
+            'aborted': self.aborted,
+            'duration_seconds': round(duration, 2),
+            'rows_per_second': round(self.rows_read / duration, 1) if duration > 0 else 0
+        }
+
+
+def _import_chunk(records, first_row, report):
+    """Validate, de-duplicate and insert one chunk, then commit it"""
+    valid = []
+    for offset, record in enumerate(records):
+        try:
+            valid.append(_validate(record))
+        except ValueError as e:
+            report.error(first_row + offset, str(e))
+
+    # Drop videos already stored or repeated within the chunk
+    youtube_ids = {values['youtube_id'] for values, _ in valid}
+    seen = set(db.session.execute(
+        select(Song.youtube_id).where(Song.youtube_id.in_(youtube_ids))
+    ).scalars()) if youtube_ids else set()
+
+    new_songs = []
+    for values, artist_name in valid:
+        if values['youtube_id'] in seen:
+            report.duplicates += 1
+            continue
+        seen.add(values['youtube_id'])
+        new_songs.append((values, artist_name))
+
+    if not new_songs:
+        return
+
+    # Artists match on name_key or a name alias, so 'SAUTI SOL' joins 'Sauti Sol'
+    changes = CatalogChanges()
+    names = {}
+    for _, artist_name in new_songs:
+        names.setdefault(artist_name_key(artist_name), artist_name)
+    artist_ids = dict(db.session.execute(
+        select(Artist.name_key, Artist.id).where(Artist.name_key.in_(names))
+    ).all())
+    artist_ids.update(
+        (value, artist_id) for value, artist_id in db.session.execute(
+            select(ArtistAlias.value, ArtistAlias.artist_id).where(
+                ArtistAlias.kind == ArtistAlias.NAME, ArtistAlias.value.in_(set(names) - set(artist_ids))
+            )
+        ).all()
+    )
+
+    missing = [{'name': name, 'name_key': key} for key, name in names.items() if key not in artist_ids]
+    if missing:
+        for artist in db.session.execute(insert(Artist).returning(Artist.id, Artist.name, Artist.name_key), missing):
+            artist_ids[artist.name_key] = artist.id
+            changes.add_artist(artist, is_new=True)
+        report.artists_created += len(missing)
+
+    rows = [dict(values, artist_id=artist_ids[artist_name_key(artist_name)]) for values, artist_name in new_songs]
+    inserted = db.session.execute(
+        insert(Song).returning(Song.id, Song.title, Song.artist_id, Song.release_date,
+                               Song.view_count, Song.like_count),
+        rows
+    ).all()
+    db.session.commit()
+
+    for song in inserted:
+        changes.add_song(song, is_new=True, views_delta=song.view_count or 0)
+    notify_catalog_changed(changes)
+    report.added += len(inserted)
+
+
+def import_songs(records, chunk_size=None):
+    """Import an iterable of song dicts in chunks, committing each chunk.
+
+    Each chunk costs one duplicate lookup, one artist lookup and at most two
+    multi-row INSERTs, whatever its size. Rows that fail validation are
+    skipped and reported. A chunk that fails to insert is rolled back and
+    the import stops there, keeping the chunks already committed.
+    """
+    chunk_size = chunk_size or current_app.config.get('IMPORT_CHUNK_SIZE', 1000)
+    report = ImportReport()
+    records = iter(records)
+
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+
+        first_row = report.rows_read + 1
+        report.rows_read += len(chunk)
+        try:
+            _import_chunk(chunk, first_row, report)
+        except Exception as e:
+            db.session.rollback()
+            report.error(first_row, f"Chunk of {len(chunk)} rows not imported: {e}")
+            report.aborted = True
+            break
+        report.chunks += 1
+
+    result = report.to_dict()
+    logger.info("Imported %s of %s songs (%s duplicates, %s errors) in %ss, %s rows/s",
+                result['added_count'], result['rows_read'], result['duplicate_count'],
+                result['error_count'], result['duration_seconds'], result['rows_per_second'])
+    return result
@@ -0,0 +1,194 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from app import db
+from app.models import IngestionRun, Song
+
+logger = logging.getLogger(__name__)
+
+# YouTube Data API quota cost per call, by endpoint
+QUOTA_COSTS = {'search': 100, 'channels': 1, 'videos': 1}
+
+STAGES = ('search', 'channel_verify', 'filter', 'persist', 'image_render')
+
+
+def mask_key(api_key):
+    """Enough of an API key to tell keys apart in telemetry"""
+    return f"…{api_key[-4:]}" if api_key else 'none'
+
+
+class IngestionTelemetry:
+    """Counters for one ingestion run, safe to update from the search threads.
+
+    Stages that run in several threads at once (channel_verify) add up the
+    time of every thread, so they can exceed the run's wall time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.endpoints = {}   # endpoint -> {calls, errors, quota_units, seconds}
+        self.keys = {}        # masked key -> {calls, quota_units}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.rejections = {}  # reason -> count
+        self.queries = {}     # query -> {results, accepted}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def http_call(self, endpoint, api_key, seconds, ok):
+        """Count one API call; every answered call spends quota, failed or not"""
+        quota = QUOTA_COSTS.get(endpoint, 1) if ok is not None else 0
+        with self._lock:
+            stats = self.endpoints.setdefault(endpoint, {'calls': 0, 'errors': 0, 'quota_units': 0, 'seconds': 0.0})
+            stats['calls'] += 1
+            stats['errors'] += 0 if ok else 1
+            stats['quota_units'] += quota
+            stats['seconds'] += seconds
+            key_stats = self.keys.setdefault(mask_key(api_key), {'calls': 0, 'quota_units': 0})
+            key_stats['calls'] += 1
+            key_stats['quota_units'] += quota
+
+    def channel_cache(self, hit):
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def reject(self, reason, count=1):
+        if count:
+            with self._lock:
+                self.rejections[reason] = self.rejections.get(reason, 0) + count
+
+    def query_yield(self, query, results, accepted):
+        with self._lock:
+            stats = self.queries.setdefault(query, {'results': 0, 'accepted': 0})
+            stats['results'] += results
+            stats['accepted'] += accepted
+
+    @property
+    def api_calls(self):
+        return sum(stats['calls'] for stats in self.endpoints.values())
+
+    @property
+    def quota_units(self):
+        return sum(stats['quota_units'] for stats in self.endpoints.values())
+
+    def to_dict(self):
+        with self._lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                'stages': {name: round(seconds, 3) for name, seconds in self.stages.items()},
+                'endpoints': {
+                    name: dict(stats, seconds=round(stats['seconds'], 3))
+                    for name, stats in self.endpoints.items()
+                },
+                'keys': {key: dict(stats) for key, stats in self.keys.items()},
+                'channel_cache': {
+                    'hits': self.cache_hits,
+                    'misses': self.cache_misses,
+                    'hit_rate': round(self.cache_hits / lookups, 4) if lookups else 0.0
+                },
+                'rejections': dict(sorted(self.rejections.items(), key=lambda item: -item[1])),
+                'queries': {
+                    query: dict(stats, yield_rate=round(stats['accepted'] / stats['results'], 4)
+                                if stats['results'] else 0.0)
+                    for query, stats in self.queries.items()
+                }
+            }
+
+
+def start_run(source):
+    run = IngestionRun(source=source, status=IngestionRun.RUNNING, started_at=datetime.utcnow())
+    db.session.add(run)
+    db.session.commit()
+    return run
+
+
+def finish_run(run, telemetry, videos_found=0, videos_saved=0, images_generated=0, error=None):
+    """Store the run's outcome and telemetry; never raises (telemetry must not fail a crawl)"""
+    try:
+        if error:
+            db.session.rollback()
+        run = db.session.get(IngestionRun, run.id)
+        run.status = IngestionRun.ERROR if error else IngestionRun.SUCCESS
+        run.finished_at = datetime.utcnow()
+        run.duration_seconds = round((run.finished_at - run.started_at).total_seconds(), 2)
+        run.videos_found = videos_found
+        run.videos_saved = videos_saved
+        run.images_generated = images_generated
+        run.api_calls = telemetry.api_calls
+        run.quota_units = telemetry.quota_units
+        run.error = error
+        run.telemetry = telemetry.to_dict()
+        db.session.commit()
+        logger.info("Ingestion run %s: %s API calls, %s quota units, %s saved in %ss",
+                    run.id, run.api_calls, run.quota_units, videos_saved, run.duration_seconds)
+    except Exception as e:
+        db.session.rollback()
+        logger.warning("Could not record ingestion run: %s", e)
+
+
+def generate_missing_images(saved_count, telemetry):
+    """Render album art for the newest saved songs that have none (if Gemini is available)"""
+    if not saved_count:
+        return 0
+    from app.services.gemini_service import GeminiService
+
+    with telemetry.stage('image_render'):
+        try:
+            gemini_service = GeminiService()
+            new_songs = Song.query.order_by(Song.created_at.desc()).limit(saved_count).all()
+            images_generated = 0
+
+            for song in new_songs:
+                if not song.image_url:
+                    image_url = gemini_service.generate_image(
+                        song.title,
+                        song.artist.name,
+                        song.release_date.strftime('%Y-%m-%d')
+                    )
+                    if image_url:
+                        song.image_url = image_url
+                        images_generated += 1
+
+            db.session.commit()
+            logger.info("Generated %s new images", images_generated)
+            return images_generated
+
+        except Exception as e:
+            db.session.rollback()
+            logger.warning("Gemini image generation skipped: %s", e)
+            return 0
+
+
+def recent_runs(limit=20, source=None):
+    query = IngestionRun.query
+    if source:
+        query = query.filter_by(source=source)
+    return query.order_by(IngestionRun.started_at.desc(), IngestionRun.id.desc()).limit(limit).all()
+
+
+def query_yields(runs):
+    """Per-query results and accepted songs summed over runs, best yield first"""
+    totals = {}
+    for run in runs:
+        for query, stats in ((run.telemetry or {}).get('queries') or {}).items():
+            total = totals.setdefault(query, {'query': query, 'runs': 0, 'results': 0, 'accepted': 0})
+            total['runs'] += 1
+            total['results'] += stats['results']
+            total['accepted'] += stats['accepted']
+    for total in totals.values():
+        total['yield_rate'] = round(total['accepted'] / total['results'], 4) if total['results'] else 0.0
+    return sorted(totals.values(), key=lambda total: (-total['yield_rate'], -total['accepted'], total['query']))
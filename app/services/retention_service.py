@@ -0,0 +1,79 @@
+import logging
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, insert, literal, select
+from app import db
+from app.models import ArchivedSong, Artist, Song, SongViewHistory
+from app.services.catalog_events import CatalogChanges, notify_catalog_changed
+
+logger = logging.getLogger(__name__)
+
+
+def archive_expired_songs(max_age_days=None, chunk_size=None):
+    """Move songs released more than max_age_days ago into archived_songs.
+
+    Works in chunks of chunk_size ids: each chunk is copied with one
+    INSERT ... SELECT, deleted with one DELETE and committed on its own, so
+    the write lock is only held for one chunk at a time and readers are not
+    blocked for the whole run.
+    """
+    max_age_days = max_age_days or current_app.config.get('RETENTION_DAYS', 30)
+    chunk_size = chunk_size or current_app.config.get('RETENTION_CHUNK_SIZE', 500)
+    cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+
+    start_time = time.time()
+    moved = 0
+    chunks = 0
+    last_id = 0
+    archive_columns = [ArchivedSong.song_id] + [getattr(ArchivedSong, name) for name in ArchivedSong.SONG_COLUMNS]
+    song_columns = [Song.id] + [getattr(Song, name) for name in ArchivedSong.SONG_COLUMNS]
+
+    while True:
+        rows = db.session.execute(
+            select(Song.id, Song.title, Song.artist_id, Song.release_date,
+                   Song.view_count, Song.like_count)
+            .where(Song.release_date < cutoff, Song.id > last_id)
+            .order_by(Song.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+
+        ids = [row.id for row in rows]
+        try:
+            db.session.execute(
+                insert(ArchivedSong).from_select(
+                    archive_columns + [ArchivedSong.artist_name, ArchivedSong.archived_at],
+                    select(*song_columns, Artist.name, literal(datetime.utcnow(), ArchivedSong.archived_at.type))
+                    .outerjoin(Artist, Artist.id == Song.artist_id)
+                    .where(Song.id.in_(ids))
+                )
+            )
+            db.session.execute(delete(SongViewHistory).where(SongViewHistory.song_id.in_(ids)))
+            db.session.execute(delete(Song).where(Song.id.in_(ids)))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        changes = CatalogChanges()
+        for row in rows:
+            changes.delete_song(dict(row._mapping))
+        notify_catalog_changed(changes)
+
+        moved += len(ids)
+        chunks += 1
+        last_id = ids[-1]
+
+    duration = time.time() - start_time
+    rate = moved / duration if duration > 0 else 0
+    logger.info("Archived %s songs older than %s days in %s chunks (%.2fs, %.0f rows/s)",
+                moved, max_age_days, chunks, duration, rate)
+
+    return {
+        'archived_count': moved,
+        'chunks': chunks,
+        'duration_seconds': round(duration, 2),
+        'rows_per_second': round(rate, 1)
+    }
@@ -0,0 +1,196 @@
+import logging
+import re
+from flask import current_app
+from flask_sqlalchemy.pagination import Pagination
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app import db
+from app.models import Artist, Song
+from app.utilis.helpers import fold_text
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'songs_fts'
+
+# Column weights for bm25(): title, clean_title, artist_name
+BM25_WEIGHTS = (2.0, 4.0, 3.0)
+
+# SQL equivalent of clean_song_title(): strips the " - <artist>" suffix that
+# YouTubeService._generate_ai_title appends to every ingested title
+_CLEAN_TITLE_SQL = (
+    "CASE WHEN length({t}) > length({n}) + 3 "
+    "AND lower(substr({t}, -(length({n}) + 3))) = lower(' - ' || {n}) "
+    "THEN trim(substr({t}, 1, length({t}) - length({n}) - 3)) ELSE {t} END"
+)
+
+
+def clean_song_title(title, artist_name):
+    """Strip the trailing ' - Artist' suffix added during ingestion"""
+    if not title:
+        return ''
+    suffix = f" - {artist_name}" if artist_name else None
+    if suffix and len(title) > len(suffix) and title.lower().endswith(suffix.lower()):
+        return title[:-len(suffix)].strip()
+    return title
+
+
+def _fts_schema_statements():
+    """DDL for the FTS5 index and the triggers that keep it in sync"""
+    clean_new = _CLEAN_TITLE_SQL.format(t='new.title', n='a.name')
+    clean_renamed = _CLEAN_TITLE_SQL.format(t='s.title', n='new.name')
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+                title, clean_title, artist_name,
+                tokenize = "unicode61 remove_diacritics 2",
+                prefix = '2 3 4'
+            )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_song_ai AFTER INSERT ON songs BEGIN
+                INSERT INTO {FTS_TABLE}(rowid, title, clean_title, artist_name)
+                SELECT new.id, new.title, {clean_new}, a.name FROM artists a WHERE a.id = new.artist_id;
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_song_ad AFTER DELETE ON songs BEGIN
+                DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_song_au AFTER UPDATE OF title, artist_id ON songs BEGIN
+                DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+                INSERT INTO {FTS_TABLE}(rowid, title, clean_title, artist_name)
+                SELECT new.id, new.title, {clean_new}, a.name FROM artists a WHERE a.id = new.artist_id;
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_artist_au AFTER UPDATE OF name ON artists BEGIN
+                DELETE FROM {FTS_TABLE} WHERE rowid IN (SELECT id FROM songs WHERE artist_id = new.id);
+                INSERT INTO {FTS_TABLE}(rowid, title, clean_title, artist_name)
+                SELECT s.id, s.title, {clean_renamed}, new.name FROM songs s WHERE s.artist_id = new.id;
+            END""",
+    ]
+
+
+def drop_search_triggers(conn):
+    """Drop the sync triggers before a bulk load (see restore_search_triggers)"""
+    for name in ('song_ai', 'song_ad', 'song_au', 'artist_au'):
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{name}"))
+
+
+def restore_search_triggers(conn):
+    """Recreate the sync triggers and repopulate the index after a bulk load"""
+    for statement in _fts_schema_statements():
+        conn.execute(text(statement))
+    _rebuild(conn)
+
+
+def search_index_exists():
+    """Whether flask init-db has created the FTS5 index (one catalog lookup)"""
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    with db.engine.connect() as conn:
+        return conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': FTS_TABLE}
+        ).first() is not None
+
+
+def ensure_search_index():
+    """Create the FTS5 index and triggers, rebuilding the index if it drifted.
+
+    Returns False when the database is not SQLite or SQLite was built without
+    FTS5, in which case search falls back to LIKE matching.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return False
+
+    try:
+        with db.engine.begin() as conn:
+            for statement in _fts_schema_statements():
+                conn.execute(text(statement))
+
+            indexed = conn.execute(text(f"SELECT count(*) FROM {FTS_TABLE}")).scalar()
+            songs = conn.execute(text("SELECT count(*) FROM songs")).scalar()
+            if indexed != songs:
+                _rebuild(conn)
+                logger.info("Rebuilt search index (%s songs)", songs)
+        return True
+
+    except OperationalError as e:
+        if 'fts5' in str(e).lower():
+            logger.warning("SQLite FTS5 not available, search will use LIKE matching")
+            return False
+        raise
+
+
+def rebuild_search_index():
+    """Repopulate the FTS5 index from the songs and artists tables"""
+    with db.engine.begin() as conn:
+        _rebuild(conn)
+
+
+def _rebuild(conn):
+    clean = _CLEAN_TITLE_SQL.format(t='s.title', n='a.name')
+    conn.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    conn.execute(text(
+        f"INSERT INTO {FTS_TABLE}(rowid, title, clean_title, artist_name) "
+        f"SELECT s.id, s.title, {clean}, a.name FROM songs s JOIN artists a ON a.id = s.artist_id"
+    ))
+
+
+def build_match_query(query):
+    """Turn free text into an FTS5 MATCH expression with prefix matching.
+
+    Every term must match (implicit AND) and every term is a prefix, so
+    'khali jon' finds 'Khaligraph Jones'.
+    """
+    terms = re.findall(r'\w+', fold_text(query))
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+class RankedPagination(Pagination):
+    """Pagination over results whose ids are ranked outside the ORM query"""
+
+    def _query_items(self):
+        return self._query_args['fetch_items'](self._query_offset, self.per_page)
+
+    def _query_count(self):
+        return self._query_args['fetch_count']()
+
+
+class SearchService:
+    def __init__(self):
+        self.fts_enabled = current_app.extensions.get('songs_fts', False)
+
+    def search_songs(self, query, page=1, per_page=12):
+        """Search songs by title or artist, best matches first"""
+        if self.fts_enabled:
+            match = build_match_query(query)
+            if not match:
+                return RankedPagination(page=page, per_page=per_page, error_out=False,
+                                        fetch_items=lambda offset, limit: [],
+                                        fetch_count=lambda: 0)
+            return RankedPagination(
+                page=page, per_page=per_page, error_out=False,
+                fetch_items=lambda offset, limit: self._fetch_ranked(match, offset, limit),
+                fetch_count=lambda: self._count_matches(match)
+            )
+
+        return Song.query.join(Artist).filter(
+            db.or_(
+                Song.title.ilike(f'%{query}%'),
+                Artist.name.ilike(f'%{query}%')
+            )
+        ).order_by(Song.release_date.desc()).paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+
+    def _fetch_ranked(self, match, offset, limit):
+        weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+        rows = db.session.execute(text(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match "
+            f"ORDER BY bm25({FTS_TABLE}, {weights}), rowid DESC LIMIT :limit OFFSET :offset"
+        ), {'match': match, 'limit': limit, 'offset': offset}).scalars().all()
+        if not rows:
+            return []
+
+        songs = {song.id: song for song in Song.query.filter(Song.id.in_(rows)).all()}
+        return [songs[song_id] for song_id in rows if song_id in songs]
+
+    def _count_matches(self, match):
+        return db.session.execute(text(
+            f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+        ), {'match': match}).scalar() or 0
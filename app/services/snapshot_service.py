@@ -0,0 +1,232 @@
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import DateTime, LargeBinary, delete, insert, select
+from app import db
+from app.models import Artist, ArtistAlias, ArtistMonthlyRollup, ChannelInfo, MusicStats, Song, SongViewHistory
+from app.services.cache_service import bump_data_version
+from app.services.search_service import drop_search_triggers, restore_search_triggers
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 'goodmusic-catalog'
+SNAPSHOT_VERSION = 1
+
+# Restore order follows foreign keys
+SNAPSHOT_MODELS = [Artist, ArtistAlias, Song, SongViewHistory, ArtistMonthlyRollup, ChannelInfo, MusicStats]
+
+BATCH_SIZE = 2000
+
+
+class SnapshotError(Exception):
+    """The snapshot file is malformed or failed its checksum"""
+
+
+def _encoders(table):
+    """Per-column functions turning row values into JSON-safe values"""
+    def encode(column):
+        if isinstance(column.type, DateTime):
+            return lambda value: value.isoformat() if value is not None else None
+        if isinstance(column.type, LargeBinary):
+            return lambda value: base64.b64encode(value).decode('ascii') if value is not None else None
+        return None
+
+    return [encode(column) for column in table.columns]
+
+
+def _decoders(table, names):
+    def decode(column):
+        if isinstance(column.type, DateTime):
+            return lambda value: datetime.fromisoformat(value) if value is not None else None
+        if isinstance(column.type, LargeBinary):
+            return lambda value: base64.b64decode(value) if value is not None else None
+        return None
+
+    return [decode(table.c[name]) for name in names]
+
+
+class _HashingWriter:
+    """Writes lines to a gzip stream while hashing the uncompressed bytes"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.sha256 = hashlib.sha256()
+
+    def write(self, obj):
+        line = json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8') + b'\n'
+        self.sha256.update(line)
+        self.stream.write(line)
+
+
+def export_snapshot(path):
+    """Write every catalog table to a gzip-compressed NDJSON snapshot.
+
+    Layout: a header line, then for each table a {"table", "columns"} line
+    followed by one JSON array per row, then a trailer with the row counts
+    and the sha256 of all preceding uncompressed bytes.
+    """
+    start_time = time.time()
+    counts = {}
+
+    with gzip.open(path, 'wb', compresslevel=6) as stream, db.engine.connect() as conn:
+        writer = _HashingWriter(stream)
+        writer.write({
+            'format': SNAPSHOT_FORMAT,
+            'version': SNAPSHOT_VERSION,
+            'created_at': datetime.utcnow().isoformat(),
+            'tables': [model.__table__.name for model in SNAPSHOT_MODELS]
+        })
+
+        for model in SNAPSHOT_MODELS:
+            table = model.__table__
+            encoders = _encoders(table)
+            writer.write({'table': table.name, 'columns': [column.name for column in table.columns]})
+
+            count = 0
+            result = conn.execution_options(yield_per=BATCH_SIZE).execute(
+                select(table).order_by(*table.primary_key.columns)
+            )
+            for row in result:
+                writer.write([
+                    encoder(value) if encoder else value
+                    for encoder, value in zip(encoders, row)
+                ])
+                count += 1
+            counts[table.name] = count
+
+        stream.write(json.dumps({'end': True, 'rows': counts, 'sha256': writer.sha256.hexdigest()}).encode('utf-8') + b'\n')
+
+    duration = time.time() - start_time
+    logger.info("Exported %s rows to %s in %.2fs", sum(counts.values()), path, duration)
+    return {'rows': counts, 'duration_seconds': round(duration, 2)}
+
+
+def _read_snapshot(path):
+    """Yield parsed lines of a snapshot, checking the trailer checksum last"""
+    sha256 = hashlib.sha256()
+    trailer = None
+
+    with gzip.open(path, 'rb') as stream:
+        for line in stream:
+            if trailer is not None:
+                raise SnapshotError('Data found after the snapshot trailer')
+            obj = json.loads(line)
+            if isinstance(obj, dict) and obj.get('end'):
+                trailer = obj
+                continue
+            sha256.update(line)
+            yield obj
+
+    if trailer is None:
+        raise SnapshotError('Snapshot is truncated (no trailer)')
+    if trailer.get('sha256') != sha256.hexdigest():
+        raise SnapshotError('Snapshot checksum mismatch')
+
+
+def verify_snapshot(path):
+    """Check a snapshot's format and checksum; returns row counts per table"""
+    lines = _read_snapshot(path)
+    try:
+        header = next(lines)
+    except StopIteration:
+        raise SnapshotError('Snapshot is empty')
+    if header.get('format') != SNAPSHOT_FORMAT or header.get('version') != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot: {header.get('format')} v{header.get('version')}")
+
+    counts = {}
+    table = None
+    for obj in lines:
+        if isinstance(obj, dict):
+            table = obj['table']
+            counts[table] = 0
+        else:
+            counts[table] += 1
+    return counts
+
+
+def import_snapshot(path, replace=False):
+    """Restore a snapshot written by export_snapshot.
+
+    The file is verified before anything is written. Rows are then loaded
+    with multi-row INSERTs into tables whose secondary indexes and search
+    triggers were dropped, and the indexes are rebuilt once at the end, all
+    in one transaction. Without replace, the target tables must be empty.
+    """
+    start_time = time.time()
+    expected = verify_snapshot(path)
+    tables = {model.__table__.name: model.__table__ for model in SNAPSHOT_MODELS}
+    unknown = set(expected) - set(tables)
+    if unknown:
+        raise SnapshotError(f"Snapshot contains unknown tables: {', '.join(sorted(unknown))}")
+
+    search_enabled = current_app.extensions.get('songs_fts', False)
+    indexes = [index for table in tables.values() for index in table.indexes]
+    counts = {}
+
+    with db.engine.begin() as conn:
+        if not replace:
+            for name, table in tables.items():
+                if conn.execute(select(table).limit(1)).first():
+                    raise SnapshotError(f"Table {name} is not empty (use --replace to overwrite)")
+
+        if search_enabled:
+            drop_search_triggers(conn)
+        for index in indexes:
+            index.drop(conn, checkfirst=True)
+
+        if replace:
+            for table in reversed(list(tables.values())):
+                conn.execute(delete(table))
+
+        lines = _read_snapshot(path)
+        next(lines)  # header, checked by verify_snapshot
+        table = columns = decoders = None
+        batch = []
+
+        def flush():
+            if batch:
+                conn.execute(insert(table), batch)
+                counts[table.name] += len(batch)
+                batch.clear()
+
+        for obj in lines:
+            if isinstance(obj, dict):
+                flush()
+                table = tables[obj['table']]
+                columns = [name for name in obj['columns'] if name in table.c]
+                decoders = _decoders(table, columns)
+                positions = [obj['columns'].index(name) for name in columns]
+                counts[table.name] = 0
+                continue
+
+            batch.append({
+                name: decoder(obj[position]) if decoder else obj[position]
+                for name, decoder, position in zip(columns, decoders, positions)
+            })
+            if len(batch) >= BATCH_SIZE:
+                flush()
+        flush()
+
+        # Every row the snapshot lists must have been written (rolls back otherwise)
+        if counts != expected:
+            raise SnapshotError(f"Restored row counts {counts} do not match the snapshot {expected}")
+
+        for index in indexes:
+            index.create(conn, checkfirst=True)
+        if search_enabled:
+            restore_search_triggers(conn)
+
+    # In-memory indexes in this process are stale; they rebuild on next use
+    for key in ('suggest_index', 'artist_matcher', 'artist_resolver'):
+        current_app.extensions.pop(key, None)
+    current_app.jinja_env.fragment_cache.clear()
+    bump_data_version()
+
+    duration = time.time() - start_time
+    logger.info("Restored %s rows from %s in %.2fs", sum(counts.values()), path, duration)
+    return {'rows': counts, 'duration_seconds': round(duration, 2)}
@@ -0,0 +1,72 @@
+import logging
+from datetime import datetime
+from sqlalchemy import update
+from app import db
+from app.models import MusicStats
+from app.services.cache_service import bump_data_version
+from app.services.catalog_events import catalog_committed
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_stats():
+    """Recompute the materialized stats row from scratch"""
+    stats = db.session.get(MusicStats, 1)
+    if stats is None:
+        stats = MusicStats(id=1)
+        db.session.add(stats)
+    stats.update_stats()
+    bump_data_version()
+    return stats
+
+
+def apply_catalog_changes(changes):
+    """Adjust the stats row for one committed transaction.
+
+    Counters are updated with relative UPDATEs so concurrent workers cannot
+    lose each other's increments. The top-10 lists are re-read only when
+    songs were added, removed or changed view counts.
+    """
+    songs_delta = len(changes.new_songs) - len(changes.deleted_songs)
+    artists_delta = len(changes.new_artists) - len(changes.deleted_artists)
+    songs_changed = bool(changes.new_songs or changes.deleted_songs or changes.views_delta)
+
+    if not (songs_delta or artists_delta or songs_changed):
+        return
+
+    table = MusicStats.__table__
+    with db.engine.begin() as conn:
+        updated = conn.execute(
+            update(table).where(table.c.id == 1).values(
+                total_songs=table.c.total_songs + songs_delta,
+                total_artists=table.c.total_artists + artists_delta,
+                total_views=table.c.total_views + changes.views_delta,
+                last_updated=datetime.utcnow()
+            )
+        ).rowcount
+
+        # No row yet: it is computed in full the first time it is read
+        if not updated or not songs_changed:
+            return
+
+        stats = MusicStats()
+        stats.set_top_lists(
+            conn.execute(MusicStats.top_artists_query(MusicStats.TOP_ARTISTS_LIMIT)).all(),
+            conn.execute(MusicStats.most_viewed_query(MusicStats.MOST_VIEWED_LIMIT)).all()
+        )
+        conn.execute(
+            update(table).where(table.c.id == 1).values(
+                top_artists=stats.top_artists,
+                most_viewed=stats.most_viewed,
+                most_viewed_song=stats.most_viewed_song,
+                most_popular_artist=conn.execute(MusicStats.popular_artist_query()).scalar()
+            )
+        )
+
+
+@catalog_committed.connect
+def _update_stats(app, changes):
+    try:
+        apply_catalog_changes(changes)
+    except Exception as e:
+        logger.warning("Could not update platform stats: %s", e)
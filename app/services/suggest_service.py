@@ -0,0 +1,176 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from app import db
+from app.models import Artist, Song
+from app.services.cache_service import get_shared_index
+from app.services.catalog_events import catalog_committed
+from app.services.search_service import clean_song_title
+from app.utilis.helpers import fold_text
+
+# Prefixes that match more entries than this are memoized after the first
+# lookup, so one- and two-letter keystrokes stay cheap on large catalogs
+MEMO_THRESHOLD = 256
+MEMO_SIZE = 2048
+
+
+class SuggestIndex:
+    """In-memory prefix index over artist names and clean song titles.
+
+    Every word start of a label is stored as a (term, key) pair in a sorted
+    list, so a prefix lookup is two bisects plus a top-k over the matching
+    slice. Entries are kept up to date from commit notifications, so lookups
+    never touch the database once the index is built.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._terms = []          # sorted (term, key) pairs
+        self._entries = {}        # key -> {'label', 'artist_id', 'terms'}
+        self._song_views = {}     # song id -> (artist id, views)
+        self._artist_views = {}   # artist id -> total views of their songs
+        self._memo = {}
+        self.built_at = None
+        self.version = None       # shared data version the build started at
+        self.refreshing = False
+
+    def build(self):
+        """Load every artist and song from the database"""
+        artists = db.session.query(Artist.id, Artist.name).all()
+        songs = db.session.query(Song.id, Song.title, Song.artist_id, Song.view_count).all()
+
+        with self._lock:
+            self._terms = []
+            self._entries = {}
+            self._song_views = {}
+            self._artist_views = {}
+            self._memo = {}
+
+            names = {}
+            for artist_id, name in artists:
+                names[artist_id] = name
+                self._put(('artist', artist_id), name, artist_id, sort=False)
+
+            for song_id, title, artist_id, views in songs:
+                label = clean_song_title(title, names.get(artist_id))
+                self._put(('song', song_id), label, artist_id, sort=False)
+                self._set_views(song_id, artist_id, views or 0)
+
+            self._terms.sort()
+            self.built_at = time.monotonic()
+
+    def apply(self, changes):
+        """Apply a CatalogChanges payload from a committed transaction"""
+        with self._lock:
+            for artist_id in changes.deleted_artists:
+                self._remove(('artist', artist_id))
+                self._artist_views.pop(artist_id, None)
+
+            for artist_id, artist in changes.artists.items():
+                self._put(('artist', artist_id), artist['name'], artist_id)
+
+            for song_id in changes.deleted_songs:
+                self._remove(('song', song_id))
+                self._set_views(song_id, None, 0)
+
+            for song_id, song in changes.songs.items():
+                artist = self._entries.get(('artist', song['artist_id']))
+                label = clean_song_title(song['title'], artist['label'] if artist else None)
+                self._put(('song', song_id), label, song['artist_id'])
+                self._set_views(song_id, song['artist_id'], song['view_count'])
+
+            self._memo = {}
+
+    def suggest(self, query, limit=5):
+        """Return the most popular artists and songs whose words start with query"""
+        prefix = ' '.join(fold_text(query).split())
+        if not prefix:
+            return {'artists': [], 'songs': []}
+
+        memo_key = (prefix, limit)
+        cached = self._memo.get(memo_key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            lo = bisect_left(self._terms, (prefix,))
+            hi = bisect_right(self._terms, (prefix + '\uffff',))
+            keys = {key for _, key in self._terms[lo:hi]}
+
+            artists = heapq.nlargest(
+                limit, (k for k in keys if k[0] == 'artist'),
+                key=lambda k: self._artist_views.get(k[1], 0)
+            )
+            songs = heapq.nlargest(
+                limit, (k for k in keys if k[0] == 'song'),
+                key=lambda k: self._song_views.get(k[1], (None, 0))[1]
+            )
+
+            result = {
+                'artists': [{'id': k[1], 'name': self._entries[k]['label']} for k in artists],
+                'songs': [self._song_result(k) for k in songs],
+            }
+
+            if hi - lo > MEMO_THRESHOLD:
+                if len(self._memo) >= MEMO_SIZE:
+                    self._memo.clear()
+                self._memo[memo_key] = result
+
+        return result
+
+    def _song_result(self, key):
+        entry = self._entries[key]
+        artist = self._entries.get(('artist', entry['artist_id']))
+        return {
+            'id': key[1],
+            'title': entry['label'],
+            'artist': artist['label'] if artist else None,
+        }
+
+    def _put(self, key, label, artist_id, sort=True):
+        self._remove(key)
+        folded = ' '.join(fold_text(label).split())
+        words = folded.split(' ')
+        # Index the full label and each word start: "khali" and "jones" both
+        # find "Khaligraph Jones"
+        terms = {' '.join(words[i:]) for i in range(len(words)) if words[i]}
+        for term in terms:
+            if sort:
+                insort(self._terms, (term, key))
+            else:
+                self._terms.append((term, key))
+        self._entries[key] = {'label': label, 'artist_id': artist_id, 'terms': terms}
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if not entry:
+            return
+        for term in entry['terms']:
+            i = bisect_left(self._terms, (term, key))
+            if i < len(self._terms) and self._terms[i] == (term, key):
+                del self._terms[i]
+
+    def _set_views(self, song_id, artist_id, views):
+        old_artist, old_views = self._song_views.pop(song_id, (None, 0))
+        if old_artist is not None:
+            self._artist_views[old_artist] = self._artist_views.get(old_artist, 0) - old_views
+        if artist_id is not None:
+            self._song_views[song_id] = (artist_id, views)
+            self._artist_views[artist_id] = self._artist_views.get(artist_id, 0) + views
+
+
+def get_suggest_index():
+    """Return the app's suggest index, building it on first use.
+
+    Commits in other worker processes are not seen by this process's index;
+    once the shared data version moves on it is rebuilt in the background.
+    """
+    return get_shared_index('suggest_index', SuggestIndex)
+
+
+@catalog_committed.connect
+def _update_suggest_index(app, changes):
+    index = app.extensions.get('suggest_index') if app else None
+    if index is not None and index.built_at is not None:
+        index.apply(changes)
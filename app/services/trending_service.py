@@ -0,0 +1,156 @@
+import calendar
+import logging
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import bindparam, delete, select, update
+from app import db
+from app.models import Song, SongViewHistory
+from app.services.cache_service import bump_data_version
+from app.services.catalog_events import CatalogChanges, notify_catalog_changed
+from app.utilis.delta_encoding import decode_deltas
+
+logger = logging.getLogger(__name__)
+
+
+def trending_score(samples, released_at, now, half_life_hours):
+    """Time-decayed view velocity (views per hour) from (unix seconds, views) samples.
+
+    Each interval between samples contributes its views/hour, weighted so an
+    interval half_life_hours old counts half as much as one ending now. The
+    average is also decayed by the age of the newest sample, so songs that
+    stopped being refreshed sink. A song with a single sample falls back to
+    its lifetime average since release.
+    """
+    if not samples:
+        return 0.0
+
+    def decay(ts):
+        return 0.5 ** (max(now - ts, 0) / 3600 / half_life_hours)
+
+    if len(samples) == 1:
+        sampled_at, views = samples[0]
+        hours = max((sampled_at - released_at) / 3600, 1.0)
+        return views / hours * decay(sampled_at)
+
+    weighted = 0.0
+    weights = 0.0
+    for (start, start_views), (end, end_views) in zip(samples, samples[1:]):
+        hours = (end - start) / 3600
+        if hours <= 0:
+            continue
+        weight = decay(end)
+        weighted += weight * max(end_views - start_views, 0) / hours
+        weights += weight
+
+    if not weights:
+        return 0.0
+    return weighted / weights * decay(samples[-1][0])
+
+
+def refresh_trending(youtube_service=None):
+    """Snapshot view counts for recent songs and recompute trending scores.
+
+    Songs released within TRENDING_WINDOW_DAYS are refreshed with batched
+    videos.list calls, one history sample is appended per song, and the
+    scores are written back in bulk. Songs that left the window drop to 0.
+    """
+    if youtube_service is None:
+        from app.services.youtube_service import YouTubeService
+        youtube_service = YouTubeService()
+
+    start_time = time.time()
+    window_days = current_app.config.get('TRENDING_WINDOW_DAYS', 30)
+    half_life = current_app.config.get('TRENDING_HALF_LIFE_HOURS', 24)
+    cutoff = datetime.utcnow() - timedelta(days=window_days)
+
+    songs = db.session.execute(
+        select(Song.id, Song.youtube_id, Song.title, Song.artist_id, Song.release_date,
+               Song.view_count, Song.like_count)
+        .where(Song.release_date >= cutoff)
+    ).all()
+
+    statistics = youtube_service.fetch_video_statistics([song.youtube_id for song in songs])
+    now = int(time.time())
+
+    histories = {
+        history.song_id: history
+        for history in SongViewHistory.query.filter(
+            SongViewHistory.song_id.in_([song.id for song in songs])
+        ).all()
+    } if songs else {}
+
+    song_updates = []
+    changes = CatalogChanges()
+
+    for song in songs:
+        if song.youtube_id not in statistics:
+            continue
+        views, likes = statistics[song.youtube_id]
+
+        history = histories.get(song.id)
+        if history is None:
+            history = SongViewHistory(song_id=song.id)
+            db.session.add(history)
+        history.append(now, views, likes)
+
+        samples = list(zip(decode_deltas(history.timestamps), decode_deltas(history.views)))
+        released_at = calendar.timegm(song.release_date.utctimetuple())
+        values = {
+            'id': song.id,
+            'view_count': views,
+            'like_count': likes,
+            'trending_score': round(trending_score(samples, released_at, now, half_life), 4)
+        }
+
+        if views != (song.view_count or 0) or likes != (song.like_count or 0):
+            values['updated_at'] = datetime.utcnow()
+            changes.update_song({
+                'id': song.id,
+                'title': song.title,
+                'artist_id': song.artist_id,
+                'release_date': song.release_date,
+                'view_count': views,
+                'like_count': likes,
+            }, views_delta=views - (song.view_count or 0))
+
+        song_updates.append(values)
+
+    # Bulk UPDATE by primary key. A new score alone is not a change to the
+    # song, so those rows keep their updated_at (Song.updated_at has an onupdate)
+    changed = [row for row in song_updates if 'updated_at' in row]
+    if changed:
+        db.session.execute(update(Song), changed)
+    scored = [{'song_id': row['id'], 'score': row['trending_score']}
+              for row in song_updates if 'updated_at' not in row]
+    if scored:
+        songs_table = Song.__table__
+        db.session.execute(
+            update(songs_table).where(songs_table.c.id == bindparam('song_id'))
+            .values(trending_score=bindparam('score'), updated_at=songs_table.c.updated_at),
+            scored
+        )
+
+    # Songs outside the window no longer trend; drop history of deleted songs
+    db.session.execute(
+        update(Song).where(Song.release_date < cutoff, Song.trending_score > 0)
+        .values(trending_score=0, updated_at=Song.updated_at)
+    )
+    db.session.execute(
+        delete(SongViewHistory).where(SongViewHistory.song_id.not_in(select(Song.id)))
+    )
+    db.session.commit()
+    notify_catalog_changed(changes)
+    # Scores changed even where view counts did not
+    bump_data_version()
+
+    duration = time.time() - start_time
+    logger.info("Refreshed trending scores for %s of %s songs in %.2fs",
+                len(song_updates), len(songs), duration)
+
+    return {
+        'songs_checked': len(songs),
+        'songs_updated': len(song_updates),
+        'api_calls': (len(songs) + 49) // 50,
+        'duration_seconds': round(duration, 2)
+    }
@@ -1,91 +1,103 @@
+import logging
 import requests
-from flask import current_app, url_for
+from flask import current_app
 from datetime import datetime, timedelta, timezone
 import time
 import re
 import concurrent.futures
+from app.services.ingestion_service import IngestionTelemetry, finish_run, generate_missing_images, start_run
 from app import db
-from app.models import Artist, Song
+from app.models import ChannelInfo, Song
+from app.services.artist_service import resolve_artist
+
+logger = logging.getLogger(__name__)
+
+# 🔥 More natural, human-like Kenyan music search queries (2025-focused)
+SEARCH_QUERIES = [
+    # General Kenyan music searches
+    "New Kenyan official music video 2025",
+    "Latest Kenyan songs 2025",
+    "Kenyan AfroPop official music video",
+    "Kenya Bongo and Afrobeat songs 2025",
+    "Nairobi music release this week",
+    "Kenya trending music videos 2025",
+    "Top Kenyan hits 2025",
+    "Kenyan RnB official video 2025",
+    "Kenya Hip Hop official release 2025",
+    "New gengetone song 2025",
+    "#Njerae  ",
+    "watendawili music",
+    "cedo",
+    "tipsy gee",
+    "costa ojwang",
+    "Bensoul",
+    "BURUKLYNBOYZ",
+    "Nikita Kering",
+    "Toxic lyrikali",
+    "Nyashinski",
+    "Xenia Manasseh",
+    "Karun",
+    "Muthaka",
+    "Lisa Oduor-Noah",
+    "Kui Ciu",
+    "Okello Max",
+    "Prince Indah",
+    "Watendawili",
+
+    # Artist-based queries
+    "Nyashinski new song 2025",
+    "Bensoul latest song 2025",
+    "Buruklyn Boyz new track 2025",
+    "Teslah new release 2025",
+    "Nikita Kering new video 2025",
+    "Khaligraph Jones official video 2025",
+    "Otile Brown latest song 2025",
+    "Iyanii new hit 2025",
+    "Savara or Bien new song 2025",
+
+    # Broader category searches
+    "Kenyan official gospel song 2025",
+    "Kenyan love song 2025",
+
+    "Kenya Top Charts 2025 music",
+    "Kenyan YouTube trending official video",
+    "Kenya latest audio release 2025",
+    "Best new Kenyan artists 2025",
+
+    # Additional open searches
+    "New Kenyan hit song",
+    "Kenyan music video premiere 2025",
+    "Kenya official music 2025 latest",
+]
+
 
 class YouTubeService:
-    def __init__(self):
+    def __init__(self, api_keys=None, telemetry=None):
+        """api_keys defaults to every configured key (crawl workers pass their share)"""
         self.base_url = "https://www.googleapis.com/youtube/v3"
-        self.api_keys = current_app.config.get('YOUTUBE_API_KEYS', [])
+        self.api_keys = api_keys if api_keys is not None else current_app.config.get('YOUTUBE_API_KEYS', [])
         if not isinstance(self.api_keys, list) or not self.api_keys:
             raise RuntimeError("YOUTUBE_API_KEYS must be a non-empty list in config")
 
         self.current_key_index = 0
-        self.default_thumbnail = url_for('static', filename='images/default_album.jpg', _external=False)
+        # Built without url_for so the service also works outside a request (scheduler, CLI)
+        self.default_thumbnail = f"{current_app.static_url_path}/images/default_album.jpg"
         self.api_delay = 1.0  # Reduced delay
         self.timeout = 10  # Reduced timeout
         
-        # Cache for channel info to avoid repeated API calls
+        # Cache for channel info to avoid repeated API calls, persisted in
+        # channel_info between crawls (see load/save_channel_cache)
         self.channel_cache = {}
+        self.fetched_channels = set()
         self.cache_ttl = timedelta(hours=24)
         
         # Batch size for parallel processing
         self.batch_size = 5
 
-        # 🔥 More natural, human-like Kenyan music search queries (2025-focused)
-        self.search_queries = [
-            # General Kenyan music searches
-            "New Kenyan official music video 2025",
-            "Latest Kenyan songs 2025",
-            "Kenyan AfroPop official music video",
-            "Kenya Bongo and Afrobeat songs 2025",
-            "Nairobi music release this week",
-            "Kenya trending music videos 2025",
-            "Top Kenyan hits 2025",
-            "Kenyan RnB official video 2025",
-            "Kenya Hip Hop official release 2025",
-            "New gengetone song 2025",
-            "#Njerae  ",
-            "watendawili music",
-            "cedo",
-            "tipsy gee",
-            "costa ojwang",
-            "Bensoul",
-            "BURUKLYNBOYZ",
-            "Nikita Kering",
-            "Toxic lyrikali",
-            "Nyashinski",
-             "Xenia Manasseh",
-    "Karun",
-    "Muthaka",
-    "Lisa Oduor-Noah",
-    "Kui Ciu",
-    "Okello Max",
-     "Prince Indah",
-     "Watendawili",
-            
-
-            # Artist-based queries
-            "Nyashinski new song 2025",
-            "Bensoul latest song 2025",
-            "Buruklyn Boyz new track 2025",
-            "Teslah new release 2025",
-            "Nikita Kering new video 2025",
-            "Khaligraph Jones official video 2025",
-            "Otile Brown latest song 2025",
-            "Iyanii new hit 2025",
-            "Savara or Bien new song 2025",
-            
-
-            # Broader category searches
-            "Kenyan official gospel song 2025",
-            "Kenyan love song 2025",
-            
-            "Kenya Top Charts 2025 music",
-            "Kenyan YouTube trending official video",
-            "Kenya latest audio release 2025",
-            "Best new Kenyan artists 2025",
-
-            # Additional open searches
-            "New Kenyan hit song",
-            "Kenyan music video premiere 2025",
-            "Kenya official music 2025 latest",
-           
-        ]
+        self.search_queries = list(SEARCH_QUERIES)
+        
+        # Stage timings, API calls/quota, cache and filter counts of this run
+        self.telemetry = telemetry or IngestionTelemetry()
 
     def get_current_api_key(self):
         return self.api_keys[self.current_key_index]
@@ -94,17 +106,32 @@ class YouTubeService:
         self.current_key_index = (self.current_key_index + 1) % len(self.api_keys)
         return self.get_current_api_key()
 
+    def _api_get(self, endpoint, params, timeout=None):
+        """GET an API endpoint, counting the call and its quota in the telemetry"""
+        start = time.perf_counter()
+        resp = None
+        try:
+            resp = requests.get(f"{self.base_url}/{endpoint}", params=params, timeout=timeout or self.timeout)
+            return resp
+        finally:
+            self.telemetry.http_call(endpoint, params.get('key'), time.perf_counter() - start,
+                                     None if resp is None else resp.status_code == 200)
+
     def search_kenyan_music(self):
         """Searches YouTube for verified Kenyan music uploaded in the last 30 days."""
         all_videos = []
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=30)
         cutoff_iso = cutoff_date.strftime("%Y-%m-%dT%H:%M:%SZ")
 
-        print(f"🎯 Searching for Kenyan music (last 30 days)")
-        print(f"📅 Cutoff: {cutoff_iso}")
+        logger.info("Searching for Kenyan music (last 30 days)")
+        logger.info("Cutoff: %s", cutoff_iso)
+        
+        # Worker threads have no app context, so the persistent cache is
+        # read up front and written back once the search is done
+        self.load_channel_cache()
 
         # Process queries in batches for better performance
-        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        with self.telemetry.stage('search'), concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
             future_to_query = {
                 executor.submit(self._search_artist_2025, query, cutoff_date): query 
                 for query in self.search_queries
@@ -115,19 +142,35 @@ class YouTubeService:
                 try:
                     videos = future.result()
                     all_videos.extend(videos)
-                    print(f"🔎 Query '{query}': {len(videos)} results")
+                    logger.debug("Query '%s': %s results", query, len(videos))
                 except Exception as e:
-                    print(f"⚠️ Query '{query}' failed: {e}")
+                    logger.warning("Query '%s' failed: %s", query, e)
 
-        unique = self._remove_duplicates(all_videos)
-        filtered = self._filter_2025_content(unique)
+        self.save_channel_cache()
+        
+        with self.telemetry.stage('filter'):
+            unique = self._remove_duplicates(all_videos)
+            filtered = self._filter_2025_content(unique)
 
-        # ✅ Keep only the top 50 newest verified Kenyan songs
-        filtered = filtered[:50]
+            # ✅ Keep only the top 50 newest verified Kenyan songs
+            self.telemetry.reject('over_limit', max(0, len(filtered) - 50))
+            filtered = filtered[:50]
 
-        print(f"🎵 Final selection: {len(filtered)} new Kenyan songs")
+        logger.info("Final selection: %s new Kenyan songs", len(filtered))
         return filtered
 
+    def search_query(self, query):
+        """Verified Kenyan releases from the last 30 days for one search query.
+
+        The caller loads and saves the channel cache around a series of
+        queries (see crawl_service.run_crawl_worker).
+        """
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=30)
+        with self.telemetry.stage('search'):
+            videos = self._search_artist_2025(query, cutoff_date)
+        with self.telemetry.stage('filter'):
+            return self._filter_2025_content(self._remove_duplicates(videos))
+
     def _search_artist_2025(self, search_term, cutoff_date):
         videos = []
         api_key = self.get_current_api_key()
@@ -145,9 +188,10 @@ class YouTubeService:
         }
 
         try:
-            resp = requests.get(f"{self.base_url}/search", params=params, timeout=self.timeout)
+            resp = self._api_get('search', params)
             if resp.status_code != 200:
-                print(f"  YouTube API error ({resp.status_code}): {resp.text[:200]}")
+                logger.warning("YouTube API error (%s): %s", resp.status_code, resp.text[:200])
+                self.telemetry.query_yield(search_term, 0, 0)
                 self.rotate_api_key()
                 return videos
 
@@ -159,14 +203,15 @@ class YouTubeService:
             for batch in video_batches:
                 batch_results = self._process_video_batch(batch, search_term, cutoff_date)
                 videos.extend([v for v in batch_results if v])
+            self.telemetry.query_yield(search_term, len(items), len(videos))
                 
             self.rotate_api_key()
             time.sleep(self.api_delay)
             
         except requests.exceptions.Timeout:
-            print(f"⏰ Timeout for query: {search_term}")
+            logger.warning("Timeout for query: %s", search_term)
         except Exception as e:
-            print(f"❌ Error in _search_artist_2025: {e}")
+            logger.error("Error in _search_artist_2025: %s", e)
 
         return videos
 
@@ -185,18 +230,21 @@ class YouTubeService:
                     if result:
                         results.append(result)
                 except Exception as e:
-                    print(f"⚠️ Video processing error: {e}")
+                    self.telemetry.reject('error')
+                    logger.warning("Video processing error: %s", e)
         return results
 
     def _process_2025_video(self, item, search_term, cutoff_date):
         try:
             video_id = item.get('id', {}).get('videoId')
             if not video_id:
+                self.telemetry.reject('missing_video_id')
                 return None
 
             snippet = item.get('snippet', {})
             published_at = snippet.get('publishedAt')
             if not published_at:
+                self.telemetry.reject('missing_date')
                 return None
 
             # Fast date parsing without full ISO parsing
@@ -204,9 +252,11 @@ class YouTubeService:
                 published_str = published_at.replace('Z', '').replace('T', ' ').split('.')[0]
                 published_dt = datetime.strptime(published_str, '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
             except:
+                self.telemetry.reject('bad_date')
                 return None
 
             if published_dt < cutoff_date:
+                self.telemetry.reject('too_old')
                 return None
 
             title = snippet.get('title', '')
@@ -215,20 +265,27 @@ class YouTubeService:
 
             # ✅ Quick pre-filter before API call
             if not self._quick_pre_filter(title, channel_title):
+                self.telemetry.reject('pre_filter')
                 return None
 
             # ✅ Check channel info with caching
             channel_info = self._get_cached_channel_info(channel_id)
             if not channel_info:
+                self.telemetry.reject('no_channel_info')
                 return None
 
             is_kenyan = channel_info.get("country") == "KE"
             subs = channel_info.get("subs", 0)
-            if not is_kenyan or subs < 10000:
+            if not is_kenyan:
+                self.telemetry.reject('not_kenyan')
+                return None
+            if subs < 10000:
+                self.telemetry.reject('low_subscribers')
                 return None
 
             # ✅ Filter official releases only
             if not self._is_2025_official_release(title, channel_title, search_term):
+                self.telemetry.reject('not_official')
                 return None
 
             thumbnail_url = snippet.get('thumbnails', {}).get('high', {}).get('url', self.default_thumbnail)
@@ -241,11 +298,13 @@ class YouTubeService:
                 'thumbnail_url': thumbnail_url,
                 'youtube_url': f"https://www.youtube.com/watch?v={video_id}",
                 'verified_artist': channel_title,
+                'channel_id': channel_id,
                 'original_title': title
             }
 
         except Exception as e:
-            print(f"  Error processing video item: {e}")
+            self.telemetry.reject('error')
+            logger.warning("Error processing video item: %s", e)
             return None
 
     def _quick_pre_filter(self, title, channel_title):
@@ -262,17 +321,57 @@ class YouTubeService:
         # Check cache first
         cache_entry = self.channel_cache.get(channel_id)
         if cache_entry and datetime.now(timezone.utc) - cache_entry['timestamp'] < self.cache_ttl:
+            self.telemetry.channel_cache(hit=True)
             return cache_entry['data']
             
         # Fetch from API
-        channel_info = self._get_channel_info(channel_id)
+        self.telemetry.channel_cache(hit=False)
+        with self.telemetry.stage('channel_verify'):
+            channel_info = self._get_channel_info(channel_id)
         if channel_info:
             self.channel_cache[channel_id] = {
                 'data': channel_info,
                 'timestamp': datetime.now(timezone.utc)
             }
+            self.fetched_channels.add(channel_id)
         return channel_info
 
+    def load_channel_cache(self):
+        """Load unexpired channel info saved by earlier crawls."""
+        try:
+            cutoff = datetime.utcnow() - self.cache_ttl
+            for channel in ChannelInfo.query.filter(ChannelInfo.fetched_at >= cutoff):
+                self.channel_cache[channel.channel_id] = {
+                    'data': {'country': channel.country or '', 'subs': channel.subscriber_count or 0},
+                    'timestamp': channel.fetched_at.replace(tzinfo=timezone.utc)
+                }
+            logger.info("Loaded %s cached channels", len(self.channel_cache))
+        except Exception as e:
+            logger.warning("Could not load channel cache: %s", e)
+
+    def save_channel_cache(self):
+        """Persist channel info fetched during this crawl."""
+        if not self.fetched_channels:
+            return
+        
+        channel_ids = list(self.fetched_channels)
+        try:
+            db.session.execute(db.delete(ChannelInfo).where(ChannelInfo.channel_id.in_(channel_ids)))
+            db.session.execute(db.insert(ChannelInfo), [
+                {
+                    'channel_id': channel_id,
+                    'country': self.channel_cache[channel_id]['data'].get('country'),
+                    'subscriber_count': self.channel_cache[channel_id]['data'].get('subs', 0),
+                    'fetched_at': self.channel_cache[channel_id]['timestamp'].replace(tzinfo=None)
+                }
+                for channel_id in channel_ids
+            ])
+            db.session.commit()
+            self.fetched_channels.clear()
+        except Exception as e:
+            logger.warning("Could not save channel cache: %s", e)
+            db.session.rollback()
+
     def _get_channel_info(self, channel_id):
         api_key = self.get_current_api_key()
         params = {
@@ -282,7 +381,7 @@ class YouTubeService:
         }
         
         try:
-            resp = requests.get(f"{self.base_url}/channels", params=params, timeout=8)  # Reduced timeout
+            resp = self._api_get('channels', params, timeout=8)  # Reduced timeout
             if resp.status_code != 200:
                 return None
 
@@ -299,15 +398,53 @@ class YouTubeService:
             return {"country": country, "subs": subs}
             
         except requests.exceptions.Timeout:
-            print(f"⏰ Channel info timeout for {channel_id}")
+            logger.warning("Channel info timeout for %s", channel_id)
             return None
         except Exception as e:
-            print(f"❌ Channel info error for {channel_id}: {e}")
+            logger.error("Channel info error for %s: %s", channel_id, e)
             return None
 
+    def fetch_video_statistics(self, video_ids):
+        """Fetch view and like counts, 50 videos per videos.list call (1 quota unit each)."""
+        statistics = {}
+        
+        for i in range(0, len(video_ids), 50):
+            batch = video_ids[i:i + 50]
+            
+            # Try each API key once before giving up on the batch
+            for _ in range(len(self.api_keys)):
+                params = {
+                    'part': 'statistics',
+                    'id': ','.join(batch),
+                    'maxResults': 50,
+                    'key': self.get_current_api_key()
+                }
+                
+                try:
+                    resp = self._api_get('videos', params)
+                except requests.exceptions.RequestException as e:
+                    logger.warning("videos.list request failed: %s", e)
+                    self.rotate_api_key()
+                    continue
+                
+                if resp.status_code != 200:
+                    logger.warning("YouTube API error (%s): %s", resp.status_code, resp.text[:200])
+                    self.rotate_api_key()
+                    continue
+                
+                for item in resp.json().get('items', []):
+                    stats = item.get('statistics', {})
+                    statistics[item['id']] = (
+                        int(stats.get('viewCount', 0)),
+                        int(stats.get('likeCount', 0))
+                    )
+                break
+        
+        return statistics
+
     def _generate_placeholder_thumbnail(self, artist_name, song_title):
         """Generate a lightweight AI placeholder image URL."""
-        return url_for('static', filename='images/default_album.jpg', _external=False)
+        return self.default_thumbnail
 
     def _is_2025_official_release(self, title, channel_title, search_term):
         title_lower = title.lower()
@@ -349,21 +486,29 @@ class YouTubeService:
             if vid and vid not in seen:
                 seen.add(vid)
                 unique.append(v)
+        self.telemetry.reject('duplicate', len(videos) - len(unique))
         return unique
 
     def _filter_2025_content(self, videos):
         cutoff = datetime.now(timezone.utc) - timedelta(days=30)
+        fresh = [v for v in videos if v['published_at'] >= cutoff]
         filtered = [
-            v for v in videos
-            if v['published_at'] >= cutoff and not any(x in v['title'].lower() for x in ['mix', 'cover', 'reaction'])
+            v for v in fresh
+            if not any(x in v['title'].lower() for x in ['mix', 'cover', 'reaction'])
         ]
+        self.telemetry.reject('too_old', len(videos) - len(fresh))
+        self.telemetry.reject('title_filter', len(fresh) - len(filtered))
         filtered.sort(key=lambda x: x['published_at'], reverse=True)
         return filtered
 
     def save_videos_to_db(self, videos):
         """Save videos to database with proper artist ID handling."""
+        with self.telemetry.stage('persist'):
+            return self._save_videos(videos)
+
+    def _save_videos(self, videos):
         if not videos:
-            print("📭 No new videos to save")
+            logger.info("No new videos to save")
             return 0
 
         saved_count = 0
@@ -372,18 +517,18 @@ class YouTubeService:
         for v in videos:
             try:
                 if v['published_at'] < cutoff:
+                    self.telemetry.reject('too_old')
                     continue
 
                 # Check if song already exists
                 if Song.query.filter_by(youtube_id=v['video_id']).first():
+                    self.telemetry.reject('already_saved')
                     continue
 
-                # Find or create artist
-                artist = Artist.query.filter_by(name=v['channel_title']).first()
-                if not artist:
-                    artist = Artist(name=v['channel_title'])
-                    db.session.add(artist)
-                    db.session.flush()  # This gets the artist ID
+                # Find or create artist by channel id, then by name (renamed
+                # channels and re-cased titles keep one artist)
+                artist = resolve_artist(v['channel_title'], channel_id=v.get('channel_id'))
+                db.session.flush()  # This gets the artist ID
 
                 # Create song
                 song = Song(
@@ -398,28 +543,32 @@ class YouTubeService:
                 saved_count += 1
 
                 days_ago = (datetime.now(timezone.utc) - v['published_at']).days
-                print(f"💾 Saved: {v['title']} ({days_ago} days ago)")
+                logger.debug("Saved: %s (%s days ago)", v['title'], days_ago)
 
             except Exception as e:
-                print(f"❌ Error saving video {v.get('video_id')}: {e}")
+                self.telemetry.reject('save_error')
+                logger.error("Error saving video %s: %s", v.get('video_id'), e)
                 db.session.rollback()
                 continue
 
         try:
             db.session.commit()
-            print(f"🎉 Saved {saved_count} new Kenyan songs!")
+            logger.info("Saved %s new Kenyan songs!", saved_count)
         except Exception as e:
-            print(f"❌ Commit error: {e}")
+            logger.error("Commit error: %s", e)
             db.session.rollback()
             return 0
 
         return saved_count
 
-    def update_music_library(self):
-        """Main method to update the music library - combines search and save."""
-        print("🚀 Starting Kenyan music library update...")
+    def update_music_library(self, source='manual', generate_images=False):
+        """Main method to update the music library - search, save and record the run."""
+        logger.info("Starting Kenyan music library update...")
         
+        run = start_run(source)
         start_time = time.time()
+        videos = []
+        saved_count = 0
         
         try:
             # Search for new Kenyan music
@@ -428,22 +577,31 @@ class YouTubeService:
             # Save to database
             saved_count = self.save_videos_to_db(videos)
             
+            # Album art for the new songs (if Gemini is available)
+            images_generated = generate_missing_images(saved_count, self.telemetry) if generate_images else 0
+            
             end_time = time.time()
             duration = end_time - start_time
             
-            print(f"✅ Update completed in {duration:.2f} seconds")
-            print(f"📊 Results: {len(videos)} found, {saved_count} saved")
+            logger.info("Update completed in %.2f seconds", duration)
+            logger.info("Results: %s found, %s saved", len(videos), saved_count)
+            finish_run(run, self.telemetry, videos_found=len(videos), videos_saved=saved_count,
+                       images_generated=images_generated)
             
             return {
                 'status': 'success',
+                'run_id': run.id,
                 'videos_found': len(videos),
                 'videos_saved': saved_count,
+                'images_generated': images_generated,
                 'duration_seconds': round(duration, 2)
             }
             
         except Exception as e:
-            print(f"❌ Update failed: {e}")
+            logger.error("Update failed: %s", e)
+            finish_run(run, self.telemetry, videos_found=len(videos), videos_saved=saved_count, error=str(e))
             return {
                 'status': 'error',
+                'run_id': run.id,
                 'message': str(e)
             }
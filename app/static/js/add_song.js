@@ -0,0 +1,27 @@
+document.getElementById('addSongForm').addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    const formData = new FormData(this);
+
+    fetch(this.action, {
+        method: 'POST',
+        body: formData
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            alert('Success: ' + data.message);
+            this.reset();
+            // Set today's date as default
+            document.getElementById('release_date').value = new Date().toISOString().split('T')[0];
+        } else {
+            alert('Error: ' + data.message);
+        }
+    })
+    .catch(error => {
+        alert('Error: ' + error);
+    });
+});
+
+// Set today's date as default
+document.getElementById('release_date').value = new Date().toISOString().split('T')[0];
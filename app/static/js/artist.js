@@ -0,0 +1,84 @@
+// Set by artist.html on this script's tag
+const artistPage = document.currentScript.dataset;
+
+// Social Media Sharing Functions
+function setupSocialSharing() {
+    const shareButtons = document.querySelectorAll('.share-btn');
+    const copyLinkBtn = document.getElementById('copyLinkBtn');
+
+    const currentUrl = window.location.href;
+    const artistName = artistPage.artistName;
+    const shareText = `Check out ${artistName}, a talented Kenyan artist on Good Music KE! ${currentUrl}`;
+
+    const shareUrls = {
+        twitter: `https://twitter.com/intent/tweet?text=${encodeURIComponent(shareText)}`,
+        facebook: `https://www.facebook.com/sharer/sharer.php?u=${encodeURIComponent(currentUrl)}`,
+        whatsapp: `https://api.whatsapp.com/send?text=${encodeURIComponent(shareText)}`
+    };
+
+    shareButtons.forEach(button => {
+        button.addEventListener('click', function() {
+            const platform = this.dataset.platform;
+            const shareUrl = shareUrls[platform];
+
+            if (shareUrl) {
+                window.open(shareUrl, '_blank', 'width=600,height=400');
+            }
+        });
+    });
+
+    copyLinkBtn.addEventListener('click', function() {
+        const url = window.location.href;
+
+        if (navigator.clipboard) {
+            navigator.clipboard.writeText(url).then(() => {
+                showToast('Link copied to clipboard!', 'success');
+            }).catch(() => {
+                fallbackCopy(url);
+            });
+        } else {
+            fallbackCopy(url);
+        }
+    });
+
+    function fallbackCopy(text) {
+        const textArea = document.createElement("textarea");
+        textArea.value = text;
+        document.body.appendChild(textArea);
+        textArea.select();
+        document.execCommand('copy');
+        document.body.removeChild(textArea);
+        showToast('Link copied to clipboard!', 'success');
+    }
+}
+
+function generateDescription() {
+    const btn = document.getElementById('generateDescBtn');
+    const originalHTML = btn.innerHTML;
+
+    btn.innerHTML = '<span class="spinner-border spinner-border-sm me-2"></span> Generating...';
+    btn.disabled = true;
+
+    fetch(artistPage.descriptionUrl, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showToast('Biography generated successfully! Reloading...', 'success');
+            setTimeout(() => location.reload(), 1500);
+        } else {
+            throw new Error(data.message || 'Unknown error');
+        }
+    })
+    .catch(error => {
+        showToast('Error: ' + error.message, 'error');
+        btn.innerHTML = originalHTML;
+        btn.disabled = false;
+    });
+}
+
+document.addEventListener('DOMContentLoaded', setupSocialSharing);
@@ -0,0 +1,39 @@
+function searchArtists() {
+    const searchTerm = document.getElementById('artistSearch').value.toLowerCase();
+    const artistItems = document.querySelectorAll('.artist-item');
+
+    let visibleCount = 0;
+
+    artistItems.forEach(item => {
+        const artistName = item.querySelector('.card-title').textContent.toLowerCase();
+        if (artistName.includes(searchTerm)) {
+            item.style.display = 'block';
+            visibleCount++;
+        } else {
+            item.style.display = 'none';
+        }
+    });
+
+    // Update the counter
+    const badge = document.querySelector('.badge.bg-dark.fs-6');
+    const total = artistItems.length;
+    if (badge && searchTerm) {
+        badge.textContent = `${visibleCount} of ${total} artists`;
+    } else if (badge) {
+        badge.textContent = `${total} artists`;
+    }
+}
+
+// Enable search on Enter key
+document.getElementById('artistSearch').addEventListener('keypress', function(e) {
+    if (e.key === 'Enter') {
+        searchArtists();
+    }
+});
+
+// Clear search when input is cleared
+document.getElementById('artistSearch').addEventListener('input', function(e) {
+    if (this.value === '') {
+        searchArtists();
+    }
+});
@@ -0,0 +1,293 @@
+// Endpoint URLs rendered by base.html as data-* attributes on <body>
+const appUrls = document.body.dataset;
+
+// Loading overlay functions
+function showLoading(title, subtitle) {
+    const overlay = document.getElementById('loadingOverlay');
+    const loadingTitle = document.getElementById('loadingTitle');
+    const loadingSubtitle = document.getElementById('loadingSubtitle');
+
+    loadingTitle.textContent = title || 'Updating Music Library';
+    loadingSubtitle.textContent = subtitle || 'Searching for new Kenyan music...';
+
+    overlay.classList.add('active');
+    document.body.style.overflow = 'hidden';
+
+    // Reset progress and steps
+    updateProgress(0);
+    resetSteps();
+    setActiveStep(1);
+}
+
+function hideLoading() {
+    const overlay = document.getElementById('loadingOverlay');
+    overlay.classList.remove('active');
+    document.body.style.overflow = 'auto';
+}
+
+function updateProgress(percentage) {
+    const progressBar = document.getElementById('progressBar');
+    progressBar.style.width = percentage + '%';
+}
+
+function resetSteps() {
+    const steps = document.querySelectorAll('.loading-step');
+    steps.forEach(step => {
+        step.classList.remove('step-active', 'step-completed');
+    });
+}
+
+function setActiveStep(stepNumber) {
+    resetSteps();
+    for (let i = 1; i < stepNumber; i++) {
+        document.getElementById('step' + i).classList.add('step-completed');
+    }
+    document.getElementById('step' + stepNumber).classList.add('step-active');
+}
+
+function updateLoadingStatus(title, subtitle, progress, step) {
+    const loadingTitle = document.getElementById('loadingTitle');
+    const loadingSubtitle = document.getElementById('loadingSubtitle');
+
+    if (title) loadingTitle.textContent = title;
+    if (subtitle) loadingSubtitle.textContent = subtitle;
+    if (progress !== undefined) updateProgress(progress);
+    if (step !== undefined) setActiveStep(step);
+}
+
+// Toast notification
+function showToast(message) {
+    const toastElement = document.getElementById('copyToast');
+    const toastMessage = document.getElementById('toastMessage');
+    toastMessage.textContent = message;
+
+    const toast = new bootstrap.Toast(toastElement);
+    toast.show();
+}
+
+// Enhanced button loading states
+function updateSongs() {
+    const btn = document.getElementById('updateBtn');
+    const originalHTML = btn.innerHTML;
+    btn.innerHTML = '<span class="loading"></span> Updating...';
+    btn.disabled = true;
+
+    // Show loading overlay
+    showLoading('Updating Music Library', 'Searching YouTube for new Kenyan music...');
+
+    // Simulate progress updates
+    let progress = 0;
+    const progressInterval = setInterval(() => {
+        progress += Math.random() * 10;
+        if (progress > 90) progress = 90;
+        updateProgress(progress);
+    }, 500);
+
+    fetch(appUrls.updateSongsUrl, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        clearInterval(progressInterval);
+        updateProgress(100);
+        setActiveStep(4);
+
+        setTimeout(() => {
+            hideLoading();
+
+            if (data.success) {
+                showToast('Songs updated successfully! Found ' + (data.videos_found || 0) + ' new songs');
+                setTimeout(() => {
+                    location.reload();
+                }, 2000);
+            } else {
+                showToast('Error updating songs: ' + data.message);
+                btn.innerHTML = originalHTML;
+                btn.disabled = false;
+            }
+        }, 1000);
+    })
+    .catch(error => {
+        clearInterval(progressInterval);
+        hideLoading();
+        showToast('Error updating songs: ' + error);
+        btn.innerHTML = originalHTML;
+        btn.disabled = false;
+    });
+}
+
+function manualSearch() {
+    const btn = document.getElementById('manualSearchBtn');
+    const originalHTML = btn.innerHTML;
+    btn.innerHTML = '<span class="loading"></span> Searching...';
+    btn.disabled = true;
+
+    showLoading('Manual Search', 'Searching top Kenyan artists for new music...');
+
+    let progress = 0;
+    const progressInterval = setInterval(() => {
+        progress += Math.random() * 15;
+        if (progress > 85) progress = 85;
+        updateProgress(progress);
+    }, 400);
+
+    fetch(appUrls.manualSearchUrl, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        clearInterval(progressInterval);
+        updateProgress(100);
+        setActiveStep(4);
+
+        setTimeout(() => {
+            hideLoading();
+
+            if (data.success) {
+                showToast('Manual search completed! Found ' + (data.videos_found || 0) + ' new songs');
+                setTimeout(() => {
+                    location.reload();
+                }, 2000);
+            } else {
+                showToast('Error in manual search: ' + data.message);
+                btn.innerHTML = originalHTML;
+                btn.disabled = false;
+            }
+        }, 1000);
+    })
+    .catch(error => {
+        clearInterval(progressInterval);
+        hideLoading();
+        showToast('Error in manual search: ' + error);
+        btn.innerHTML = originalHTML;
+        btn.disabled = false;
+    });
+}
+
+// Search suggestions (debounced, served from the in-memory index)
+function setupSearchSuggestions() {
+    const input = document.getElementById('searchInput');
+    const menu = document.getElementById('searchSuggestions');
+    if (!input || !menu) return;
+
+    let debounceTimer = null;
+    let controller = null;
+
+    function hideSuggestions() {
+        menu.classList.remove('show');
+        menu.innerHTML = '';
+    }
+
+    function addHeader(text) {
+        const li = document.createElement('li');
+        const header = document.createElement('h6');
+        header.className = 'dropdown-header';
+        header.textContent = text;
+        li.appendChild(header);
+        menu.appendChild(li);
+    }
+
+    function addItem(url, text, detail) {
+        const li = document.createElement('li');
+        const link = document.createElement('a');
+        link.className = 'dropdown-item';
+        link.href = url;
+        link.textContent = text;
+        if (detail) {
+            const small = document.createElement('small');
+            small.className = 'ms-2';
+            small.textContent = detail;
+            link.appendChild(small);
+        }
+        li.appendChild(link);
+        menu.appendChild(li);
+    }
+
+    function renderSuggestions(data) {
+        menu.innerHTML = '';
+        if (data.artists.length) {
+            addHeader('Artists');
+            data.artists.forEach(artist => addItem(artist.url, artist.name));
+        }
+        if (data.songs.length) {
+            addHeader('Songs');
+            data.songs.forEach(song => addItem(song.url, song.title, song.artist));
+        }
+        menu.classList.toggle('show', data.artists.length + data.songs.length > 0);
+    }
+
+    function fetchSuggestions(query) {
+        if (controller) controller.abort();
+        controller = new AbortController();
+
+        fetch(appUrls.suggestUrl + '?q=' + encodeURIComponent(query), {
+            signal: controller.signal
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (input.value.trim() === query) renderSuggestions(data);
+        })
+        .catch(error => {
+            if (error.name !== 'AbortError') hideSuggestions();
+        });
+    }
+
+    input.addEventListener('input', () => {
+        clearTimeout(debounceTimer);
+        const query = input.value.trim();
+        if (!query) {
+            hideSuggestions();
+            return;
+        }
+        debounceTimer = setTimeout(() => fetchSuggestions(query), 150);
+    });
+
+    input.addEventListener('keydown', e => {
+        if (e.key === 'Escape') hideSuggestions();
+    });
+
+    input.addEventListener('blur', () => setTimeout(hideSuggestions, 200));
+}
+
+document.addEventListener('DOMContentLoaded', setupSearchSuggestions);
+
+function cleanupOldSongs() {
+    if (confirm('Remove all songs older than 1 month?')) {
+        showLoading('Cleaning Up', 'Removing old songs from database...');
+        updateProgress(50);
+
+        fetch(appUrls.cleanupUrl, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            }
+        })
+        .then(response => response.json())
+        .then(data => {
+            updateProgress(100);
+
+            setTimeout(() => {
+                hideLoading();
+
+                if (data.success) {
+                    showToast('Cleanup successful! Removed ' + (data.deleted_count || 0) + ' old songs');
+                    setTimeout(() => {
+                        location.reload();
+                    }, 1500);
+                } else {
+                    showToast('Error during cleanup: ' + data.message);
+                }
+            }, 1000);
+        })
+        .catch(error => {
+            hideLoading();
+            showToast('Error during cleanup: ' + error);
+        });
+    }
+}
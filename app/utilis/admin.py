@@ -0,0 +1,47 @@
+"""Access check for the admin pages and their JSON APIs.
+
+A request gets in with ``Authorization: Bearer <ADMIN_TOKEN>``, or from a
+browser session that opened an admin page once with ``?token=<ADMIN_TOKEN>``
+or was authorized for the profiler at /admin/profiles. Without ADMIN_TOKEN
+only those profiler sessions (and the debug server) get in. Sessions count
+only with a non-default SECRET_KEY; with the default one anyone can forge
+them.
+"""
+import hmac
+from functools import wraps
+from flask import abort, current_app, request, session
+from app.utilis.profiler import SESSION_KEY as PROFILER_SESSION_KEY, sessions_trusted
+
+SESSION_KEY = 'admin'
+
+
+def _matches(supplied, token):
+    return bool(supplied) and hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def is_admin():
+    """True if the current request may see admin pages (remembers a valid ?token=)"""
+    trusted = sessions_trusted(current_app)
+    if trusted and (session.get(SESSION_KEY) or session.get(PROFILER_SESSION_KEY)):
+        return True
+    token = current_app.config.get('ADMIN_TOKEN')
+    if not token:
+        return current_app.debug
+    authorization = request.headers.get('Authorization', '')
+    if authorization.startswith('Bearer ') and _matches(authorization[len('Bearer '):], token):
+        return True
+    if _matches(request.args.get('token'), token):
+        if trusted:
+            session[SESSION_KEY] = True
+        return True
+    return False
+
+
+def admin_required(view):
+    """Answer 403 unless the request is from an admin (see is_admin)"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not is_admin():
+            abort(403)
+        return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,120 @@
+"""Fingerprinted, precompressed static bundles.
+
+``build_assets`` copies every file under ``static/css`` and ``static/js``
+to ``static/dist`` with a content hash in its name, writes ``.gz`` (and
+``.br`` when the ``brotli`` package is installed) siblings, and records
+the mapping in ``static/dist/manifest.json``. Templates link assets
+through ``asset_url('css/main.css')``, which falls back to the plain
+static file when no build has been run (local development).
+
+Hashed files never change, so ``/static/dist/`` is served with a one-year
+immutable Cache-Control and the best precompressed variant the client
+accepts.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from flask import current_app, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SOURCE_DIRS = ('css', 'js')
+DIST_DIR = 'dist'
+MANIFEST = 'manifest.json'
+IMMUTABLE_MAX_AGE = 31536000
+
+
+def build_assets(static_folder):
+    """Write hashed and compressed copies of the CSS/JS sources; returns the manifest"""
+    dist = os.path.join(static_folder, DIST_DIR)
+    if os.path.isdir(dist):
+        shutil.rmtree(dist)
+    os.makedirs(dist)
+
+    manifest = {}
+    for source_dir in SOURCE_DIRS:
+        root = os.path.join(static_folder, source_dir)
+        for dirpath, _, files in os.walk(root):
+            for name in sorted(files):
+                path = os.path.join(dirpath, name)
+                logical = os.path.relpath(path, static_folder).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    data = f.read()
+
+                stem, ext = os.path.splitext(os.path.relpath(path, static_folder))
+                hashed = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+                target = os.path.join(dist, hashed)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+
+                with open(target, 'wb') as f:
+                    f.write(data)
+                with open(target + '.gz', 'wb') as f:
+                    # mtime=0 keeps the output identical across builds
+                    f.write(gzip.compress(data, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    with open(target + '.br', 'wb') as f:
+                        f.write(brotli.compress(data, quality=11))
+
+                manifest[logical] = f"{DIST_DIR}/{hashed.replace(os.sep, '/')}"
+
+    with open(os.path.join(dist, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def _load_manifest(app):
+    manifest = app.extensions.get('asset_manifest')
+    if manifest is None:
+        try:
+            with open(os.path.join(app.static_folder, DIST_DIR, MANIFEST)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        app.extensions['asset_manifest'] = manifest
+    return manifest
+
+
+def asset_url(path):
+    """URL of the built copy of a static asset, or of the source file if unbuilt"""
+    built = _load_manifest(current_app).get(path)
+    return url_for('static', filename=built or path)
+
+
+def _serve_dist(filename):
+    directory = os.path.join(current_app.static_folder, DIST_DIR)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    accepted = request.accept_encodings
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if accepted[encoding] and os.path.isfile(os.path.join(directory, filename + suffix)):
+            response = send_from_directory(directory, filename + suffix, mimetype=mimetype,
+                                           max_age=IMMUTABLE_MAX_AGE)
+            response.content_encoding = encoding
+            break
+    else:
+        response = send_from_directory(directory, filename, mimetype=mimetype,
+                                       max_age=IMMUTABLE_MAX_AGE)
+
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def init_assets(app):
+    """Register asset_url() in templates and the /static/dist/ route"""
+    app.add_template_global(asset_url)
+    app.add_url_rule(f"{app.static_url_path}/{DIST_DIR}/<path:filename>",
+                     endpoint='dist_static', view_func=_serve_dist)
+
+
+if __name__ == '__main__':
+    # Build step without create_app (no database needed): python -m app.utilis.assets
+    built = build_assets(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static'))
+    print(f"📦 Built {len(built)} assets")
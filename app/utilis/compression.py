@@ -0,0 +1,221 @@
+"""WSGI response compression.
+
+Negotiates brotli or gzip, by the client's q-values, for text-like
+responses with a known Content-Length between a minimum and a maximum
+size. brotli is a pinned requirement; without the package only gzip is
+offered. Streamed responses, HEAD requests and bodies that already
+carry a Content-Encoding pass through untouched.
+
+Compressed bodies are kept in a byte-bounded LRU keyed by the sha1 of the
+uncompressed body and the encoding, so a page served from the response
+cache is hashed, not recompressed, on every request.
+
+The ETag of a compressed response gets an ``-br``/``-gzip`` suffix (each
+encoding is a different representation). The suffix is stripped from
+If-None-Match before the request reaches Flask, so conditional views keep
+matching their own tags, and it is put back on the resulting 304.
+"""
+import gzip
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript', 'text/xml',
+    'application/json', 'application/javascript', 'application/x-ndjson',
+    'application/xml', 'image/svg+xml',
+}
+
+_ETAG_SUFFIX = re.compile(r'-(br|gzip)"')
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies bounded by their total size in bytes"""
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()  # (sha1, encoding) -> compressed body
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = body
+            self.bytes += len(body)
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+
+    def count(self, original, compressed):
+        with self._lock:
+            self.bytes_in += original
+            self.bytes_out += compressed
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'ratio': round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else 0.0,
+                'brotli': brotli is not None
+            }
+
+
+class CompressionMiddleware:
+    """Compress eligible responses of a WSGI app (install as app.wsgi_app)"""
+
+    def __init__(self, app, min_size=500, max_size=4 * 1024 * 1024, gzip_level=6,
+                 brotli_quality=5, cache_bytes=16 * 1024 * 1024):
+        self.app = app
+        self.min_size = min_size
+        self.max_size = max_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache = CompressedBodyCache(cache_bytes)
+
+    def __call__(self, environ, start_response):
+        # The client echoes the tag of the variant it holds; Flask only knows the base tag
+        client_suffix = None
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            match = _ETAG_SUFFIX.search(if_none_match)
+            if match:
+                client_suffix = match.group(1)
+                environ['HTTP_IF_NONE_MATCH'] = _ETAG_SUFFIX.sub('"', if_none_match)
+
+        encoding = None
+        if environ.get('REQUEST_METHOD') != 'HEAD':
+            encoding = self._negotiate(environ.get('HTTP_ACCEPT_ENCODING', ''))
+
+        captured = []
+
+        def capture(status, headers, exc_info=None):
+            captured[:] = [status, headers, exc_info]
+            return self._no_write
+
+        app_iter = self.app(environ, capture)
+        status, headers, exc_info = captured
+        headers = Headers(headers)
+
+        if status.startswith('304') and client_suffix:
+            self._suffix_etag(headers, client_suffix)
+        if not self._compressible(status, headers):
+            start_response(status, headers.to_wsgi_list(), exc_info)
+            return app_iter
+
+        self._add_vary(headers)
+        length = int(headers['Content-Length'])
+        if encoding is None or not self.min_size <= length <= self.max_size:
+            start_response(status, headers.to_wsgi_list(), exc_info)
+            return app_iter
+
+        try:
+            body = b''.join(app_iter)
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+        key = (hashlib.sha1(body).digest(), encoding)
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = self._compress(body, encoding)
+            self.cache.put(key, compressed)
+        self.cache.count(len(body), len(compressed))
+
+        headers['Content-Encoding'] = encoding
+        headers['Content-Length'] = str(len(compressed))
+        self._suffix_etag(headers, encoding)
+        start_response(status, headers.to_wsgi_list(), exc_info)
+        return [compressed]
+
+    @staticmethod
+    def _no_write(data):
+        raise RuntimeError('CompressionMiddleware does not support the WSGI write() callable')
+
+    def _negotiate(self, accept_encoding):
+        if not accept_encoding:
+            return None
+        accepted = parse_accept_header(accept_encoding)
+        br = accepted['br'] if brotli is not None else 0
+        # Highest q-value wins; brotli on a tie
+        if br and br >= accepted['gzip']:
+            return 'br'
+        if accepted['gzip']:
+            return 'gzip'
+        return None
+
+    @staticmethod
+    def _compressible(status, headers):
+        if not status.startswith('200') or 'Content-Encoding' in headers or 'Content-Length' not in headers:
+            return False
+        content_type = headers.get('Content-Type', '').split(';')[0].strip().lower()
+        return content_type in COMPRESSIBLE_TYPES
+
+    @staticmethod
+    def _add_vary(headers):
+        vary = headers.get('Vary')
+        if not vary:
+            headers['Vary'] = 'Accept-Encoding'
+        elif 'accept-encoding' not in vary.lower():
+            headers['Vary'] = f"{vary}, Accept-Encoding"
+
+    @staticmethod
+    def _suffix_etag(headers, encoding):
+        etag = headers.get('ETag')
+        if etag and etag.endswith('"'):
+            headers['ETag'] = f'{etag[:-1]}-{encoding}"'
+
+    def _compress(self, body, encoding):
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+
+def init_compression(app):
+    """Wrap app.wsgi_app when COMPRESSION_ENABLED is set"""
+    if not app.config.get('COMPRESSION_ENABLED', True):
+        return None
+    middleware = CompressionMiddleware(
+        app.wsgi_app,
+        min_size=app.config.get('COMPRESSION_MIN_SIZE', 500),
+        max_size=app.config.get('COMPRESSION_MAX_SIZE', 4 * 1024 * 1024),
+        gzip_level=app.config.get('COMPRESSION_GZIP_LEVEL', 6),
+        brotli_quality=app.config.get('COMPRESSION_BROTLI_QUALITY', 5),
+        cache_bytes=app.config.get('COMPRESSION_CACHE_BYTES', 16 * 1024 * 1024)
+    )
+    app.wsgi_app = middleware
+    app.extensions['compression'] = middleware.cache
+    return middleware
@@ -0,0 +1,39 @@
+"""Delta + zigzag varint encoding for compact integer time series.
+
+Each value is stored as the difference from the previous one, zigzag-mapped
+so small negative deltas stay small, then written as a LEB128 varint. View
+counts grow slowly between samples, so most deltas take one to three bytes.
+Appending to a series only needs the last value, not the decoded history.
+"""
+
+
+def encode_deltas(values, previous=0):
+    """Encode values as varint deltas starting from previous"""
+    out = bytearray()
+    for value in values:
+        delta = value - previous
+        previous = value
+        zigzag = (delta << 1) ^ (delta >> 63)
+        while zigzag > 0x7F:
+            out.append((zigzag & 0x7F) | 0x80)
+            zigzag >>= 7
+        out.append(zigzag)
+    return bytes(out)
+
+
+def decode_deltas(data, start=0):
+    """Decode a varint delta blob back into absolute values"""
+    values = []
+    current = start
+    shift = 0
+    zigzag = 0
+    for byte in data or b'':
+        zigzag |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        current += (zigzag >> 1) ^ -(zigzag & 1)
+        values.append(current)
+        shift = 0
+        zigzag = 0
+    return values
@@ -0,0 +1,92 @@
+"""Jinja fragment cache.
+
+Wrap a block in ``{% cache 'song-card', song.id, song.updated_at %}...{% endcache %}``
+and its rendered HTML is stored under that key in a bounded LRU attached
+to the Jinja environment, so every route that renders the same card
+reuses it. On a hit the block body is not evaluated at all, which also
+skips any lazy loads it would have triggered.
+
+Set ``fragment_cache.version`` to a callable to share invalidation between
+processes: the cache empties itself whenever the returned value changes.
+"""
+import threading
+from collections import OrderedDict
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+
+class FragmentCache:
+    """Thread-safe LRU of rendered template fragments"""
+
+    def __init__(self, size=2048):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.version = None
+        self._seen_version = None
+
+    def get(self, key):
+        version = self.version() if self.version else None
+        with self._lock:
+            if version != self._seen_version:
+                self._entries.clear()
+                self._seen_version = version
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class FragmentCacheExtension(Extension):
+    """Adds the ``{% cache key, ... %}`` tag and ``environment.fragment_cache``"""
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=FragmentCache())
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            key.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method('_render_cached', [nodes.Tuple(key, 'load')]), [], [], body
+        ).set_lineno(lineno)
+
+    def _render_cached(self, key, caller):
+        cache = self.environment.fragment_cache
+        value = cache.get(key)
+        if value is None:
+            value = caller()
+            cache.put(key, value)
+        return value
@@ -1,3 +1,5 @@
+import re
+import unicodedata
 from datetime import datetime
 
 def format_date(date_string):
@@ -16,4 +18,36 @@ def truncate_text(text, length=50):
     """Truncate text to specified length"""
     if len(text) <= length:
         return text
-    return text[:length] + '...'
\ No newline at end of file
+    return text[:length] + '...'
+
+def extract_youtube_id(url):
+    """Extract YouTube video ID from URL"""
+    patterns = [
+        r'(?:youtube\.com\/watch\?v=|youtu\.be\/)([^&]+)',
+        r'youtube\.com\/embed\/([^?]+)',
+        r'youtube\.com\/v\/([^?]+)'
+    ]
+    
+    for pattern in patterns:
+        match = re.search(pattern, url)
+        if match:
+            return match.group(1)
+    return None
+
+
+def fold_text(value):
+    """Lowercase and strip diacritics so 'Mũgĩthi' and 'mugithi' compare equal"""
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', value)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return stripped.casefold()
+
+def artist_name_key(name):
+    """Identity key for an artist name, ignoring case, accents, spaces and punctuation
+    
+    'Buruklyn Boyz', 'BURUKLYN BOYZ' and 'BuruklynBoyz' all map to 'buruklynboyz'.
+    Names with no letters or digits fall back to their folded text.
+    """
+    folded = fold_text(name)
+    return ''.join(ch for ch in folded if ch.isalnum()) or ' '.join(folded.split())
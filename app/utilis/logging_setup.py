@@ -0,0 +1,182 @@
+"""Structured, non-blocking logging for the app and its background threads.
+
+Records are put on an in-memory queue by a QueueHandler and written to
+stdout by a QueueListener thread, so a request or ingestion thread never
+waits on the log pipe. When the queue is full the record is dropped (and
+counted) instead of blocking. Each line is a JSON object (LOG_FORMAT=json)
+or a plain text line (LOG_FORMAT=text, for local development).
+
+LOG_LEVEL sets the level of the app's own modules (libraries log
+warnings and up, except werkzeug's access log of the development server
+at INFO), and LOG_LEVELS overrides it per logger, e.g.
+``app.services.youtube_service=DEBUG,apscheduler=INFO``. A message
+repeated more than LOG_RATE_LIMIT times within LOG_RATE_WINDOW seconds
+is suppressed; the next one let through carries the number suppressed.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else was passed with extra={...}
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, msg, extra fields and exc"""
+
+    def format(self, record):
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'pid': record.process,
+            'thread': record.threadName,
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRS and not name.startswith('_'):
+                payload[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exc'] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """Let at most `limit` records per call site and level through per `window` seconds"""
+
+    MAX_KEYS = 10000
+
+    def __init__(self, limit=20, window=60.0):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._lock = threading.Lock()
+        self._counts = {}  # (logger, level, template) -> [window start, passed, suppressed]
+
+    def filter(self, record):
+        if not self.limit:
+            return True
+        key = (record.name, record.levelno, record.msg if isinstance(record.msg, str) else repr(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._counts.get(key)
+            if entry is None or now - entry[0] >= self.window:
+                if len(self._counts) >= self.MAX_KEYS:
+                    self._counts.clear()
+                suppressed = entry[2] if entry else 0
+                self._counts[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if entry[1] < self.limit:
+                entry[1] += 1
+                return True
+            entry[2] += 1
+            return False
+
+
+class AsyncHandler(QueueHandler):
+    """QueueHandler that never blocks and runs its own listener thread per process.
+
+    A forked gunicorn worker inherits the handler but not the listener
+    thread, so the first record logged in a new process starts a fresh
+    queue and listener there.
+    """
+
+    def __init__(self, target, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.target = target
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._listener is not None and self._pid is not None:
+                # Inherited from the parent: its thread does not exist here
+                self.queue = queue.Queue(self.maxsize)
+            self._listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def prepare(self, record):
+        # Format the message now (args may change after the call) but leave the
+        # JSON work to the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        if self.dropped:
+            record.dropped, self.dropped = self.dropped, 0
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self):
+        """Write out what is queued and stop the listener (in this process only)"""
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._listener = None
+            self._pid = None
+
+
+def _parse_levels(spec):
+    """'a.b=DEBUG,c=WARNING' -> {'a.b': 'DEBUG', 'c': 'WARNING'}"""
+    levels = {}
+    for item in (spec or '').split(','):
+        name, _, level = item.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(app):
+    """Route all logging through one non-blocking JSON handler on the root logger"""
+    config = app.config
+    root = logging.getLogger()
+    handler = next((h for h in root.handlers if isinstance(h, AsyncHandler)), None)
+
+    if handler is None:
+        target = logging.StreamHandler(sys.stdout)
+        handler = AsyncHandler(target, maxsize=config.get('LOG_QUEUE_SIZE', 10000))
+        handler.addFilter(RateLimitFilter(config.get('LOG_RATE_LIMIT', 20),
+                                          config.get('LOG_RATE_WINDOW', 60)))
+        root.addHandler(handler)
+        atexit.register(handler.stop)
+
+    if config.get('LOG_FORMAT', 'json') == 'text':
+        handler.target.setFormatter(logging.Formatter(TEXT_FORMAT))
+    else:
+        handler.target.setFormatter(JsonFormatter())
+
+    # Libraries (apscheduler, urllib3, ...) stay at WARNING unless listed in LOG_LEVELS;
+    # werkzeug logs the dev server's requests and address at INFO
+    root.setLevel(logging.WARNING)
+    logging.getLogger('werkzeug').setLevel(logging.INFO)
+    logging.getLogger('app').setLevel(config.get('LOG_LEVEL', 'INFO').upper())
+    for name, module_level in _parse_levels(config.get('LOG_LEVELS')).items():
+        logging.getLogger(name).setLevel(module_level)
+    return handler
@@ -0,0 +1,373 @@
+"""Per-request performance metrics, exported at /metrics in Prometheus text format.
+
+Every request records its latency (a histogram per endpoint), the number
+and total time of its SQL statements (SQLAlchemy cursor events), its
+template render time (Flask's template signals) and its response size.
+The same numbers are sent back in a ``Server-Timing`` header. Latency is
+measured up to the end of the view and after_request handlers. Response
+streaming and compression happen later and are not included.
+
+Each process counts in memory, and a background thread writes its totals
+to ``metrics-<pid>.json`` in METRICS_DIR every METRICS_FLUSH_SECONDS when
+they changed. /metrics adds up the files of every live process, so
+whichever gunicorn worker answers a scrape reports the totals of all of
+them. When a file's process has exited (a restarted worker, an earlier
+``python run.py``), the next scrape adds its totals to ``metrics-dead.json``
+and deletes it, under a lock file, so the counters never go down (which
+Prometheus would read as a reset). The directory is cleared when gunicorn
+starts.
+"""
+import atexit
+import contextlib
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, abort, g, has_request_context, request
+from flask.signals import before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the single-process dev server runs there
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PREFIX = 'goodmusic'
+
+# Requests for unknown URLs share one label so 404 scans cannot add series
+UNMATCHED = '<unmatched>'
+
+# Accumulated totals of exited processes, and the lock guarding it
+DEAD_FILE = 'metrics-dead.json'
+LOCK_FILE = 'metrics.lock'
+
+
+class EndpointStats:
+    """Latency histogram and SQL/template/size totals for one endpoint"""
+
+    __slots__ = ('buckets', 'count', 'seconds', 'queries', 'query_seconds',
+                 'template_seconds', 'response_bytes')
+
+    def __init__(self, bucket_count):
+        self.buckets = [0] * bucket_count  # per bucket, not cumulative
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.template_seconds = 0.0
+        self.response_bytes = 0
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class MetricsRegistry:
+    """Request metrics of this process, flushed to a per-pid file for /metrics"""
+
+    def __init__(self, directory, flush_seconds=5, buckets=LATENCY_BUCKETS):
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self.buckets = buckets
+        self.requests = {}   # (endpoint, method, status) -> count
+        self.endpoints = {}  # endpoint -> EndpointStats
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._flusher_pid = None
+
+    def observe(self, endpoint, method, status, seconds, queries=0, query_seconds=0.0,
+                template_seconds=0.0, response_bytes=0):
+        bucket = bisect_left(self.buckets, seconds)  # first bound >= seconds, or the +Inf slot
+        with self._lock:
+            key = (endpoint, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = EndpointStats(len(self.buckets) + 1)
+            stats.buckets[bucket] += 1
+            stats.count += 1
+            stats.seconds += seconds
+            stats.queries += queries
+            stats.query_seconds += query_seconds
+            stats.template_seconds += template_seconds
+            stats.response_bytes += response_bytes
+            self._dirty = True
+            if self._flusher_pid != os.getpid():
+                # First request in this process (a preloaded master forks without threads)
+                self._flusher_pid = os.getpid()
+                threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            if self._dirty:
+                self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'requests': [[*key, count] for key, count in self.requests.items()],
+                'endpoints': {name: stats.to_dict() for name, stats in self.endpoints.items()},
+            }
+
+    def _path(self, pid=None):
+        return os.path.join(self.directory, f"metrics-{pid or os.getpid()}.json")
+
+    def flush(self):
+        """Write this process's totals to its file (atomically, via a rename)"""
+        self._dirty = False
+        if not self.requests:
+            return
+        path = self._path()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(f"{path}.tmp", 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            logger.warning("Could not write metrics file: %s", e)
+
+    def collect(self):
+        """Totals across every process: the files of the others plus our live counts"""
+        own = self._path()
+        dead = os.path.join(self.directory, DEAD_FILE)
+        snapshots = [self.snapshot()]
+        with _locked(self.directory):
+            for path in glob.glob(os.path.join(self.directory, 'metrics-*.json')):
+                if path in (own, dead):
+                    continue
+                if not _pid_alive(_file_pid(path)):
+                    _absorb(path, dead)
+                    continue
+                snapshot = _load(path)
+                if snapshot is not None:
+                    snapshots.append(snapshot)
+            snapshot = _load(dead)
+            if snapshot is not None:
+                snapshots.append(snapshot)
+
+        merged = _merge(snapshots)
+        requests = {(endpoint, method, status): count
+                    for endpoint, method, status, count in merged['requests']}
+        return requests, merged['endpoints']
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        requests, endpoints = self.collect()
+        lines = [
+            f"# HELP {PREFIX}_http_requests_total Requests by endpoint, method and status.",
+            f"# TYPE {PREFIX}_http_requests_total counter",
+        ]
+        for (endpoint, method, status), count in sorted(requests.items()):
+            lines.append(f'{PREFIX}_http_requests_total{{endpoint="{_escape(endpoint)}",'
+                         f'method="{method}",status="{status}"}} {count}')
+
+        name = f"{PREFIX}_http_request_duration_seconds"
+        lines += [f"# HELP {name} Time to build the response.", f"# TYPE {name} histogram"]
+        for endpoint, stats in sorted(endpoints.items()):
+            label = f'endpoint="{_escape(endpoint)}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, stats['buckets']):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{label},le="+Inf"}} {stats["count"]}')
+            lines.append(f'{name}_sum{{{label}}} {stats["seconds"]:.6f}')
+            lines.append(f'{name}_count{{{label}}} {stats["count"]}')
+
+        counters = [
+            ('db_queries_total', 'queries', 'SQL statements executed while handling requests.', '{}'),
+            ('db_query_seconds_total', 'query_seconds', 'Time spent executing SQL statements.', '{:.6f}'),
+            ('template_render_seconds_total', 'template_seconds', 'Time spent rendering templates.', '{:.6f}'),
+            ('http_response_bytes_total', 'response_bytes', 'Uncompressed response body bytes.', '{}'),
+        ]
+        for metric, field, help_text, number in counters:
+            lines += [f"# HELP {PREFIX}_{metric} {help_text}", f"# TYPE {PREFIX}_{metric} counter"]
+            for endpoint, stats in sorted(endpoints.items()):
+                lines.append(f'{PREFIX}_{metric}{{endpoint="{_escape(endpoint)}"}} '
+                             + number.format(stats[field]))
+        return '\n'.join(lines) + '\n'
+
+
+def clear_metrics_dir(directory):
+    """Delete every process's metrics file (done once when the server starts)"""
+    for path in glob.glob(os.path.join(directory, 'metrics-*.json*')):
+        _remove(path)
+
+
+@contextlib.contextmanager
+def _locked(directory):
+    """Hold the metrics directory's lock file (no-op where flock is missing)"""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_FILE), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _load(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None  # gone, or being replaced; counted on the next scrape
+
+
+def _merge(snapshots):
+    """Add snapshots up into one (same shape as MetricsRegistry.snapshot)"""
+    requests = {}
+    endpoints = {}
+    for snapshot in snapshots:
+        for endpoint, method, status, count in snapshot['requests']:
+            key = (endpoint, method, status)
+            requests[key] = requests.get(key, 0) + count
+        for endpoint, stats in snapshot['endpoints'].items():
+            total = endpoints.get(endpoint)
+            if total is None:
+                endpoints[endpoint] = dict(stats, buckets=list(stats['buckets']))
+                continue
+            total['buckets'] = [a + b for a, b in zip(total['buckets'], stats['buckets'])]
+            for name, value in stats.items():
+                if name != 'buckets':
+                    total[name] += value
+    return {'requests': [[*key, count] for key, count in requests.items()], 'endpoints': endpoints}
+
+
+def _absorb(path, dead):
+    """Add an exited process's file to the dead totals and delete it (hold the lock)"""
+    snapshot = _load(path)
+    if snapshot is None:
+        if os.path.exists(path):
+            logger.warning("Dropping unreadable metrics file %s", path)
+            _remove(path)
+        return
+    totals = _load(dead)
+    try:
+        with open(f"{dead}.tmp", 'w') as f:
+            json.dump(_merge([totals, snapshot] if totals else [snapshot]), f)
+        os.replace(f"{dead}.tmp", dead)
+    except OSError as e:
+        logger.warning("Could not write metrics file: %s", e)
+        return
+    _remove(path)
+
+
+def _file_pid(path):
+    """metrics-1234.json -> 1234 (None if the name has no pid)"""
+    pid = os.path.basename(path)[len('metrics-'):-len('.json')]
+    return int(pid) if pid.isdigit() else None
+
+
+def _pid_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # exists, owned by another user
+    return True
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('metrics_query_start')
+    if starts and has_request_context():
+        timings = g.get('_metrics')
+        elapsed = time.perf_counter() - starts.pop()
+        if timings is not None:
+            timings['queries'] += 1
+            timings['query_seconds'] += elapsed
+
+
+def _before_render(app, template, context, **extra):
+    timings = g.get('_metrics')
+    if timings is not None:
+        timings['render_starts'].append(time.perf_counter())
+
+
+def _after_render(app, template, context, **extra):
+    timings = g.get('_metrics')
+    if timings is not None and timings['render_starts']:
+        timings['template_seconds'] += time.perf_counter() - timings['render_starts'].pop()
+
+
+def init_metrics(app):
+    """Record request metrics, add Server-Timing and serve /metrics when METRICS_ENABLED is set"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return None
+
+    registry = MetricsRegistry(
+        app.config['METRICS_DIR'],
+        flush_seconds=app.config.get('METRICS_FLUSH_SECONDS', 5)
+    )
+    app.extensions['metrics'] = registry
+    server_timing = app.config.get('METRICS_SERVER_TIMING', True)
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    @app.before_request
+    def start_timer():
+        g._metrics = {'start': time.perf_counter(), 'queries': 0, 'query_seconds': 0.0,
+                      'template_seconds': 0.0, 'render_starts': []}
+
+    @app.after_request
+    def record_request(response):
+        timings = g.pop('_metrics', None)
+        if timings is None:
+            return response
+        elapsed = time.perf_counter() - timings['start']
+        registry.observe(
+            request.endpoint or UNMATCHED, request.method, response.status_code, elapsed,
+            queries=timings['queries'], query_seconds=timings['query_seconds'],
+            template_seconds=timings['template_seconds'],
+            response_bytes=response.content_length or 0
+        )
+        if server_timing:
+            response.headers.add('Server-Timing', ', '.join([
+                f"app;dur={elapsed * 1000:.2f}",
+                f'db;desc="{timings["queries"]} queries";dur={timings["query_seconds"] * 1000:.2f}',
+                f"tpl;dur={timings['template_seconds'] * 1000:.2f}",
+            ]))
+        return response
+
+    def metrics_view():
+        token = app.config.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') != f"Bearer {token}":
+            abort(401)
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+    atexit.register(registry.flush)
+    return registry
@@ -0,0 +1,243 @@
+"""Opt-in profiling of single requests, saved for download from /admin/profiles.
+
+Nothing is registered unless PROFILER_ENABLED is set, so a disabled
+profiler costs nothing. When enabled, a request is profiled only if it asks
+for it and is authorized:
+
+* ``X-Profile: <token>`` header, where the token comes from
+  ``flask profiler token`` (signed with PROFILER_SECRET, expires after
+  PROFILER_TOKEN_MAX_AGE seconds), or
+* ``X-Profile: 1`` or ``?_profile=1`` from a browser session that opened
+  ``/admin/profiles?token=<token>`` once (only with a non-default
+  SECRET_KEY, since session cookies are signed with it).
+
+The request runs under pyinstrument (sampling, saved as .html) when it is
+installed, otherwise under cProfile (saved as .prof for snakeviz or
+pstats). One request per process is profiled at a time. PROFILER_DIR keeps
+the newest PROFILER_MAX_FILES profiles. The profiler stays off unless
+PROFILER_SECRET or SECRET_KEY is set to something other than the built-in
+development key, which anyone could use to sign tokens.
+"""
+import cProfile
+import glob
+import importlib.util
+import io
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+from datetime import datetime
+from flask import Response, abort, g, jsonify, request, send_from_directory, session
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+logger = logging.getLogger(__name__)
+
+SALT = 'request-profiler'
+SESSION_KEY = 'profiler_admin'
+
+# 20261019T064405123456_main.index_GET_81ms.prof
+FILENAME_RE = re.compile(r'^(\d{8}T\d{12})_([\w.-]+)_([A-Z]+)_(\d+)ms\.(prof|html)$')
+
+
+def profiler_secret(app):
+    """PROFILER_SECRET, else SECRET_KEY; None while only the default key is set"""
+    from app import DEFAULT_SECRET_KEY
+
+    secret = app.config.get('PROFILER_SECRET') or app.config.get('SECRET_KEY')
+    return secret if secret and secret != DEFAULT_SECRET_KEY else None
+
+
+def sessions_trusted(app):
+    """False while SECRET_KEY is the default, with which anyone can forge a session cookie"""
+    from app import DEFAULT_SECRET_KEY
+
+    return app.config.get('SECRET_KEY') not in (None, '', DEFAULT_SECRET_KEY)
+
+
+def _serializer(app):
+    secret = profiler_secret(app)
+    if secret is None:
+        raise RuntimeError('Set PROFILER_SECRET or SECRET_KEY to sign profiler tokens')
+    return URLSafeTimedSerializer(secret, salt=SALT)
+
+
+def make_token(app):
+    """A signed token that authorizes profiling until it expires"""
+    return _serializer(app).dumps('profile')
+
+
+def _valid_token(app, token):
+    try:
+        _serializer(app).loads(token, max_age=app.config.get('PROFILER_TOKEN_MAX_AGE', 3600))
+        return True
+    except BadSignature:
+        return False
+
+
+class RequestProfiler:
+    """Starts and stops the profiler around one request and saves the result"""
+
+    def __init__(self, directory, max_files=50, engine='auto'):
+        self.directory = directory
+        self.max_files = max_files
+        if engine == 'auto':
+            engine = 'pyinstrument' if importlib.util.find_spec('pyinstrument') else 'cprofile'
+        self.engine = engine
+        self._busy = threading.Lock()
+
+    def start(self):
+        """A running profiler, or None if another request is being profiled"""
+        if not self._busy.acquire(blocking=False):
+            return None
+        try:
+            if self.engine == 'pyinstrument':
+                from pyinstrument import Profiler
+
+                profiler = Profiler(interval=0.001, async_mode='disabled')
+                profiler.start()
+            else:
+                profiler = cProfile.Profile()
+                profiler.enable()
+        except Exception:
+            self._busy.release()
+            raise
+        return profiler
+
+    def stop(self, profiler):
+        try:
+            if self.engine == 'pyinstrument':
+                profiler.stop()
+            else:
+                profiler.disable()
+        finally:
+            self._busy.release()
+
+    def save(self, profiler, endpoint, method, seconds):
+        """Write the profile to PROFILER_DIR and drop the oldest beyond max_files"""
+        os.makedirs(self.directory, exist_ok=True)
+        endpoint = re.sub(r'[^\w.-]', '-', endpoint)
+        extension = 'html' if self.engine == 'pyinstrument' else 'prof'
+        name = (f"{datetime.utcnow():%Y%m%dT%H%M%S%f}_{endpoint}_{method}_"
+                f"{round(seconds * 1000)}ms.{extension}")
+        path = os.path.join(self.directory, name)
+        if self.engine == 'pyinstrument':
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+        else:
+            profiler.dump_stats(path)
+        self.prune()
+        return name
+
+    def prune(self):
+        names = sorted(name for name in os.listdir(self.directory) if FILENAME_RE.match(name))
+        for name in names[:max(len(names) - self.max_files, 0)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def saved(self):
+        """Saved profiles, newest first"""
+        profiles = []
+        for path in glob.glob(os.path.join(self.directory, '*')):
+            name = os.path.basename(path)
+            match = FILENAME_RE.match(name)
+            if not match:
+                continue
+            stamp, endpoint, method, ms, extension = match.groups()
+            profiles.append({
+                'name': name,
+                'endpoint': endpoint,
+                'method': method,
+                'duration_ms': int(ms),
+                'created_at': datetime.strptime(stamp, '%Y%m%dT%H%M%S%f').isoformat(),
+                'format': 'pyinstrument' if extension == 'html' else 'cprofile',
+                'bytes': os.path.getsize(path),
+            })
+        return sorted(profiles, key=lambda profile: profile['name'], reverse=True)
+
+
+def _stats_text(path, limit=60):
+    """Top functions of a cProfile file by cumulative time, as plain text"""
+    stream = io.StringIO()
+    stats = pstats.Stats(path, stream=stream)
+    stats.strip_dirs().sort_stats('cumulative').print_stats(limit)
+    return stream.getvalue()
+
+
+def init_profiler(app):
+    """Register the profiling hooks and /admin/profiles when PROFILER_ENABLED is set"""
+    if not app.config.get('PROFILER_ENABLED', False):
+        return None
+    if profiler_secret(app) is None:
+        logger.error("Profiler not enabled: PROFILER_SECRET or SECRET_KEY must be set to a "
+                     "non-default value, or anyone could sign profiler tokens")
+        return None
+
+    profiler = RequestProfiler(
+        app.config['PROFILER_DIR'],
+        max_files=app.config.get('PROFILER_MAX_FILES', 50),
+        engine=app.config.get('PROFILER_ENGINE', 'auto')
+    )
+    app.extensions['profiler'] = profiler
+
+    def authorized():
+        token = request.headers.get('X-Profile')
+        if token and token != '1' and _valid_token(app, token):
+            return True
+        return sessions_trusted(app) and bool(session.get(SESSION_KEY))
+
+    def requested():
+        return bool(request.headers.get('X-Profile')) or request.args.get('_profile') == '1'
+
+    @app.before_request
+    def start_profile():
+        if requested() and authorized():
+            running = profiler.start()
+            if running is not None:
+                g._profile = (running, time.perf_counter())
+
+    @app.after_request
+    def save_profile(response):
+        started = g.pop('_profile', None)
+        if started is None:
+            return response
+        running, start = started
+        seconds = time.perf_counter() - start
+        profiler.stop(running)
+        name = profiler.save(running, request.endpoint or 'unmatched', request.method, seconds)
+        response.headers['X-Profile-Id'] = name
+        return response
+
+    @app.teardown_request
+    def stop_profile(exc):
+        # The view raised before after_request could stop the profiler
+        started = g.pop('_profile', None)
+        if started is not None:
+            profiler.stop(started[0])
+
+    def profiles_view():
+        token = request.args.get('token')
+        if token:
+            if not _valid_token(app, token):
+                abort(403)
+            if sessions_trusted(app):
+                session[SESSION_KEY] = True
+        elif not authorized():
+            abort(403)
+        return jsonify({'engine': profiler.engine, 'profiles': profiler.saved()})
+
+    def profile_download(name):
+        if not authorized():
+            abort(403)
+        if not FILENAME_RE.match(name) or not os.path.exists(os.path.join(profiler.directory, name)):
+            abort(404)
+        if name.endswith('.prof') and request.args.get('format') == 'text':
+            return Response(_stats_text(os.path.join(profiler.directory, name)), mimetype='text/plain')
+        return send_from_directory(profiler.directory, name, as_attachment=name.endswith('.prof'))
+
+    app.add_url_rule('/admin/profiles', 'profiles', profiles_view)
+    app.add_url_rule('/admin/profiles/<name>', 'profile_download', profile_download)
+    return profiler
@@ -0,0 +1,219 @@
+"""Per-client rate limits and concurrency caps for the expensive endpoints.
+
+Each endpoint in RATE_LIMITS gets a token bucket per client IP: it holds up
+to N tokens, refills at N per period, and every request takes one. A
+request finding the bucket empty gets ``429`` with ``Retry-After`` (seconds
+until a token is back). Buckets live in process memory by default. With
+RATE_LIMIT_STORAGE=sqlite they live in a small SQLite file of their own, so
+all gunicorn workers share them without touching the catalog database.
+
+On top of that, at most RATE_LIMIT_CONCURRENCY requests to each of these
+endpoints run at once per process, whoever sends them (fewer for those in
+RATE_LIMIT_CONCURRENCY_OVERRIDES); the next one gets ``429`` straight away
+instead of occupying another worker, and a slow import does not lock out
+artist cards. Other endpoints skip all of this after one dict lookup.
+
+A bucket left alone for the longest limit's period is full again, so it is
+forgotten: MemoryBuckets drops such buckets when it needs room and
+SqliteBuckets deletes their rows every PRUNE_INTERVAL seconds.
+"""
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from flask import g, jsonify, request
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+def parse_limit(spec):
+    """'10/minute' -> (capacity 10, refill rate in tokens per second)"""
+    count, _, period = spec.partition('/')
+    capacity = int(count)
+    if capacity < 1 or period not in PERIODS:
+        raise ValueError(f"Invalid rate limit {spec!r} (expected e.g. '10/minute')")
+    return capacity, capacity / PERIODS[period]
+
+
+class MemoryBuckets:
+    """Token buckets in this process (each gunicorn worker counts separately)"""
+
+    def __init__(self, max_keys=10000, idle_after=3600):
+        self.max_keys = max_keys
+        self.idle_after = idle_after
+        self._buckets = {}  # key -> [tokens, updated_at]
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate, now=None):
+        """Take a token; returns 0 if allowed, else seconds until one is available"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._evict_full(now)
+                bucket = self._buckets[key] = [float(capacity), now]
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return 0
+            bucket[0] = tokens
+            return (1 - tokens) / rate
+
+    def _evict_full(self, now):
+        # Drop buckets idle long enough to have refilled; if that frees
+        # nothing, forget everything rather than grow without bound
+        idle = [key for key, (_, updated) in self._buckets.items() if now - updated > self.idle_after]
+        for key in idle:
+            del self._buckets[key]
+        if len(self._buckets) >= self.max_keys:
+            self._buckets.clear()
+
+
+class SqliteBuckets:
+    """Token buckets in a SQLite file shared by every process on the machine.
+
+    Each take is one UPSERT, so concurrent workers never lose an update.
+    Rows idle for `idle_after` seconds (full buckets) are deleted every
+    PRUNE_INTERVAL seconds by whichever process takes a token then.
+    """
+
+    PRUNE_INTERVAL = 600
+
+    SCHEMA = ("CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+              "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)")
+    TAKE = """
+        INSERT INTO rate_limit_buckets (key, tokens, updated_at) VALUES (:key, :capacity - 1, :now)
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = min(:capacity, tokens + (:now - updated_at) * :rate) - 1,
+            updated_at = :now
+        WHERE min(:capacity, tokens + (:now - updated_at) * :rate) >= 1
+        RETURNING tokens
+    """
+
+    def __init__(self, path, timeout=1.0, idle_after=3600):
+        self.path = path
+        self.timeout = timeout
+        self.idle_after = idle_after
+        self._next_prune = 0.0
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(self.SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+
+    def _conn(self):
+        # One connection per thread and process (never reuse one across fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._local.conn = self._connect()
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, key, capacity, rate, now=None):
+        now = time.time() if now is None else now
+        conn = self._conn()
+        if now >= self._next_prune:
+            self._next_prune = now + self.PRUNE_INTERVAL
+            self.prune(now)
+        params = {'key': key, 'capacity': capacity, 'rate': rate, 'now': now}
+        if conn.execute(self.TAKE, params).fetchone() is not None:
+            return 0
+        tokens, updated_at = conn.execute(
+            'SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?', (key,)
+        ).fetchone()
+        tokens = min(capacity, tokens + (now - updated_at) * rate)
+        return max((1 - tokens) / rate, 0.001)
+
+    def prune(self, now=None):
+        """Delete buckets that have been idle long enough to be full; returns how many"""
+        now = time.time() if now is None else now
+        return self._conn().execute('DELETE FROM rate_limit_buckets WHERE updated_at < ?',
+                                    (now - self.idle_after,)).rowcount
+
+
+def client_address(proxy_count=0):
+    """The client IP, read from X-Forwarded-For behind `proxy_count` trusted proxies"""
+    if proxy_count:
+        # Each proxy appends the address it saw; entries before the trusted ones can be forged
+        forwarded = [part.strip() for part in request.headers.get('X-Forwarded-For', '').split(',') if part.strip()]
+        if forwarded:
+            return forwarded[max(len(forwarded) - proxy_count, 0)]
+    return request.remote_addr or 'unknown'
+
+
+def _too_many(retry_after, message):
+    seconds = max(math.ceil(retry_after), 1)
+    response = jsonify({'success': False, 'error': message, 'retry_after': seconds})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(seconds)
+    return response
+
+
+def init_rate_limits(app):
+    """Limit the endpoints in RATE_LIMITS per client and cap how many of each run at once"""
+    if not app.config.get('RATE_LIMIT_ENABLED', True):
+        return None
+
+    limits = {endpoint: parse_limit(spec) for endpoint, spec in app.config.get('RATE_LIMITS', {}).items()}
+    if not limits:
+        return None
+    # A bucket idle for its whole period has refilled, whatever it held
+    idle_after = max(capacity / rate for capacity, rate in limits.values())
+    if app.config.get('RATE_LIMIT_STORAGE', 'memory') == 'sqlite':
+        buckets = SqliteBuckets(app.config['RATE_LIMIT_SQLITE_PATH'], idle_after=idle_after)
+    else:
+        buckets = MemoryBuckets(idle_after=idle_after)
+    app.extensions['rate_limits'] = buckets
+
+    # One semaphore per endpoint, so one busy endpoint cannot starve the others
+    default_concurrency = app.config.get('RATE_LIMIT_CONCURRENCY', 2)
+    overrides = app.config.get('RATE_LIMIT_CONCURRENCY_OVERRIDES', {})
+    in_flight = {}
+    for endpoint in limits:
+        concurrency = overrides.get(endpoint, default_concurrency)
+        if concurrency:
+            in_flight[endpoint] = threading.BoundedSemaphore(concurrency)
+    proxy_count = app.config.get('RATE_LIMIT_PROXY_COUNT', 0)
+
+    @app.before_request
+    def check_rate_limit():
+        limit = limits.get(request.endpoint)
+        if limit is None:
+            return None
+
+        capacity, rate = limit
+        key = f"{request.endpoint}:{client_address(proxy_count)}"
+        try:
+            retry_after = buckets.take(key, capacity, rate)
+        except sqlite3.Error as e:
+            # Fail open: a broken limiter must not take the endpoint down
+            logger.warning("Rate limit check failed: %s", e)
+            retry_after = 0
+        if retry_after:
+            logger.info("Rate limited %s", key)
+            return _too_many(retry_after, 'Too many requests, please slow down')
+
+        slots = in_flight.get(request.endpoint)
+        if slots is not None:
+            if not slots.acquire(blocking=False):
+                return _too_many(1, 'Server busy with other requests like this one, try again shortly')
+            g._rate_limit_slot = slots
+        return None
+
+    @app.teardown_request
+    def release_slot(exc):
+        slots = g.pop('_rate_limit_slot', None)
+        if slots is not None:
+            slots.release()
+
+    return buckets
@@ -0,0 +1,307 @@
+"""HTTP load benchmark for the public routes, with regression budgets.
+
+Drives every route either in-process through the WSGI test client
+(--mode client, one request at a time) or over HTTP against a local
+gunicorn started from gunicorn.conf.py (--mode gunicorn, --concurrency
+parallel clients). Per route it reports p50/p95/p99 latency, the median
+number of SQL queries per request (from the Server-Timing header; the
+median ignores per-process cache warm-up) and throughput.
+
+    python benchmarks/generate_catalog.py --out /tmp/catalog.db
+    python benchmarks/bench_routes.py --db /tmp/catalog.db
+    python benchmarks/bench_routes.py --db /tmp/catalog.db --mode gunicorn --workers 2 --concurrency 8
+
+Budgets (benchmarks/budgets.json by default) set a p95 latency and a query
+count per route; the run exits with status 1 if any route goes over its
+budget or answers with an error. The shipped budgets were measured in
+client mode on the default generate_catalog.py catalog (the "catalog"
+entry of the budget file). Latency budgets are only checked in that mode
+and when --db has that many songs and artists; otherwise only the query
+counts are. Page and response caches are disabled
+unless --cache is given, so the numbers measure the route itself.
+"""
+import argparse
+import http.client
+import json
+import os
+import re
+import shutil
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BUDGETS = os.path.join(ROOT, 'benchmarks', 'budgets.json')
+
+# name -> path; {artist}, {term} and {prefix} are filled in from the database
+ROUTES = {
+    'home': '/',
+    'latest': '/latest',
+    'trending': '/trending',
+    'search': '/search?q={term}',
+    'artists': '/artists',
+    'artist': '/artist/{artist}',
+    'stats': '/stats',
+    'api_songs': '/api/songs',
+    'api_artists': '/api/artists',
+    'api_suggest': '/api/suggest?q={prefix}',
+    'api_artist_analytics': '/api/artist/{artist}/analytics',
+    'api_stats': '/api/stats',
+    'api_v2_songs': '/api/v2/songs?limit=50',
+    'api_v2_artists': '/api/v2/artists?limit=50',
+}
+
+QUERIES_RE = re.compile(r'db;desc="(\d+) queries"')
+
+
+def route_params(database):
+    """The busiest artist and the most common title word, so routes return real data"""
+    conn = sqlite3.connect(database)
+    try:
+        artist = conn.execute(
+            "SELECT a.name FROM artists a JOIN songs s ON s.artist_id = a.id "
+            "GROUP BY a.id ORDER BY COUNT(*) DESC, a.id LIMIT 1"
+        ).fetchone()
+        words = {}
+        for (title,) in conn.execute("SELECT title FROM songs LIMIT 5000"):
+            for word in re.findall(r'[A-Za-z]{4,}', title):
+                words[word] = words.get(word, 0) + 1
+    finally:
+        conn.close()
+    term = max(sorted(words), key=words.get) if words else 'music'
+    name = artist[0] if artist else 'unknown'
+    return {'artist': quote(name, safe=''), 'term': quote(term), 'prefix': quote(name[:3])}
+
+
+def catalog_size(database):
+    """Song and artist counts of a database, to compare with the budgets' catalog"""
+    conn = sqlite3.connect(database)
+    try:
+        return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('songs', 'artists')}
+    finally:
+        conn.close()
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(samples, wall_seconds):
+    """samples: [(milliseconds, queries, status)] -> route summary"""
+    latencies = sorted(ms for ms, _, _ in samples)
+    queries = [count for _, count, _ in samples if count is not None]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, _, status in samples if status >= 400),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'queries': statistics.median(queries) if queries else None,
+        'rps': round(len(samples) / wall_seconds, 1) if wall_seconds else 0.0,
+    }
+
+
+def _queries(server_timing):
+    match = QUERIES_RE.search(server_timing or '')
+    return int(match.group(1)) if match else None
+
+
+class ClientTarget:
+    """Requests through the app's WSGI test client in this process"""
+
+    concurrency = 1
+
+    def __init__(self, env):
+        os.environ.update(env)
+        sys.path.insert(0, ROOT)
+        from app import create_app
+
+        self.client = create_app(with_scheduler=False).test_client()
+
+    def get(self, path):
+        start = time.perf_counter()
+        response = self.client.get(path)
+        response.get_data()
+        elapsed = (time.perf_counter() - start) * 1000
+        return elapsed, _queries(response.headers.get('Server-Timing')), response.status_code
+
+    def close(self):
+        pass
+
+
+class GunicornTarget:
+    """Requests over HTTP to a gunicorn started for the run"""
+
+    def __init__(self, env, workers, concurrency, port):
+        self.port = port
+        self.concurrency = concurrency
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--workers', str(workers),
+             '--bind', f"127.0.0.1:{port}", 'run:app'],
+            cwd=ROOT, env=dict(os.environ, **env),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError('gunicorn exited during startup')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        self.close()
+        raise RuntimeError(f"gunicorn did not listen on port {port} within 60s")
+
+    def get(self, path):
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+        try:
+            start = time.perf_counter()
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            elapsed = (time.perf_counter() - start) * 1000
+            return elapsed, _queries(response.getheader('Server-Timing')), response.status
+        finally:
+            conn.close()
+
+    def close(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def run_route(target, path, requests, warmup):
+    for _ in range(warmup):
+        target.get(path)
+    start = time.perf_counter()
+    if target.concurrency > 1:
+        with ThreadPoolExecutor(max_workers=target.concurrency) as pool:
+            samples = list(pool.map(lambda _: target.get(path), range(requests)))
+    else:
+        samples = [target.get(path) for _ in range(requests)]
+    return summarize(samples, time.perf_counter() - start)
+
+
+def check_budgets(results, budgets, scale, latency=True):
+    """Messages for every route over its budget (or answering with errors)"""
+    failures = []
+    for name, result in results.items():
+        if result['errors']:
+            failures.append(f"{name}: {result['errors']} error responses")
+        budget = budgets.get(name)
+        if not budget:
+            continue
+        if latency and 'p95_ms' in budget and result['p95_ms'] > budget['p95_ms'] * scale:
+            failures.append(f"{name}: p95 {result['p95_ms']} ms > budget {budget['p95_ms'] * scale:g} ms")
+        if 'queries' in budget and result['queries'] is not None and result['queries'] > budget['queries']:
+            failures.append(f"{name}: {result['queries']} queries/request > budget {budget['queries']}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', required=True,
+                        help='SQLite database to copy for the run (see generate_catalog.py)')
+    parser.add_argument('--mode', choices=['client', 'gunicorn'], default='client')
+    parser.add_argument('--route', dest='routes', action='append', choices=sorted(ROUTES),
+                        help='Route to run (repeatable; default all)')
+    parser.add_argument('--requests', type=int, default=50, help='Measured requests per route')
+    parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per route first')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers (--mode gunicorn)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Parallel clients (--mode gunicorn)')
+    parser.add_argument('--port', type=int, default=8599)
+    parser.add_argument('--cache', action='store_true', help='Keep the response cache enabled')
+    parser.add_argument('--budgets', default=DEFAULT_BUDGETS, help='Budget file (JSON)')
+    parser.add_argument('--no-budgets', action='store_true', help='Report only, never fail')
+    parser.add_argument('--budget-scale', type=float, default=1.0,
+                        help='Multiply latency budgets (slower machines)')
+    parser.add_argument('--json', action='store_true', help='Print the raw results as JSON')
+    args = parser.parse_args()
+    names = args.routes or list(ROUTES)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, 'bench.db')
+        shutil.copyfile(args.db, database)
+        params = route_params(database)
+        size = catalog_size(database)
+        env = {
+            'DATABASE_URL': f"sqlite:///{database}",
+            'DB_AUTO_INIT': '1',
+            'SCHEDULER_ENABLED': '0',
+            'METRICS_ENABLED': '1',
+            'METRICS_DIR': os.path.join(tmp, 'metrics'),
+            'RESPONSE_CACHE_ENABLED': '1' if args.cache else '0',
+            'LOG_LEVEL': 'WARNING',
+        }
+        if args.mode == 'gunicorn':
+            # Schema work once, before the workers fork (like the Render build step)
+            subprocess.run([sys.executable, '-m', 'flask', '--app', 'run', 'init-db'], cwd=ROOT,
+                           env=dict(os.environ, **env), check=True, capture_output=True)
+            env['DB_AUTO_INIT'] = '0'
+            target = GunicornTarget(env, args.workers, args.concurrency, args.port)
+        else:
+            target = ClientTarget(env)
+
+        try:
+            results = {}
+            for name in names:
+                path = ROUTES[name].format(**params)
+                results[name] = dict(run_route(target, path, args.requests, args.warmup), path=path)
+        finally:
+            target.close()
+
+    budgets = {}
+    latency_budgets = True
+    notes = []
+    if not args.no_budgets and os.path.exists(args.budgets):
+        with open(args.budgets) as f:
+            budget_file = json.load(f)
+        budgets = budget_file.get('routes', {})
+        # Latency budgets hold for the mode and catalog they were measured on;
+        # query counts for any
+        if budget_file.get('mode', args.mode) != args.mode:
+            latency_budgets = False
+            notes.append(f"latency budgets were measured in {budget_file['mode']} mode; not checked")
+        expected = {table: budget_file.get('catalog', {}).get(table) for table in size}
+        if any(count is not None and count != size[table] for table, count in expected.items()):
+            latency_budgets = False
+            notes.append(f"latency budgets need a catalog of {expected['songs']} songs and "
+                         f"{expected['artists']} artists, --db has {size['songs']} and "
+                         f"{size['artists']}; not checked")
+    failures = [] if args.no_budgets else check_budgets(results, budgets, args.budget_scale, latency_budgets)
+
+    if args.json:
+        print(json.dumps({'mode': args.mode, 'catalog': size, 'results': results, 'failures': failures,
+                          'notes': notes}, indent=2))
+    else:
+        concurrency = f", concurrency {args.concurrency}" if args.mode == 'gunicorn' else ''
+        print(f"{args.mode} mode, {args.requests} requests per route{concurrency}:")
+        print(f"  {'route':<22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'req/s':>8} {'errors':>7}")
+        for name, result in results.items():
+            queries = '-' if result['queries'] is None else f"{result['queries']:g}"
+            print(f"  {name:<22} {result['p50_ms']:8.2f} {result['p95_ms']:8.2f} {result['p99_ms']:8.2f} "
+                  f"{queries:>8} {result['rps']:8.1f} {result['errors']:7}")
+        for note in notes:
+            print(f"NOTE {note}")
+        for failure in failures:
+            print(f"OVER BUDGET {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
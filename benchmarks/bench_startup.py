@@ -0,0 +1,111 @@
+"""Cold-start benchmark: import time, create_app() time and first-request latency.
+
+Every run is a fresh interpreter, like a gunicorn worker boot or a Render
+cold start. Timings are reported as medians over --runs runs.
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --db /tmp/copy.db --init-db   # include schema work
+
+The database file is copied to a temporary file first so runs never
+modify it.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_PATHS = ['/', '/latest', '/api/v2/songs?limit=50']
+
+# Heavy optional dependencies that must not be imported by a plain start
+LAZY_MODULES = ['google.generativeai', 'PIL.Image', 'requests', 'apscheduler']
+
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+import app as package
+imported = time.perf_counter()
+application = package.create_app(with_scheduler=False)
+created = time.perf_counter()
+loaded = [name for name in LAZY if name in sys.modules]
+client = application.test_client()
+requests_ms = {}
+for path in PATHS:
+    before = time.perf_counter()
+    status = client.get(path).status_code
+    requests_ms[path] = [round((time.perf_counter() - before) * 1000, 2), status]
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'requests': requests_ms,
+    'loaded': loaded,
+}))
+"""
+
+
+def run_once(database_url, paths, init_db):
+    env = dict(os.environ, DATABASE_URL=database_url, PYTHONPATH=ROOT,
+               DB_AUTO_INIT='1' if init_db else '0', SCHEDULER_ENABLED='0',
+               LOG_FORMAT='json')
+    code = f"PATHS = {paths!r}\nLAZY = {LAZY_MODULES!r}\n" + CHILD
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    # Log records share stdout (written by a background thread, so in any order)
+    for line in reversed(output.strip().splitlines()):
+        result = json.loads(line)
+        if 'import_ms' in result:
+            return result
+    raise RuntimeError(f"No result in benchmark output: {output[-500:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--db', default=os.path.join(ROOT, 'instance', 'kenyan_music.db'),
+                        help='SQLite database to copy for the runs')
+    parser.add_argument('--path', dest='paths', action='append', help='Request path (repeatable)')
+    parser.add_argument('--init-db', action='store_true', help='Run the schema step on start (DB_AUTO_INIT=1)')
+    parser.add_argument('--json', action='store_true', help='Print the raw results as JSON')
+    args = parser.parse_args()
+    paths = args.paths or DEFAULT_PATHS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, 'bench.db')
+        shutil.copyfile(args.db, database)
+        # One untimed run warms the OS file cache and creates .pyc files
+        run_once(f"sqlite:///{database}", paths, args.init_db)
+        results = [run_once(f"sqlite:///{database}", paths, args.init_db) for _ in range(args.runs)]
+
+    summary = {
+        'runs': args.runs,
+        'init_db': args.init_db,
+        'import_ms': round(statistics.median(r['import_ms'] for r in results), 1),
+        'create_app_ms': round(statistics.median(r['create_app_ms'] for r in results), 1),
+        'first_request_ms': {
+            path: round(statistics.median(r['requests'][path][0] for r in results), 1) for path in paths
+        },
+        'statuses': {path: results[-1]['requests'][path][1] for path in paths},
+        'lazy_modules_loaded': results[-1]['loaded'],
+    }
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"Startup over {args.runs} runs (median){' with init-db' if args.init_db else ''}:")
+    print(f"  import app        {summary['import_ms']:8.1f} ms")
+    print(f"  create_app()      {summary['create_app_ms']:8.1f} ms")
+    for path in paths:
+        print(f"  first GET {path:<28} {summary['first_request_ms'][path]:8.1f} ms "
+              f"({summary['statuses'][path]})")
+    loaded = ', '.join(summary['lazy_modules_loaded']) or 'none'
+    print(f"  heavy modules loaded at start: {loaded}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+"""Deterministic synthetic catalog for load tests at production-like scale.
+
+Creates a new SQLite database with the app's schema and fills it with
+artists (plus a channel alias each), songs released over the last --days
+days, monthly rollups, the search index and the stats row. The same --seed
+and sizes always give the same rows, so benchmark runs are comparable.
+
+    python benchmarks/generate_catalog.py --out /tmp/catalog.db --songs 100000 --artists 10000
+
+Song counts per artist and view counts follow a long-tailed distribution
+like the real catalog: a few artists have hundreds of songs and most
+have a handful.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BATCH_SIZE = 2000
+
+FIRST_NAMES = [
+    'Wanjiku', 'Otieno', 'Akinyi', 'Kamau', 'Njeri', 'Mutua', 'Wambui', 'Kiprono', 'Achieng',
+    'Mwangi', 'Chebet', 'Odhiambo', 'Nyambura', 'Kibet', 'Atieno', 'Kariuki', 'Jepkosgei',
+    'Omondi', 'Wairimu', 'Mumbua', 'Baraka', 'Neema', 'Zawadi', 'Imani', 'Amani', 'Juma',
+]
+STAGE_PREFIXES = ['', '', '', 'DJ ', 'MC ', 'Lil ', 'King ', 'Queen ', 'Sauti ', 'Mr ']
+STAGE_SUFFIXES = ['', '', '', ' Music', ' Band', ' KE', ' Official', ' & Friends', ' Sounds']
+TITLE_WORDS = [
+    'Nairobi', 'Love', 'Moyo', 'Sherehe', 'Mapenzi', 'Dance', 'Usiku', 'Bado', 'Sasa', 'Pamoja',
+    'Baby', 'Dunia', 'Ngoma', 'Tamu', 'Safari', 'Mwanga', 'Rafiki', 'Malaika', 'Fire', 'Gengetone',
+    'Vibe', 'Asante', 'Furaha', 'Nyota', 'Jua', 'Mvua', 'Roho', 'Siri', 'Kesho', 'Leo', 'Mombasa',
+    'Kisumu', 'Party', 'Riddim', 'Sweet', 'Mtaa', 'Hustle', 'Blessed', 'Queen', 'King', 'Halleluya',
+]
+TITLE_TAGS = ['', '', '', '', ' (Official Video)', ' (Official Audio)', ' (Lyric Video)', ' (Remix)', ' (Live)']
+GENRES = ['Gengetone', 'Afro-pop', 'Bongo Flava', 'Benga', 'Gospel', 'Hip Hop', 'R&B', 'Reggae', 'Rhumba', 'Drill']
+LOCATIONS = ['Nairobi', 'Mombasa', 'Kisumu', 'Nakuru', 'Eldoret', 'Thika', 'Machakos', 'Nyeri']
+ID_ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_'
+
+
+def artist_rows(rng, count, now):
+    """Unique artist names (and name keys) with profile fields"""
+    from app.utilis.helpers import artist_name_key
+
+    seen = set()
+    for artist_id in range(1, count + 1):
+        first, second = rng.sample(FIRST_NAMES, 2)
+        base = name = f"{rng.choice(STAGE_PREFIXES)}{first} {second}{rng.choice(STAGE_SUFFIXES)}"
+        key = artist_name_key(name)
+        number = 2
+        while key in seen:
+            name = f"{base} {number}"
+            key, number = artist_name_key(name), number + 1
+        seen.add(key)
+        created = now - timedelta(days=rng.randint(30, 1500))
+        yield {
+            'id': artist_id,
+            'name': name,
+            'name_key': key,
+            'genre': rng.choice(GENRES),
+            'location': rng.choice(LOCATIONS),
+            'is_verified': rng.random() < 0.1,
+            'created_at': created,
+            'updated_at': created,
+        }
+
+
+def song_rows(rng, count, artist_count, days, now):
+    """Songs spread over the last `days` days with long-tailed artist and view distributions"""
+    # Zipf-like popularity: artist rank r gets weight 1 / r^0.9
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, artist_count + 1):
+        total += 1.0 / rank ** 0.9
+        cum_weights.append(total)
+    artist_ids = list(range(1, artist_count + 1))
+    rng.shuffle(artist_ids)
+    window = days * 86400
+
+    for song_id in range(1, count + 1):
+        artist_id = rng.choices(artist_ids, cum_weights=cum_weights)[0]
+        released = now - timedelta(seconds=rng.randint(0, window))
+        age_hours = max((now - released).total_seconds() / 3600, 1.0)
+        views = int(rng.paretovariate(1.2) * 800)
+        youtube_id = ''.join(rng.choice(ID_ALPHABET) for _ in range(11))
+        words = rng.sample(TITLE_WORDS, rng.randint(1, 3))
+        yield {
+            'id': song_id,
+            'title': ' '.join(words) + rng.choice(TITLE_TAGS),
+            'artist_id': artist_id,
+            'release_date': released,
+            'youtube_url': f"https://www.youtube.com/watch?v={youtube_id}",
+            'youtube_id': youtube_id,
+            'thumbnail_url': f"https://i.ytimg.com/vi/{youtube_id}/hqdefault.jpg",
+            'view_count': views,
+            'like_count': int(views * rng.uniform(0.01, 0.06)),
+            'duration': f"{rng.randint(2, 5)}:{rng.randint(0, 59):02d}",
+            'genre': rng.choice(GENRES),
+            'is_explicit': rng.random() < 0.05,
+            'trending_score': round(views / age_hours, 4),
+            'created_at': released + timedelta(minutes=rng.randint(5, 600)),
+            'updated_at': released + timedelta(minutes=rng.randint(5, 600)),
+        }
+
+
+def channel_alias_rows(rng, artist_count, now):
+    for artist_id in range(1, artist_count + 1):
+        yield {
+            'artist_id': artist_id,
+            'kind': 'channel',
+            'value': 'UC' + ''.join(rng.choice(ID_ALPHABET) for _ in range(22)),
+            'created_at': now,
+        }
+
+
+def _insert(conn, table, rows):
+    from sqlalchemy import insert
+
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.execute(insert(table), batch)
+            count += len(batch)
+            batch.clear()
+    if batch:
+        conn.execute(insert(table), batch)
+        count += len(batch)
+    return count
+
+
+def generate(songs, artists, days, seed):
+    """Fill the (empty) database of the current app; returns rows written per table"""
+    from flask import current_app
+    from app import db
+    from app.models import Artist, ArtistAlias, Song
+    from app.services.analytics_service import rebuild_rollups
+    from app.services.search_service import drop_search_triggers, restore_search_triggers
+    from app.services.stats_service import refresh_stats
+
+    rng = random.Random(seed)
+    # Rounded so runs within the same hour write identical rows
+    now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    search_enabled = current_app.extensions.get('songs_fts', False)
+    tables = [Artist.__table__, ArtistAlias.__table__, Song.__table__]
+    indexes = [index for table in tables for index in table.indexes]
+    counts = {}
+
+    with db.engine.begin() as conn:
+        if search_enabled:
+            drop_search_triggers(conn)
+        for index in indexes:
+            index.drop(conn, checkfirst=True)
+
+        counts['artists'] = _insert(conn, Artist.__table__, artist_rows(rng, artists, now))
+        counts['artist_aliases'] = _insert(conn, ArtistAlias.__table__, channel_alias_rows(rng, artists, now))
+        counts['songs'] = _insert(conn, Song.__table__, song_rows(rng, songs, artists, days, now))
+
+        for index in indexes:
+            index.create(conn, checkfirst=True)
+        if search_enabled:
+            restore_search_triggers(conn)
+        conn.exec_driver_sql('ANALYZE')
+
+    counts['artist_monthly_rollups'] = rebuild_rollups()
+    refresh_stats()
+    db.session.commit()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', required=True, help='SQLite file to create')
+    parser.add_argument('--songs', type=int, default=100000)
+    parser.add_argument('--artists', type=int, default=10000)
+    parser.add_argument('--days', type=int, default=30, help='Release dates fall in the last N days')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--force', action='store_true', help='Overwrite --out if it exists')
+    args = parser.parse_args()
+
+    out = os.path.abspath(args.out)
+    if os.path.exists(out):
+        if not args.force:
+            parser.error(f"{out} exists (use --force to overwrite)")
+        os.remove(out)
+
+    os.environ.update(DATABASE_URL=f"sqlite:///{out}", DB_AUTO_INIT='1', SCHEDULER_ENABLED='0',
+                      LOG_LEVEL=os.environ.get('LOG_LEVEL', 'WARNING'))
+    sys.path.insert(0, ROOT)
+    from app import create_app
+
+    start = time.perf_counter()
+    app = create_app(with_scheduler=False)
+    with app.app_context():
+        counts = generate(args.songs, args.artists, args.days, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"Generated {out} in {elapsed:.1f}s (seed {args.seed}):")
+    for table, count in counts.items():
+        print(f"  {table:<24} {count:>9,}")
+    print(f"  {'file size':<24} {os.path.getsize(out) / 1e6:>8.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
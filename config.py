@@ -9,6 +9,9 @@ class Config:
     # Database Configuration
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///kenyan_music.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Create/migrate the schema on every start; deployments set 0 and run
+    # `flask init-db` once per release instead
+    DB_AUTO_INIT = os.environ.get('DB_AUTO_INIT', '1') == '1'
     
     # YouTube API Configuration - Multiple keys
     YOUTUBE_API_KEYS = [
@@ -24,11 +27,112 @@ class Config:
     
     # Scheduler Configuration
     SCHEDULER_INTERVAL_HOURS = int(os.environ.get('SCHEDULER_INTERVAL_HOURS', 6))
+    # Start the background scheduler inside web processes (jobs still run in only
+    # one process at a time: the holder of the database lease)
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', '1') == '1'
+    SCHEDULER_LEASE_SECONDS = 90
+    SCHEDULER_HEARTBEAT_SECONDS = 30
+    
+    # Crawl queue: 'inline' walks every query in the scheduler process, 'queue'
+    # enqueues one work item per query for `flask crawl work` processes to share
+    CRAWL_MODE = os.environ.get('CRAWL_MODE', 'inline')
+    CRAWL_WORKER_COUNT = int(os.environ.get('CRAWL_WORKER_COUNT', 1))  # splits the API keys
+    CRAWL_LEASE_SECONDS = 300
+    CRAWL_MAX_ATTEMPTS = 3
+    
+    # Trending (view snapshots via batched videos.list, 1 quota unit per 50 songs)
+    TRENDING_REFRESH_HOURS = int(os.environ.get('TRENDING_REFRESH_HOURS', 3))
+    TRENDING_WINDOW_DAYS = 30
+    TRENDING_HALF_LIFE_HOURS = 24
+    
+    # Retention (songs past the window move to archived_songs in chunks)
+    RETENTION_DAYS = int(os.environ.get('RETENTION_DAYS', 30))
+    RETENTION_CHUNK_SIZE = 500
+    RETENTION_INTERVAL_HOURS = 24
+    
+    # Bulk import (rows validated, de-duplicated and committed per chunk)
+    IMPORT_CHUNK_SIZE = 1000
+    IMPORT_MAX_BYTES = int(os.environ.get('IMPORT_MAX_BYTES', 512 * 1024 * 1024))  # streamed body cap
     
     # Application Settings
     SONGS_PER_PAGE = 12
     ARTISTS_PER_PAGE = 24
     
+    # Artist name/channel id -> artist id lookups cached per process
+    ARTIST_CACHE_SIZE = 4096
+    
+    # Page response cache (entries also expire on every catalog write)
+    RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', '1') == '1'
+    RESPONSE_CACHE_SIZE = 256
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 300))  # seconds
+    
+    # Rendered song/artist cards, keyed by id and updated_at
+    FRAGMENT_CACHE_SIZE = 2048
+    
+    # gzip/brotli response compression with a cache of compressed bodies
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', '1') == '1'
+    COMPRESSION_MIN_SIZE = 500                   # bytes; smaller bodies are sent as-is
+    COMPRESSION_MAX_SIZE = 4 * 1024 * 1024
+    COMPRESSION_GZIP_LEVEL = 6
+    COMPRESSION_BROTLI_QUALITY = 5
+    COMPRESSION_CACHE_BYTES = 16 * 1024 * 1024
+    
+    # Request metrics at /metrics (Prometheus); every process writes its totals
+    # to a file in METRICS_DIR so any worker can report all of them
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+    METRICS_DIR = os.environ.get('METRICS_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'metrics')
+    METRICS_FLUSH_SECONDS = 5
+    METRICS_SERVER_TIMING = True                 # Server-Timing header on every response
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # optional bearer token for /metrics
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')      # bearer or ?token= for /admin/ingestion and its APIs
+    
+    # Rate limits for endpoints that render images, call Gemini or crawl YouTube:
+    # a token bucket per client IP and endpoint, plus a per-process cap on how
+    # many requests to each of them run at once (429 + Retry-After beyond either)
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1') == '1'
+    RATE_LIMITS = {
+        'main.generate_artist_card': '10/minute',
+        'main.generate_artist_description': '5/minute',
+        'main.update_songs': '2/hour',
+        'main.search_manual': '10/hour',
+        'main.refresh_trending_scores': '2/hour',
+        'main.import_songs_stream': '5/hour',
+        'main.bulk_add_songs': '20/hour',
+        'main.cleanup_old_songs': '2/hour',
+        'main.refresh_platform_stats': '10/hour',
+    }
+    RATE_LIMIT_CONCURRENCY = int(os.environ.get('RATE_LIMIT_CONCURRENCY', 2))  # per endpoint and process
+    RATE_LIMIT_CONCURRENCY_OVERRIDES = {         # endpoints that hold the database write lock for long
+        'main.update_songs': 1,
+        'main.import_songs_stream': 1,
+        'main.cleanup_old_songs': 1,
+    }
+    RATE_LIMIT_STORAGE = os.environ.get('RATE_LIMIT_STORAGE', 'memory')  # or 'sqlite' (shared by workers)
+    RATE_LIMIT_SQLITE_PATH = os.environ.get('RATE_LIMIT_SQLITE_PATH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'rate_limits.db')
+    RATE_LIMIT_PROXY_COUNT = int(os.environ.get('RATE_LIMIT_PROXY_COUNT', 0))  # trusted proxies setting X-Forwarded-For
+    
+    # Request profiler: off unless enabled; a request opts in with an X-Profile
+    # token from `flask profiler token` (see app/utilis/profiler.py)
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', '0') == '1'
+    PROFILER_SECRET = os.environ.get('PROFILER_SECRET')  # defaults to SECRET_KEY
+    PROFILER_TOKEN_MAX_AGE = 3600                # seconds
+    PROFILER_DIR = os.environ.get('PROFILER_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'profiles')
+    PROFILER_MAX_FILES = 50
+    PROFILER_ENGINE = os.environ.get('PROFILER_ENGINE', 'auto')  # auto, pyinstrument or cprofile
+    
+    # Logging: JSON lines on stdout, written off the request/ingestion threads.
+    # LOG_LEVELS sets levels per module, e.g. "app.services.youtube_service=DEBUG"
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_LEVELS = os.environ.get('LOG_LEVELS', '')
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')   # 'text' for local development
+    LOG_QUEUE_SIZE = 10000                       # records; further ones are dropped, never waited on
+    LOG_RATE_LIMIT = 20                          # same message per LOG_RATE_WINDOW seconds
+    LOG_RATE_WINDOW = 60
+    
+    # Search suggestions (typeahead)
+    SUGGEST_LIMIT = 5
+    INDEX_REFRESH_INTERVAL = int(os.environ.get('INDEX_REFRESH_INTERVAL', 60))  # min seconds between background rebuilds
+    
     # File Upload Configuration
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app', 'static', 'images')
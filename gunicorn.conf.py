@@ -0,0 +1,36 @@
+"""gunicorn settings (read from the working directory on start).
+
+The app is imported once in the master (preload_app) and warmed up there,
+so workers fork with the modules, compiled templates and indexes already
+in memory and share them copy-on-write. The scheduler is started in each
+worker after it boots; the database lease still lets only one run jobs.
+"""
+import gc
+
+preload_app = True
+
+
+def on_starting(server):
+    # Worker metrics files from the previous run would be added to this one's
+    from config import Config
+    from app.utilis.metrics import clear_metrics_dir
+
+    clear_metrics_dir(Config.METRICS_DIR)
+
+
+def when_ready(server):
+    if not server.cfg.preload_app:
+        return
+    from app import warm_up
+
+    warm_up(server.app.wsgi())
+    # Keep the warmed objects out of the collector so it does not touch
+    # (and un-share) their pages in the workers
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    app = worker.wsgi
+    if app.config.get('SCHEDULER_ENABLED', True):
+        from app.scheduler import start_scheduler
+        start_scheduler(app)
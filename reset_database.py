@@ -1,9 +1,10 @@
 # reset_database.py
+import click
 from app import db, create_app
 from app.models import Artist, Song
 
 def reset_database():
-    app = create_app()
+    app = create_app(with_scheduler=False)
     
     with app.app_context():
         # Drop all tables
@@ -12,7 +13,11 @@ def reset_database():
         # Create all tables with new schema
         db.create_all()
         
-        print("✅ Database reset and created with new schema!")
+        # Recreate the search index triggers dropped along with the tables
+        from app.services.search_service import ensure_search_index
+        ensure_search_index()
+        
+        click.echo("✅ Database reset and created with new schema!")
 
 if __name__ == '__main__':
     reset_database()
\ No newline at end of file
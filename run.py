@@ -1,16 +1,25 @@
+import logging
+import os
 from app import create_app
 
-app = create_app()
+# app.run(debug=True) below re-runs this script in a reloader child process.
+# app.debug is still False here, so the scheduler's own reloader check cannot
+# tell the watching parent apart: only the child may start the scheduler.
+in_reloader_parent = __name__ == '__main__' and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+app = create_app(with_scheduler=False if in_reloader_parent else None)
+
+# Named under 'app' so it follows LOG_LEVEL (this module runs as __main__)
+logger = logging.getLogger('app.run')
 
 if __name__ == '__main__':
-    print("Starting Kenyan Music Discovery App...")
-    print("This app will only fetch music from established Kenyan artists")
-    print("Visit: http://localhost:5000")
-    print("Press Ctrl+C to stop the server")
+    logger.info("Starting Kenyan Music Discovery App...")
+    logger.info("This app will only fetch music from established Kenyan artists")
+    logger.info("Visit: http://localhost:5000")
+    logger.info("Press Ctrl+C to stop the server")
     
     try:
         app.run(debug=True, host='0.0.0.0', port=5000)
     except KeyboardInterrupt:
-        print("\nServer stopped by user")
+        logger.info("Server stopped by user")
     except Exception as e:
-        print(f"Error starting server: {e}")
\ No newline at end of file
+        logger.error("Error starting server: %s", e)
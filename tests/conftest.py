@@ -0,0 +1,32 @@
+import os
+import tempfile
+import pytest
+
+# Config reads the environment on import, so set it before the app is imported
+_tmp = tempfile.mkdtemp(prefix='goodmusic-tests-')
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{os.path.join(_tmp, 'test.db')}",
+    DB_AUTO_INIT='1',
+    SCHEDULER_ENABLED='0',
+    METRICS_DIR=os.path.join(_tmp, 'metrics'),
+    RATE_LIMIT_ENABLED='0',
+    LOG_LEVEL='WARNING',
+)
+
+from app import create_app, db  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    app = create_app(with_scheduler=False)
+    app.config['TESTING'] = True
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
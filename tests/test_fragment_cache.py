@@ -0,0 +1,29 @@
+from datetime import datetime
+from flask import render_template_string
+from app import create_app, db
+from app.models import Artist, Song
+
+CARD = "{% include '_song_card.html' %}"
+
+
+def test_artist_rename_reaches_cards_cached_by_other_processes(app):
+    artist = Artist(name='Old Name')
+    song = Song(title='Song', artist=artist, release_date=datetime(2024, 1, 1),
+                youtube_id='abcdefghijk', youtube_url='https://youtu.be/abcdefghijk')
+    db.session.add(song)
+    db.session.commit()
+
+    # A second app shares the instance folder but not the in-memory caches,
+    # like another worker process
+    other = create_app(with_scheduler=False)
+    with other.test_request_context():
+        assert 'Old Name' in render_template_string(CARD, song=db.session.get(Song, song.id))
+        db.session.remove()
+
+    artist.name = 'New Name'
+    db.session.commit()
+
+    with other.test_request_context():
+        html = render_template_string(CARD, song=db.session.get(Song, song.id))
+        db.session.remove()
+    assert 'New Name' in html and 'Old Name' not in html
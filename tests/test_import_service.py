@@ -0,0 +1,51 @@
+from app.models import Song
+from app.services.import_service import import_songs
+
+
+def song(n, **overrides):
+    row = {
+        'title': f'Song {n}',
+        'artist': 'Test Artist',
+        'youtube_url': f'https://www.youtube.com/watch?v=vid{n:08d}',
+        'release_date': '2026-10-01T12:00:00Z',
+    }
+    row.update(overrides)
+    return row
+
+
+def test_rows_with_wrong_types_are_skipped_not_fatal(app):
+    rows = [
+        song(1),
+        song(2, title=123),
+        song(3, artist=['Test Artist']),
+        song(4, youtube_url={'url': 'x'}),
+        song(5, release_date=20261001),
+        song(6, genre=7),
+        song(7, view_count='many'),
+        song(8),
+    ]
+    result = import_songs(rows)
+
+    assert not result['aborted']
+    assert result['added_count'] == 2
+    assert result['error_count'] == 6
+    assert 'Song 2: title must be a string' in result['errors']
+    assert {s.title for s in Song.query.all()} == {'Song 1', 'Song 8'}
+
+
+def test_bulk_add_reports_wrong_types_per_row(app, client):
+    app.config['ADMIN_TOKEN'] = 'test-token'
+    response = client.post('/bulk-add-songs', json={'songs': [song(1), song(2, title=123), song(3)]},
+                           headers={'Authorization': 'Bearer test-token'})
+
+    body = response.get_json()
+    assert body['success']
+    assert body['added_count'] == 2
+    assert body['errors'] == ['Song 2: title must be a string']
+
+
+def test_bulk_write_endpoints_need_an_admin(app, client):
+    app.config['ADMIN_TOKEN'] = 'test-token'
+    for path in ('/import-songs', '/bulk-add-songs', '/cleanup-old', '/trending/refresh', '/stats/refresh'):
+        assert client.post(path, json={'songs': [song(1)]}).status_code == 403, path
+    assert Song.query.count() == 0
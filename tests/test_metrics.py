@@ -0,0 +1,35 @@
+import json
+import os
+import subprocess
+import sys
+from app.utilis.metrics import DEAD_FILE, MetricsRegistry
+
+
+def exited_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def write_worker_file(directory, pid, count):
+    worker = MetricsRegistry(str(directory))
+    for _ in range(count):
+        worker.observe('main.index', 'GET', 200, 0.01, queries=2)
+    with open(os.path.join(directory, f'metrics-{pid}.json'), 'w') as f:
+        json.dump(worker.snapshot(), f)
+
+
+def test_exited_workers_keep_counting_toward_the_totals(tmp_path):
+    registry = MetricsRegistry(str(tmp_path))
+    write_worker_file(tmp_path, exited_pid(), 3)
+    requests, endpoints = registry.collect()
+    assert requests[('main.index', 'GET', 200)] == 3
+
+    write_worker_file(tmp_path, exited_pid(), 2)
+    for _ in range(2):
+        requests, endpoints = registry.collect()
+        assert requests[('main.index', 'GET', 200)] == 5
+        assert endpoints['main.index']['queries'] == 10
+        assert sum(endpoints['main.index']['buckets']) == 5
+
+    assert sorted(os.listdir(tmp_path)) == [DEAD_FILE, 'metrics.lock']
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models import Artist, Song
+from app.services.trending_service import refresh_trending
+
+STAMP = datetime(2026, 1, 1, 12, 0, 0)
+
+
+class FakeYouTube:
+    def __init__(self, statistics):
+        self.statistics = statistics
+
+    def fetch_video_statistics(self, youtube_ids):
+        return {youtube_id: self.statistics[youtube_id] for youtube_id in youtube_ids if youtube_id in self.statistics}
+
+
+def add_songs(app, count, released):
+    artist = Artist(name='Trend Artist')
+    db.session.add(artist)
+    db.session.flush()
+    for n in range(count):
+        youtube_id = f'trend{n:06d}'
+        db.session.add(Song(title=f'Trend {n}', artist_id=artist.id, release_date=released,
+                            youtube_url=f'https://www.youtube.com/watch?v={youtube_id}', youtube_id=youtube_id,
+                            view_count=1000, like_count=10, trending_score=1.0))
+    db.session.commit()
+    db.session.execute(db.update(Song).values(updated_at=STAMP))
+    db.session.commit()
+
+
+def updated_at():
+    db.session.expire_all()
+    return {song.youtube_id: song.updated_at for song in Song.query.all()}
+
+
+def test_unchanged_view_counts_keep_updated_at(app):
+    add_songs(app, 3, datetime.utcnow() - timedelta(days=1))
+
+    result = refresh_trending(FakeYouTube({f'trend{n:06d}': (1000, 10) for n in range(3)}))
+
+    assert result['songs_updated'] == 3
+    assert set(updated_at().values()) == {STAMP}
+    assert all(song.trending_score > 0 for song in Song.query.all())
+
+
+def test_changed_view_counts_bump_updated_at(app):
+    add_songs(app, 2, datetime.utcnow() - timedelta(days=1))
+
+    refresh_trending(FakeYouTube({'trend000000': (5000, 10), 'trend000001': (1000, 10)}))
+
+    stamps = updated_at()
+    assert stamps['trend000000'] > STAMP
+    assert stamps['trend000001'] == STAMP
+
+
+def test_songs_leaving_the_window_keep_updated_at(app):
+    add_songs(app, 2, datetime.utcnow() - timedelta(days=400))
+
+    refresh_trending(FakeYouTube({}))
+
+    assert set(updated_at().values()) == {STAMP}
+    assert {song.trending_score for song in Song.query.all()} == {0}